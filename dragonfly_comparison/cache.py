@@ -0,0 +1,307 @@
+# coding=utf-8
+"""Persistent on-disk cache of Room2D comparison metrics."""
+import json
+import hashlib
+
+try:  # sqlite3 is not available in all Python environments
+    import sqlite3
+except ImportError:  # IronPython
+    sqlite3 = None
+
+
+def host_fingerprint(room_2d):
+    """Get a text fingerprint for the state of a host Room2D used by comparisons.
+
+    The fingerprint accounts for everything about the host that affects the
+    comparison metrics, including its floor geometry, floor-to-ceiling height,
+    window parameters, skylight parameters and whether it is top exposed.
+
+    Args:
+        room_2d: A dragonfly Room2D for which the fingerprint will be computed.
+    """
+    host_data = (
+        _face_coordinates(room_2d.floor_geometry),
+        room_2d.floor_to_ceiling_height,
+        _windows_data(room_2d.window_parameters),
+        _skylight_data(room_2d.skylight_parameters),
+        room_2d.is_top_exposed
+    )
+    return _hash_data(host_data)
+
+
+def comparison_fingerprint(room_2d):
+    """Get a text fingerprint for the comparison attributes assigned to a Room2D.
+
+    Comparison attributes that are still held as an unparsed dictionary (eg.
+    from a Model that was loaded lazily) are fingerprinted from the data of
+    the dictionary without parsing it into geometry and parameter objects.
+    The data is brought into the same form as that of parsed attributes such
+    that the fingerprint is the same whether the dictionary is parsed or not.
+
+    Args:
+        room_2d: A dragonfly Room2D for which the fingerprint of the comparison
+            properties will be computed.
+    """
+    comp_prop = room_2d.properties.comparison
+    pending = comp_prop._pending_dict  # read before the state it replaces
+    fg, windows, skylight = comp_prop._state
+    data, host_geo, floor_height = pending if pending is not None else ({}, None, 0)
+    if data.get('floor_delta') is not None:
+        floor_data = _delta_coordinates(data['floor_delta'], host_geo, floor_height)
+    elif data.get('floor_boundary') is not None:
+        floor_data = _loop_coordinates(
+            data['floor_boundary'], data.get('floor_holes'), floor_height)
+    else:
+        floor_data = _face_coordinates(fg) if fg is not None else None
+    comp_data = (
+        floor_data,
+        data['window_parameters'] if data.get('window_parameters') is not None
+        else _windows_data(windows),
+        data['skylight_parameters'] if data.get('skylight_parameters') is not None
+        else _skylight_data(skylight)
+    )
+    return _hash_data(comp_data)
+
+
+class ComparisonCache(object):
+    """A content-addressed on-disk cache of Room2D comparison metrics.
+
+    Metric dictionaries from Room2DComparisonProperties.comparison_metrics are
+    stored using the fingerprints of the host Room2D and its comparison
+    attributes as the key. So rooms that are unchanged between runs can have their
+    metrics loaded from the cache without any geometry computation. When the
+    number of cached records exceeds the max_size, the least recently used
+    records are evicted.
+
+    Args:
+        file_path: Path to a SQLite database file to be used for the cache. The
+            file will be created if it does not already exist.
+        max_size: An integer for the maximum number of records to be kept in
+            the cache. (Default: 100000).
+
+    Properties:
+        * file_path
+        * max_size
+        * record_count
+    """
+
+    def __init__(self, file_path, max_size=100000):
+        """Initialize ComparisonCache."""
+        if sqlite3 is None:
+            raise ImportError(
+                'The sqlite3 module is required to use the ComparisonCache.')
+        assert max_size > 0, 'ComparisonCache max_size must be greater than zero. ' \
+            'Got {}.'.format(max_size)
+        self._file_path = file_path
+        self._max_size = int(max_size)
+        self._connection = sqlite3.connect(file_path)
+        self._connection.execute(
+            'CREATE TABLE IF NOT EXISTS metrics (host TEXT NOT NULL, '
+            'comparison TEXT NOT NULL, record TEXT NOT NULL, '
+            'last_used INTEGER NOT NULL, PRIMARY KEY (host, comparison))')
+        self._connection.execute(
+            'CREATE INDEX IF NOT EXISTS metrics_last_used ON metrics (last_used)')
+        self._connection.commit()
+        cursor = self._connection.execute(
+            'SELECT COUNT(*), MAX(last_used) FROM metrics')
+        count, last_used = cursor.fetchone()
+        self._record_count = count
+        self._clock = last_used or 0
+
+    @property
+    def file_path(self):
+        """Get the path to the SQLite database file of the cache."""
+        return self._file_path
+
+    @property
+    def max_size(self):
+        """Get the maximum number of records kept in the cache."""
+        return self._max_size
+
+    @property
+    def record_count(self):
+        """Get the number of records currently in the cache."""
+        return self._record_count
+
+    def get(self, host_key, comparison_key):
+        """Get a metric dictionary from the cache.
+
+        Args:
+            host_key: Text for the fingerprint of the host Room2D.
+            comparison_key: Text for the fingerprint of the comparison attributes.
+
+        Returns:
+            A dictionary of comparison metrics or None if the keys are not
+            in the cache.
+        """
+        cursor = self._connection.execute(
+            'SELECT record FROM metrics WHERE host = ? AND comparison = ?',
+            (host_key, comparison_key))
+        row = cursor.fetchone()
+        if row is None:
+            return None
+        self._clock += 1
+        self._connection.execute(
+            'UPDATE metrics SET last_used = ? WHERE host = ? AND comparison = ?',
+            (self._clock, host_key, comparison_key))
+        return json.loads(row[0])
+
+    def put(self, host_key, comparison_key, metrics):
+        """Add a metric dictionary to the cache.
+
+        Args:
+            host_key: Text for the fingerprint of the host Room2D.
+            comparison_key: Text for the fingerprint of the comparison attributes.
+            metrics: A dictionary of comparison metrics to be cached.
+        """
+        self._clock += 1
+        cursor = self._connection.execute(
+            'UPDATE metrics SET record = ?, last_used = ? '
+            'WHERE host = ? AND comparison = ?',
+            (json.dumps(metrics), self._clock, host_key, comparison_key))
+        if cursor.rowcount == 0:
+            self._connection.execute(
+                'INSERT INTO metrics VALUES (?, ?, ?, ?)',
+                (host_key, comparison_key, json.dumps(metrics), self._clock))
+            self._record_count += 1
+            if self._record_count > self._max_size:
+                self._evict(self._record_count - self._max_size)
+
+    def room_metrics(self, room_2d):
+        """Get the comparison metrics of a Room2D, using the cache when possible.
+
+        Args:
+            room_2d: A dragonfly Room2D for which comparison metrics will be
+                returned. If the metrics are not in the cache, they will be
+                computed and added to it.
+        """
+        host_key = host_fingerprint(room_2d)
+        comp_key = comparison_fingerprint(room_2d)
+        metrics = self.get(host_key, comp_key)
+        if metrics is None:
+            metrics = room_2d.properties.comparison.comparison_metrics()
+            self.put(host_key, comp_key, metrics)
+        return metrics
+
+    def model_metrics(self, model):
+        """Get a dictionary of comparison metrics for all Room2Ds of a Model.
+
+        Args:
+            model: A dragonfly Model for which comparison metrics will be returned.
+
+        Returns:
+            A dictionary with Room2D identifiers as keys and dictionaries of
+            comparison metrics as values.
+        """
+        try:
+            metrics = {}
+            for room in model.room_2ds:
+                metrics[room.identifier] = self.room_metrics(room)
+        finally:
+            self._connection.commit()
+        return metrics
+
+    def clear(self):
+        """Remove all records from the cache."""
+        self._connection.execute('DELETE FROM metrics')
+        self._connection.commit()
+        self._record_count = 0
+
+    def commit(self):
+        """Write any pending changes to the cache file."""
+        self._connection.commit()
+
+    def close(self):
+        """Write any pending changes and close the cache file."""
+        self._connection.commit()
+        self._connection.close()
+
+    def _evict(self, count):
+        """Remove a number of the least recently used records from the cache."""
+        self._connection.execute(
+            'DELETE FROM metrics WHERE rowid IN (SELECT rowid FROM metrics '
+            'ORDER BY last_used ASC LIMIT ?)', (count,))
+        self._record_count -= count
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def __len__(self):
+        return self._record_count
+
+    def ToString(self):
+        return self.__repr__()
+
+    def __repr__(self):
+        return 'Comparison Cache: {} [{} records]'.format(
+            self.file_path, self.record_count)
+
+
+def _face_coordinates(face):
+    """Get a tuple of the 3D vertex coordinates of a Face3D and its holes."""
+    bound = tuple((pt.x, pt.y, pt.z) for pt in face.boundary)
+    if not face.has_holes:
+        return bound
+    holes = tuple(tuple((pt.x, pt.y, pt.z) for pt in hole) for hole in face.holes)
+    return bound, holes
+
+
+def _loop_coordinates(boundary, holes, floor_height):
+    """Get the tuple of _face_coordinates from the 2D vertex loops of a floor dict.
+
+    Clockwise boundaries are reversed in the same way as the comparison floor
+    geometry, which always faces upward.
+    """
+    z = float(floor_height)
+    bound = tuple((float(pt[0]), float(pt[1]), z) for pt in boundary)
+    area = sum(x_1 * y_2 - x_2 * y_1 for (x_1, y_1, _), (x_2, y_2, _)
+               in zip(bound, bound[1:] + bound[:1]))
+    if area < 0:
+        bound = tuple(reversed(bound))
+    if not holes:
+        return bound
+    holes = tuple(tuple((float(pt[0]), float(pt[1]), z) for pt in hole)
+                  for hole in holes)
+    return bound, holes
+
+
+def _delta_coordinates(floor_delta, host_geo, floor_height):
+    """Get the tuple of _face_coordinates from a floor_delta and a host floor.
+
+    The floor_delta itself is used when it does not match the vertex counts
+    of the host floor, in which case parsing it will raise an exception.
+    """
+    host_loops = [host_geo.boundary] + list(host_geo.holes or ())
+    if floor_delta.get('host_vertex_counts') != [len(loop) for loop in host_loops]:
+        return floor_delta
+    deltas = [floor_delta['boundary']] + \
+        list(floor_delta.get('holes', [[] for _ in host_loops[1:]]))
+    loops = []
+    for host_loop, delta in zip(host_loops, deltas):
+        loop = [(pt.x, pt.y) for pt in host_loop]
+        for i, x, y in delta:
+            loop[i] = (x, y)
+        loops.append(loop)
+    return _loop_coordinates(loops[0], loops[1:], floor_height)
+
+
+def _windows_data(window_parameters):
+    """Get a JSON-serializable version of a tuple of window parameters."""
+    if window_parameters is None:
+        return None
+    return [glz.to_dict() if glz is not None else None for glz in window_parameters]
+
+
+def _skylight_data(skylight_parameters):
+    """Get a JSON-serializable version of skylight parameters."""
+    return skylight_parameters.to_dict() \
+        if skylight_parameters is not None else None
+
+
+def _hash_data(data):
+    """Get a hexadecimal hash for JSON-serializable data."""
+    text = json.dumps(data, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha1(text.encode('utf-8')).hexdigest()
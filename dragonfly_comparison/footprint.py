@@ -0,0 +1,89 @@
+# coding=utf-8
+"""Functions for reading 2D room footprints to be used as comparison floor plates."""
+import io
+import json
+
+
+def footprint_from_dict(data):
+    """Get a footprint tuple from a dictionary of a single room footprint.
+
+    Args:
+        data: A dictionary for a room footprint. This can be a GeoJSON Feature
+            with a Polygon geometry and an "identifier" key under its properties
+            (or an "id" key). It can also be a dictionary in the format below.
+
+    .. code-block:: python
+
+        {
+        "identifier": "Office_1",  # identifier of the Room2D
+        "boundary": [(0, 0), (10, 0), (10, 10), (0, 10)],
+        "holes": []  # optional list of lists of hole coordinates
+        }
+
+    Returns:
+        A tuple with three elements.
+
+        -   identifier: Text for the identifier of the Room2D.
+
+        -   boundary: A list of (x, y) coordinates for the floor boundary.
+
+        -   holes: A list of lists of (x, y) coordinates for the floor holes.
+            Will be None if the footprint has no holes.
+    """
+    if data.get('type') == 'Feature':
+        props = data.get('properties') or {}
+        identifier = props.get('identifier', data.get('id'))
+        geometry = data['geometry']
+        assert geometry['type'] == 'Polygon', 'Footprint geometry must be a ' \
+            'Polygon. Got {}.'.format(geometry['type'])
+        rings = [_open_ring(ring) for ring in geometry['coordinates']]
+        boundary, holes = rings[0], rings[1:]
+    else:
+        identifier = data['identifier']
+        boundary = _open_ring(data['boundary'])
+        holes = [_open_ring(hole) for hole in data.get('holes') or ()]
+    assert identifier is not None, 'Footprint has no identifier.'
+    return identifier, boundary, holes if len(holes) != 0 else None
+
+
+def read_footprints(file_path):
+    """Get a generator of footprint tuples from a file of room footprints.
+
+    Files with one footprint dictionary per line (newline-delimited JSON) are
+    streamed such that only one footprint is in memory at a time. Files with a
+    single GeoJSON FeatureCollection or a list of footprint dictionaries are
+    also accepted but they are loaded at once.
+
+    Args:
+        file_path: Path to a file of room footprints. See the footprint_from_dict
+            function for the acceptable format of each footprint.
+
+    Returns:
+        A generator of (identifier, boundary, holes) tuples. See the
+        footprint_from_dict function for a description of the tuples.
+    """
+    with io.open(file_path, encoding='utf-8') as inf:
+        first_line = inf.readline()
+        try:
+            data = json.loads(first_line)
+        except ValueError:  # not newline-delimited JSON
+            data = None
+        if isinstance(data, dict) and data.get('type') != 'FeatureCollection':
+            yield footprint_from_dict(data)
+            for line in inf:
+                if line.strip():
+                    yield footprint_from_dict(json.loads(line))
+            return
+    with io.open(file_path, encoding='utf-8') as inf:
+        data = json.load(inf)
+    features = data['features'] if isinstance(data, dict) else data
+    for feature in features:
+        yield footprint_from_dict(feature)
+
+
+def _open_ring(coordinates):
+    """Get a list of (x, y) tuples without any repeated closing vertex."""
+    ring = [(pt[0], pt[1]) for pt in coordinates]
+    if len(ring) > 1 and ring[0] == ring[-1]:
+        ring.pop()
+    return ring
@@ -0,0 +1,89 @@
+# coding=utf-8
+"""Functions for loading a host and comparison Model at the same time."""
+import sys
+import threading
+
+from dragonfly.model import Model
+
+
+def load_model(model):
+    """Get a dragonfly Model from a Model, a Model dictionary or a file path.
+
+    Args:
+        model: A dragonfly Model, a dictionary of a dragonfly Model or a path
+            to a DFJSON or DFpkl file. If it is already a Model, it will be
+            returned as it is.
+    """
+    if isinstance(model, Model):
+        return model
+    if isinstance(model, dict):
+        return Model.from_dict(model)
+    return Model.from_file(model)
+
+
+def load_models(host_model, comparison_model, reset_unmatched=True,
+                progress=None, cancellation=None):
+    """Load a host and comparison Model concurrently and match their Room2Ds.
+
+    The two Models are loaded on separate threads such that reading one file
+    overlaps with reading and parsing the other. Once both Models are loaded,
+    the comparison properties of the host Model are set from the comparison
+    Model with the ModelComparisonProperties.set_from_model method.
+
+    Args:
+        host_model: A dragonfly Model, a dictionary of a dragonfly Model or a path
+            to a DFJSON or DFpkl file for the Model that will host the
+            comparison properties.
+        comparison_model: A dragonfly Model, a dictionary of a dragonfly Model or
+            a path to a DFJSON or DFpkl file for the Model to which the host
+            is compared.
+        reset_unmatched: A boolean to note whether rooms in the host model
+            should have their comparison room properties reset if they are not
+            matched with any room in the comparison_model. (Default: True).
+        progress: An optional function to be called with the progress of the
+            matching step. See the ProgressTracker class of the
+            dragonfly_comparison.progress module for more information.
+        cancellation: An optional CancellationToken from the
+            dragonfly_comparison.progress module, which can be used to
+            stop the matching step between Room2Ds.
+
+    Returns:
+        A tuple with two elements.
+
+        -   host_model: The loaded host Model with its comparison properties set.
+
+        -   comparison_model: The loaded comparison Model.
+    """
+    models = _load_concurrently((host_model, comparison_model))
+    host_model, comparison_model = models
+    host_model.properties.comparison.set_from_model(
+        comparison_model, reset_unmatched, progress, cancellation)
+    return host_model, comparison_model
+
+
+def _load_concurrently(models):
+    """Load several Models at once, using a thread for each one that is not loaded.
+    """
+    results = [m if isinstance(m, Model) else None for m in models]
+    errors = [None] * len(models)
+
+    def _load(index):
+        try:
+            results[index] = load_model(models[index])
+        except Exception:
+            errors[index] = sys.exc_info()
+
+    threads = []
+    for i, model in enumerate(models):
+        if results[i] is None:
+            thread = threading.Thread(target=_load, args=(i,))
+            thread.daemon = True
+            thread.start()
+            threads.append(thread)
+    for thread in threads:
+        thread.join()
+
+    for error in errors:
+        if error is not None:
+            raise error[1]
+    return results
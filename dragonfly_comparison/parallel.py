@@ -0,0 +1,58 @@
+# coding=utf-8
+"""Functions for evaluating lists of independent jobs over several processes."""
+try:  # multiprocessing is not available in all Python environments
+    import multiprocessing
+except ImportError:  # IronPython
+    multiprocessing = None
+
+_WORKER_DATA = None  # shared data of the jobs, only ever set inside worker processes
+
+
+def map_jobs(function, jobs, cpu_count=None, shared_data=None):
+    """Map a function over a list of jobs, using multiple processes if requested.
+
+    Args:
+        function: A module-level function to be called for each job. It is called
+            with the job as its only argument when shared_data is None and with
+            the job and the shared_data otherwise.
+        jobs: A list of picklable objects for the jobs to be evaluated.
+        cpu_count: An optional integer for the number of processes to be used. If
+            None or 1 (or if multiprocessing is not available), all jobs will be
+            evaluated in the current process. (Default: None).
+        shared_data: Optional picklable data that is needed by all of the jobs.
+            It is sent once to each worker process through the initializer of
+            the process pool rather than with every job. (Default: None).
+
+    Returns:
+        A list of the results of the function, which aligns with the input jobs.
+    """
+    if cpu_count is None or cpu_count <= 1 or multiprocessing is None \
+            or len(jobs) <= 1:
+        if shared_data is None:
+            return [function(job) for job in jobs]
+        return [function(job, shared_data) for job in jobs]
+    if shared_data is None:
+        pool = multiprocessing.Pool(cpu_count)
+        task_function, tasks = function, jobs
+    else:
+        pool = multiprocessing.Pool(cpu_count, _init_worker, (shared_data,))
+        task_function, tasks = _call_with_shared_data, [(function, job) for job in jobs]
+    try:
+        chunk_size = max(len(jobs) // (cpu_count * 4), 1)
+        return pool.map(task_function, tasks, chunk_size)
+    finally:
+        pool.close()
+        pool.join()
+
+
+def _init_worker(shared_data):
+    """Store the data shared by all jobs when a worker process starts."""
+    global _WORKER_DATA
+    _WORKER_DATA = shared_data
+
+
+def _call_with_shared_data(task):
+    """Call the function of a (function, job) task with the shared data of the worker.
+    """
+    function, job = task
+    return function(job, _WORKER_DATA)
@@ -0,0 +1,130 @@
+# coding=utf-8
+"""Progress reporting and cooperative cancellation for long comparison operations."""
+import time
+
+
+class CancellationToken(object):
+    """A token that can be used to cancel a long comparison operation.
+
+    The token is passed to a model-level comparison method and the cancel method
+    can be called from another thread (eg. a GUI thread) to stop the operation.
+    Operations check the token between Room2Ds such that each Room2D is either
+    fully processed or left untouched.
+
+    Properties:
+        * is_cancelled
+    """
+    __slots__ = ('_is_cancelled',)
+
+    def __init__(self):
+        """Initialize CancellationToken."""
+        self._is_cancelled = False
+
+    @property
+    def is_cancelled(self):
+        """Get a boolean for whether cancellation has been requested."""
+        return self._is_cancelled
+
+    def cancel(self):
+        """Request the cancellation of the operations using this token."""
+        self._is_cancelled = True
+
+    def ToString(self):
+        return self.__repr__()
+
+    def __repr__(self):
+        return 'Cancellation Token: [cancelled: {}]'.format(self._is_cancelled)
+
+
+class ProgressTracker(object):
+    """Object used to report the progress of an operation over many Room2Ds.
+
+    Args:
+        total: An integer for the total number of Room2Ds to be processed.
+        callback: An optional function to be called with the progress of the
+            operation. It will be called with four arguments (processed, total,
+            elapsed, throughput), which are the number of processed Room2Ds, the
+            total number of Room2Ds, the elapsed time in seconds and the number
+            of Room2Ds processed per second. (Default: None).
+        cancellation: An optional CancellationToken that can be used to stop the
+            operation between Room2Ds. (Default: None).
+        interval: A number for the minimum time in seconds between calls to the
+            callback. The callback is always called once the last Room2D has
+            been processed or the operation is cancelled. (Default: 0.1).
+
+    Properties:
+        * total
+        * processed
+        * elapsed
+        * throughput
+        * is_cancelled
+    """
+    __slots__ = ('_total', '_processed', '_callback', '_cancellation', '_interval',
+                 '_start_time', '_last_report')
+
+    def __init__(self, total, callback=None, cancellation=None, interval=0.1):
+        """Initialize ProgressTracker."""
+        self._total = total
+        self._processed = 0
+        self._callback = callback
+        self._cancellation = cancellation
+        self._interval = interval
+        self._start_time = self._last_report = time.time()
+
+    @property
+    def total(self):
+        """Get an integer for the total number of Room2Ds to be processed."""
+        return self._total
+
+    @property
+    def processed(self):
+        """Get an integer for the number of Room2Ds processed so far."""
+        return self._processed
+
+    @property
+    def elapsed(self):
+        """Get the number of seconds since the operation started."""
+        return time.time() - self._start_time
+
+    @property
+    def throughput(self):
+        """Get the number of Room2Ds processed per second."""
+        elapsed = self.elapsed
+        return self._processed / elapsed if elapsed > 0 else 0.0
+
+    @property
+    def is_cancelled(self):
+        """Get a boolean for whether the operation should be stopped."""
+        return self._cancellation is not None and self._cancellation.is_cancelled
+
+    def step(self, count=1):
+        """Record that one or more Room2Ds have been processed.
+
+        Args:
+            count: An integer for the number of Room2Ds processed. (Default: 1).
+        """
+        self._processed += count
+        if self._callback is None:
+            return
+        now = time.time()
+        if now - self._last_report >= self._interval or \
+                self._processed >= self._total:
+            self._last_report = now
+            self._report(now)
+
+    def finish(self):
+        """Report the final progress if the operation ended before the total."""
+        if self._callback is not None and self._processed < self._total:
+            self._report(time.time())
+
+    def _report(self, now):
+        """Call the callback with the current progress."""
+        elapsed = now - self._start_time
+        throughput = self._processed / elapsed if elapsed > 0 else 0.0
+        self._callback(self._processed, self._total, elapsed, throughput)
+
+    def ToString(self):
+        return self.__repr__()
+
+    def __repr__(self):
+        return 'Progress Tracker: [{}/{}]'.format(self._processed, self._total)
@@ -1,60 +1,403 @@
 # coding=utf-8
 """Model Comparison Properties."""
+import re
+import sys
+import zipfile
+from array import array
+
 from dragonfly.extensionutil import model_extension_dicts
 
+from .room2d import Room2DComparisonProperties, COMPARISON_METRICS, BASE_METRICS, \
+    _WRITE_LOCK, _floor_change_loops, _floor_change_result, \
+    _check_floor_geometries, _check_windows_list, _check_skylights
+from ..progress import ProgressTracker
+from ..footprint import read_footprints
+from ..raster import rasterize_floors
+from ..parallel import map_jobs
+
+MATCH_KEYS = ('identifier', 'story_display_name', 'normalized_name')
+
 
 class ModelComparisonProperties(object):
     """Comparison Properties for Dragonfly Model.
 
+    The metric methods of this object only read the comparison states of the
+    Room2Ds and they can be called from several threads while the comparison
+    attributes are being edited (see Room2DComparisonProperties). The methods
+    that record or restore snapshots edit this object and they should only be
+    called from one thread at a time.
+
     Args:
         host: A dragonfly_core Model object that hosts these properties.
 
     Properties:
         * host
+        * snapshot_count
+        * snapshot_index
     """
 
     def __init__(self, host):
         """Initialize Model Comparison properties."""
         self._host = host
+        self._snapshots = []  # dicts of the old and new room states of each snapshot
+        self._snapshot_index = -1
+        self._snapshot_states = {}  # the room states at the snapshot_index
+        self._snapshot_rooms = {}  # the host Room2Ds recorded by the last snapshot
+        self._story_rollups = {}  # cached room metrics and totals of each Story
 
     @property
     def host(self):
         """Get the Model object hosting these properties."""
         return self._host
 
-    def set_from_model(self, comparison_model, reset_unmatched=True):
+    @property
+    def snapshot_count(self):
+        """Get an integer for the number of comparison snapshots that are recorded."""
+        return len(self._snapshots)
+
+    @property
+    def snapshot_index(self):
+        """Get an integer for the index of the current snapshot (-1 if none exist)."""
+        return self._snapshot_index
+
+    def save_snapshot(self):
+        """Record the current comparison state of all Room2Ds as a snapshot.
+
+        Snapshots use structural sharing such that each snapshot only stores
+        references to the old and new comparison states of the Room2Ds that
+        changed since the current snapshot. The comparison geometry and parameters
+        are immutable so these references are shared with the Room2Ds and the
+        other snapshots. Any snapshots after the current snapshot_index (eg. those
+        that were undone) are discarded.
+
+        Returns:
+            An integer for the index of the new snapshot.
+        """
+        del self._snapshots[self._snapshot_index + 1:]
+        changes, rooms = {}, {}
+        for room, state in self._room_states():
+            identifier = room.identifier
+            rooms[identifier] = room
+            old_state = self._snapshot_states.get(identifier)
+            if old_state is None or not _same_state(old_state, state):
+                changes[identifier] = (old_state, state)
+        self._snapshots.append(changes)
+        for identifier, (_, state) in changes.items():
+            self._snapshot_states[identifier] = state
+        self._snapshot_rooms = rooms
+        self._snapshot_index = len(self._snapshots) - 1
+        return self._snapshot_index
+
+    def restore_snapshot(self, index):
+        """Restore the comparison state of all Room2Ds to that of a snapshot.
+
+        The changes that each snapshot recorded are applied (or reverted) between
+        the current snapshot_index and the target snapshot such that only the
+        Room2Ds that changed between the two snapshots are re-assigned. The time
+        of this method is proportional to the number of these Room2Ds and no
+        comparison geometry or parameters are rebuilt or parsed in the process.
+        Note that any edits that were not recorded with save_snapshot are only
+        replaced for the Room2Ds that changed between the two snapshots.
+
+        Args:
+            index: An integer for the index of the snapshot to be restored.
+        """
+        count = len(self._snapshots)
+        assert -count <= index < count, 'Snapshot index {} is out of range for ' \
+            '{} snapshots.'.format(index, count)
+        index = index % count
+        # collect the states of the rooms that changed between the two snapshots
+        targets = {}
+        if index > self._snapshot_index:  # apply the changes of the later snapshots
+            for changes in self._snapshots[self._snapshot_index + 1:index + 1]:
+                for identifier, (_, new_state) in changes.items():
+                    targets[identifier] = new_state
+        else:  # revert the changes of the current snapshot and those before it
+            for changes in reversed(self._snapshots[index + 1:self._snapshot_index + 1]):
+                for identifier, (old_state, _) in changes.items():
+                    targets[identifier] = old_state
+        # assign the states of the target snapshot
+        for identifier, target in targets.items():
+            if target is None:  # the room was not in the model at the snapshot
+                self._snapshot_states.pop(identifier, None)
+                continue
+            room = self._snapshot_rooms.get(identifier)
+            if room is not None:
+                room.properties.comparison._set_comparison_state(target)
+            self._snapshot_states[identifier] = target
+        self._snapshot_index = index
+
+    def undo_snapshot(self):
+        """Restore the snapshot before the current snapshot_index.
+
+        Returns:
+            An integer for the index of the restored snapshot.
+        """
+        assert self._snapshot_index > 0, 'There is no earlier snapshot to restore.'
+        self.restore_snapshot(self._snapshot_index - 1)
+        return self._snapshot_index
+
+    def redo_snapshot(self):
+        """Restore the snapshot after the current snapshot_index.
+
+        Returns:
+            An integer for the index of the restored snapshot.
+        """
+        assert self._snapshot_index < len(self._snapshots) - 1, \
+            'There is no later snapshot to restore.'
+        self.restore_snapshot(self._snapshot_index + 1)
+        return self._snapshot_index
+
+    def set_from_model(self, comparison_model, reset_unmatched=True,
+                       progress=None, cancellation=None, match_keys=('identifier',)):
         """Set the attributes of Room2DComparisonProperties using another Model.
 
         Args:
             comparison_model: A dragonfly Model to which the host Model is
-                being compared. Room2Ds in the host model with identifiers
-                matching the comparison_model model will have their comparison
+                being compared. Room2Ds in the host model that are matched with
+                a Room2D of the comparison_model will have their comparison
                 properties set using them.
             reset_unmatched: A boolean to note whether rooms in the host model
                 should have their comparison room properties reset if they are not
                 matched with any room in the comparison_model. (Default: True).
+            progress: An optional function to be called with the progress of the
+                operation. It will be called with four arguments (processed, total,
+                elapsed, throughput). See the ProgressTracker class of the
+                dragonfly_comparison.progress module for more information.
+            cancellation: An optional CancellationToken from the
+                dragonfly_comparison.progress module, which can be used to
+                stop the operation between Room2Ds.
+            match_keys: A list of the keys used to match the host Room2Ds with
+                those of the comparison_model, which are tried in order. The key
+                that matched each Room2D is recorded under the match_key of its
+                Room2DComparisonProperties. Choose from the following.
+                (Default: identifier).
+
+                * identifier - The Room2D identifier. If several Room2Ds of
+                    the comparison_model share an identifier, the first of
+                    them is used.
+                * story_display_name - The display_name of the Room2D along with
+                    the display_name of its parent Story. Names that are shared by
+                    several comparison Room2Ds are ambiguous and are not used.
+                * normalized_name - The display_name of the Room2D in lower case
+                    and without spaces or punctuation. Names that are shared by
+                    several comparison Room2Ds are ambiguous and are not used.
         """
-        for base_room in self.host.room_2ds:
-            for comp_room in comparison_model.room_2ds:
-                if base_room.identifier == comp_room.identifier:
-                    base_room.properties.comparison.set_from_room_2d(comp_room)
-                    break
-            else:
-                if reset_unmatched:
-                    base_room.properties.comparison.reset()
+        rooms = self.host.room_2ds
+        matches = self._match_rooms(rooms, comparison_model, match_keys)
+        tracker = ProgressTracker(len(rooms), progress, cancellation)
+        for base_room, match in zip(rooms, matches):
+            if tracker.is_cancelled:
+                break
+            comp_prop = base_room.properties.comparison
+            if match is not None:
+                comp_prop.set_from_room_2d(match[0])
+                comp_prop.match_key = match[1]
+            elif reset_unmatched:
+                comp_prop.reset()
+            tracker.step()
+        tracker.finish()
+
+    def set_floors_from_footprints(self, footprints, progress=None,
+                                   cancellation=None):
+        """Set the comparison floor geometry of Room2Ds using 2D footprint data.
+
+        The footprints are consumed one at a time and each matching Room2D has
+        its comparison_floor_geometry set in the same way as the floor_boundary
+        of the Room2DComparisonProperties dictionary, using the floor height of
+        the host Room2D. All other comparison attributes of the Room2Ds are
+        left as they are, as are the Room2Ds without a footprint.
+
+        Args:
+            footprints: Either a path to a file of room footprints or an iterable
+                of (identifier, boundary, holes) tuples, where the identifier
+                is that of a Room2D in the host Model, the boundary is a list
+                of (x, y) coordinates and the holes are a list of lists of (x, y)
+                coordinates (or None). See the footprint module for the
+                acceptable file formats. Footprints with identifiers that are
+                not in the host Model are ignored.
+            progress: An optional function to be called with the progress of the
+                operation. It will be called with four arguments (processed, total,
+                elapsed, throughput), where processed is the number of Room2Ds
+                that have been set and total is the number of Room2Ds in the model.
+                See the ProgressTracker class of the dragonfly_comparison.progress
+                module for more information.
+            cancellation: An optional CancellationToken from the
+                dragonfly_comparison.progress module, which can be used to
+                stop the operation between Room2Ds.
+
+        Returns:
+            An integer for the number of Room2Ds that had their comparison floor
+            geometry set.
+        """
+        if isinstance(footprints, (str, type(u''))):  # file path
+            footprints = read_footprints(footprints)
+        rooms = {room.identifier: room for room in self.host.room_2ds}
+        tracker = ProgressTracker(len(rooms), progress, cancellation)
+        for identifier, boundary, holes in footprints:
+            if tracker.is_cancelled:
+                break
+            try:
+                room = rooms[identifier]
+            except KeyError:
+                continue
+            floor_data = {'floor_boundary': boundary}
+            if holes:
+                floor_data['floor_holes'] = holes
+            room.properties.comparison.apply_properties_from_dict(floor_data)
+            tracker.step()
+        tracker.finish()
+        return tracker.processed
+
+    def assign_comparisons(self, rooms, floor_geometries=None, windows=None,
+                           skylights=None, validate=True):
+        """Assign the comparison attributes of many Room2Ds at once.
+
+        This is equivalent to setting the comparison_floor_geometry,
+        comparison_windows and comparison_skylight of each Room2D but the inputs
+        are validated once for all Room2Ds and they are assigned in a single
+        loop, holding the lock for edits to the comparison states only once.
+        So the Room2Ds are all updated together with respect to other threads
+        that edit comparison states.
 
-    def reset(self):
-        """Reset the comparison attributes using the host Model."""
-        for base_room in self.host.room_2ds:
+        Args:
+            rooms: A list of Room2Ds in the host Model or text for their identifiers.
+            floor_geometries: A list of horizontal Face3D for the comparison floor
+                geometry of each of the rooms. Items can be None to remove the
+                comparison floor geometry of a room. If None, the comparison
+                floor geometries of the rooms are left as they are. (Default: None).
+            windows: A list with a list of WindowParameters (or None) for each
+                of the rooms. If None, the comparison windows of the rooms are left
+                as they are. (Default: None).
+            skylights: A list with a SkylightParameters (or None) for each of
+                the rooms. If None, the comparison skylights of the rooms are
+                left as they are. (Default: None).
+            validate: A boolean to note whether the inputs should be checked
+                and converted in the same way as the comparison setters of the
+                Room2Ds. This can be set to False for inputs from trusted
+                sources, which are assigned as they are. In this case, the
+                floor_geometries must already be Face3Ds with an upward normal
+                and a plane with the global origin (like those of another
+                Room2DComparisonProperties) and the windows must be tuples.
+                (Default: True).
+        """
+        rooms = self._rooms_from_input(rooms)
+        inputs = [floor_geometries, windows, skylights]
+        for i, values in enumerate(inputs):
+            if values is not None:
+                assert len(values) == len(rooms), 'Expected {} comparison values ' \
+                    'for the rooms. Got {}.'.format(len(rooms), len(values))
+                inputs[i] = list(values)
+        if validate:
+            for i, check in enumerate(
+                    (_check_floor_geometries, _check_windows_list, _check_skylights)):
+                if inputs[i] is not None:
+                    inputs[i] = check(inputs[i])
+
+        with _WRITE_LOCK:
+            if None not in inputs:  # every attribute is replaced
+                for room, state in zip(rooms, zip(*inputs)):
+                    room.properties.comparison._set_comparison_state(state)
+                return
+            for i, room in enumerate(rooms):
+                comp_prop = room.properties.comparison
+                state = comp_prop._comparison_state()
+                comp_prop._set_comparison_state(tuple(
+                    state[j] if values is None else values[i]
+                    for j, values in enumerate(inputs)))
+
+    def query_metrics(self, comparison_model, room_filter=None, rooms=None,
+                      include_unmatched=True, match_keys=('identifier',)):
+        """Get a generator of comparison metrics for a selected subset of Room2Ds.
+
+        Only the selected Room2Ds are matched with the comparison_model and
+        evaluated. Nothing is computed until the generator is iterated and the
+        comparison properties of the host Model are not edited in the process.
+
+        Args:
+            comparison_model: A dragonfly Model to which the host Model is
+                being compared.
+            room_filter: An optional function that takes a Room2D and returns
+                True if the comparison metrics of the Room2D should be
+                evaluated. For example, lambda r: r.floor_area > 10. If None,
+                all Room2Ds will be evaluated. (Default: None).
+            rooms: An optional list of Room2Ds in the host Model to be evaluated.
+                For example, this can be the room_2ds of a single Story or
+                Building. If None, all Room2Ds of the host Model will be
+                used. (Default: None).
+            include_unmatched: A boolean to note whether Room2Ds that are not
+                matched with any room in the comparison_model should be included
+                in the results. These will have metrics that compare the Room2D
+                to itself. (Default: True).
+            match_keys: A list of the keys used to match the host Room2Ds with
+                those of the comparison_model, which are tried in order. See the
+                set_from_model method for the acceptable keys.
+                (Default: identifier).
+
+        Returns:
+            A generator of metric dictionaries, each of which has the same keys
+            as Room2DComparisonProperties.comparison_metrics along with an
+            "identifier" key for the Room2D identifier and a "match_key" key for
+            the key that matched the Room2D (None if it was not matched).
+        """
+        rooms = self.host.room_2ds if rooms is None else rooms
+        if room_filter is not None:
+            rooms = [room for room in rooms if room_filter(room)]
+        matches = self._match_rooms(rooms, comparison_model, match_keys)
+        for room, match in zip(rooms, matches):
+            comp_prop = Room2DComparisonProperties(room)
+            if match is not None:
+                comp_prop.set_from_room_2d(match[0])
+            elif not include_unmatched:
+                continue
+            metrics = comp_prop.comparison_metrics()
+            metrics['identifier'] = room.identifier
+            metrics['match_key'] = match[1] if match is not None else None
+            yield metrics
+
+    def reset(self, progress=None, cancellation=None):
+        """Reset the comparison attributes using the host Model.
+
+        Args:
+            progress: An optional function to be called with the progress of the
+                operation. It will be called with four arguments (processed, total,
+                elapsed, throughput). See the ProgressTracker class of the
+                dragonfly_comparison.progress module for more information.
+            cancellation: An optional CancellationToken from the
+                dragonfly_comparison.progress module, which can be used to
+                stop the operation between Room2Ds.
+        """
+        rooms = self.host.room_2ds
+        tracker = ProgressTracker(len(rooms), progress, cancellation)
+        for base_room in rooms:
+            if tracker.is_cancelled:
+                break
             base_room.properties.comparison.reset()
+            tracker.step()
+        tracker.finish()
 
-    def apply_properties_from_dict(self, data):
+    def apply_properties_from_dict(self, data, progress=None, cancellation=None,
+                                   lazy=True):
         """Apply the comparison properties of a dictionary to the host Model of this object.
 
         Args:
             data: A dictionary representation of an entire dragonfly-core Model.
                 Note that this dictionary must have ModelComparisonProperties in order
                 for this method to successfully apply the comparison properties.
+            progress: An optional function to be called with the progress of the
+                operation. It will be called with four arguments (processed, total,
+                elapsed, throughput). See the ProgressTracker class of the
+                dragonfly_comparison.progress module for more information.
+            cancellation: An optional CancellationToken from the
+                dragonfly_comparison.progress module, which can be used to
+                stop the operation between Room2Ds.
+            lazy: Boolean to note whether each Room2D should keep its comparison
+                dictionary and only parse it into geometry and parameters the
+                first time that its comparison attributes are accessed. This
+                means that Models can be loaded without paying the cost of
+                re-building the comparison objects if they are never used.
+                Set to False to parse all dictionaries upon loading such that any
+                invalid data raises an exception here. (Default: True).
         """
         assert 'comparison' in data['properties'], \
             'Dictionary possesses no ModelComparisonProperties.'
@@ -62,9 +405,294 @@ class ModelComparisonProperties(object):
         _, _, room2d_c_dicts, _ = \
             model_extension_dicts(data, 'comparison', [], [], [], [])
         # apply comparison properties to objects using the comparison property dictionaries
-        for room, r_dict in zip(self.host.room_2ds, room2d_c_dicts):
+        rooms = self.host.room_2ds
+        tracker = ProgressTracker(len(rooms), progress, cancellation)
+        for room, r_dict in zip(rooms, room2d_c_dicts):
+            if tracker.is_cancelled:
+                break
             if r_dict is not None:
-                room.properties.comparison.apply_properties_from_dict(r_dict)
+                room.properties.comparison.apply_properties_from_dict(r_dict, lazy)
+            tracker.step()
+        tracker.finish()
+
+    def metric_columns(self, metrics=None, progress=None, cancellation=None):
+        """Get the comparison metrics of all Room2Ds as typed columns.
+
+        Each column is a contiguous array of 64-bit floats that supports the
+        buffer protocol. So the columns can be consumed without copying by
+        libraries like NumPy (eg. numpy.frombuffer), pandas and Arrow.
+
+        Args:
+            metrics: An optional list of comparison metric names to be included
+                in the columns. If None, all metrics in the COMPARISON_METRICS
+                of the room2d module will be included. (Default: None).
+            progress: An optional function to be called with the progress of the
+                operation. It will be called with four arguments (processed, total,
+                elapsed, throughput). See the ProgressTracker class of the
+                dragonfly_comparison.progress module for more information.
+            cancellation: An optional CancellationToken from the
+                dragonfly_comparison.progress module, which can be used to
+                stop the operation between Room2Ds. If cancelled, the columns will only
+                include the Room2Ds processed before the cancellation.
+
+        Returns:
+            A tuple with two elements.
+
+            -   identifiers: A list of the identifiers of all Room2Ds in the
+                host Model, which aligns with the values of the columns.
+
+            -   columns: A dictionary with metric names as keys and arrays of
+                float64 values as values.
+        """
+        metrics = self._check_metrics(metrics)
+        identifiers = []
+        columns = [array('d') for _ in metrics]
+        rooms = self.host.room_2ds
+        tracker = ProgressTracker(len(rooms), progress, cancellation)
+        for room in rooms:
+            if tracker.is_cancelled:
+                break
+            room_metrics = room.properties.comparison.comparison_metrics()
+            identifiers.append(room.identifier)
+            for col, metric in zip(columns, metrics):
+                col.append(room_metrics[metric])
+            tracker.step()
+        tracker.finish()
+        return identifiers, dict(zip(metrics, columns))
+
+    def to_csv(self, file_path, metrics=None):
+        """Write the comparison metrics of all Room2Ds to a CSV file.
+
+        The first column of the file contains the Room2D identifiers and each
+        following column contains one of the metrics.
+
+        Args:
+            file_path: Path to a CSV file to be written.
+            metrics: An optional list of comparison metric names to be written.
+                If None, all metrics will be written. (Default: None).
+
+        Returns:
+            The path to the CSV file.
+        """
+        metrics = self._check_metrics(metrics)
+        identifiers, columns = self.metric_columns(metrics)
+        rows = [','.join(('identifier',) + tuple(metrics))]
+        data_cols = [columns[m] for m in metrics]
+        for i, identifier in enumerate(identifiers):
+            vals = ','.join(repr(col[i]) for col in data_cols)
+            rows.append('{},{}'.format(identifier, vals))
+        with open(file_path, 'w') as outf:
+            outf.write('\n'.join(rows) + '\n')
+        return file_path
+
+    def to_npz(self, file_path, metrics=None):
+        """Write the comparison metrics of all Room2Ds to a NumPy NPZ file.
+
+        The file contains one array named "identifier" with the Room2D identifiers
+        and one float64 array for each metric. It can be loaded with numpy.load
+        but NumPy is not required to write it.
+
+        Args:
+            file_path: Path to an NPZ file to be written.
+            metrics: An optional list of comparison metric names to be written.
+                If None, all metrics will be written. (Default: None).
+
+        Returns:
+            The path to the NPZ file.
+        """
+        metrics = self._check_metrics(metrics)
+        identifiers, columns = self.metric_columns(metrics)
+        with zipfile.ZipFile(file_path, 'w', zipfile.ZIP_STORED) as npz:
+            npz.writestr('identifier.npy', _text_npy_bytes(identifiers))
+            for metric in metrics:
+                npz.writestr('{}.npy'.format(metric), _float_npy_bytes(columns[metric]))
+        return file_path
+
+    def segment_differences(self, tolerance=None, angle_tolerance=None):
+        """Get the floor segment differences for all Room2Ds of the host Model.
+
+        Args:
+            tolerance: The maximum distance between the line of a host segment
+                and the midpoint of a comparison segment for them to be paired.
+                If None, the Model tolerance will be used. (Default: None).
+            angle_tolerance: The max angle in degrees that the directions of two
+                segments can differ from one another for them to be paired. If
+                None, the Model angle_tolerance will be used. (Default: None).
+
+        Returns:
+            A dictionary with Room2D identifiers as keys and lists of segment
+            differences as values. See the segment_differences method of the
+            Room2DComparisonProperties for a description of each list.
+        """
+        tol = tolerance if tolerance is not None else self.host.tolerance
+        a_tol = angle_tolerance if angle_tolerance is not None \
+            else self.host.angle_tolerance
+        return {room.identifier: room.properties.comparison.segment_differences(
+                tol, a_tol) for room in self.host.room_2ds}
+
+    def floor_changes(self, tolerance=None, angle_tolerance=None, cpu_count=None):
+        """Get the floor regions that were added and removed for all Room2Ds.
+
+        Room2Ds with floors that are identical to their comparison are skipped
+        and Room2Ds with floors that do not overlap their comparison use the
+        whole floors as the changed regions. Only the remaining Room2Ds have
+        their floors intersected with polygon booleans, which can be run in
+        several processes.
+
+        Args:
+            tolerance: The minimum difference between coordinate values at which
+                vertices are considered distinct from one another. If None, the
+                Model tolerance will be used. (Default: None).
+            angle_tolerance: The max angle in degrees that the floor normals can
+                differ from one another for them to be considered coplanar. If
+                None, the Model angle_tolerance will be used. (Default: None).
+            cpu_count: An optional integer for the number of processes to be used
+                to evaluate the polygon booleans. If None or 1, all booleans will
+                be evaluated in the current process. (Default: None).
+
+        Returns:
+            A dictionary with Room2D identifiers as keys and dictionaries of floor
+            changes as values. See the floor_changes method of the
+            Room2DComparisonProperties for a description of each dictionary.
+        """
+        tol = tolerance if tolerance is not None else self.host.tolerance
+        a_tol = angle_tolerance if angle_tolerance is not None \
+            else self.host.angle_tolerance
+        rooms = self.host.room_2ds
+        jobs, job_rooms, changes = [], [], {}
+        for room in rooms:
+            job = room.properties.comparison._floor_change_job(tol, a_tol)
+            if job is None:
+                changes[room.identifier] = _floor_change_result([], [], 0)
+            else:
+                jobs.append(job)
+                job_rooms.append(room)
+        results = map_jobs(_floor_change_loops, jobs, cpu_count)
+        for room, (added, removed) in zip(job_rooms, results):
+            changes[room.identifier] = \
+                _floor_change_result(added, removed, room.floor_height)
+        return changes
+
+    def story_change_grids(self, resolution=1.0):
+        """Get a raster grid of floor plate changes for each Story of the host Model.
+
+        Each grid covers the host floor_geometry and the comparison_floor_geometry
+        of all Room2Ds on the Story and each cell notes whether it is covered by
+        the host floors, the comparison floors or both. Room2Ds without a
+        comparison_floor_geometry use the host floor for the comparison.
+
+        Args:
+            resolution: A number for the dimension of each square cell in model
+                units. (Default: 1).
+
+        Returns:
+            A dictionary with Story identifiers as keys and grid dictionaries
+            as values. See the rasterize_floors function of the
+            dragonfly_comparison.raster module for a description of each grid.
+        """
+        grids = {}
+        for bldg in self.host.buildings:
+            for story in bldg.unique_stories:
+                host_floors, comp_floors = [], []
+                for room in story.room_2ds:
+                    comp_geo = room.properties.comparison.comparison_floor_geometry
+                    host_floors.append(room.floor_geometry)
+                    comp_floors.append(
+                        comp_geo if comp_geo is not None else room.floor_geometry)
+                grids[story.identifier] = \
+                    rasterize_floors(host_floors, comp_floors, resolution)
+        return grids
+
+    def orientation_report(self, bin_count=4, north_angle=0):
+        """Get wall and window area differences binned by orientation for the Model.
+
+        The binned areas are computed for each Room2D in a single pass over the
+        Model and they are accumulated into totals for each Story.
+
+        Args:
+            bin_count: An integer for the number of orientation bins. The first
+                bin is always centered on north and the bins proceed clockwise.
+                For example, the default of 4 yields bins for North, East, South
+                and West. (Default: 4).
+            north_angle: A number between -360 and 360 for the counterclockwise
+                difference between the North and the positive Y-axis in degrees.
+                (Default: 0).
+
+        Returns:
+            A dictionary with two keys.
+
+            -   rooms: A dictionary with Room2D identifiers as keys and the
+                output of Room2DComparisonProperties.orientation_areas as values.
+
+            -   stories: A dictionary with Story identifiers as keys and
+                dictionaries of binned areas as values. These have the same
+                keys as the room dictionaries and the values are the sum
+                of all rooms in the Story.
+        """
+        room_report, story_report = {}, {}
+        for bldg in self.host.buildings:
+            for story in bldg.unique_stories:
+                story_areas = {}
+                for room in story.room_2ds:
+                    areas = room.properties.comparison.orientation_areas(
+                        bin_count, north_angle)
+                    room_report[room.identifier] = areas
+                    for key, vals in areas.items():
+                        try:
+                            totals = story_areas[key]
+                        except KeyError:
+                            story_areas[key] = list(vals)
+                            continue
+                        for i, val in enumerate(vals):
+                            totals[i] += val
+                story_report[story.identifier] = story_areas
+        return {'rooms': room_report, 'stories': story_report}
+
+    def rollup_metrics(self):
+        """Get the comparison metrics of the host Model summed by Story and Building.
+
+        The metrics of each Room2D are cached and they are only recomputed for
+        Room2Ds that have been edited since the last call (see the is_stale
+        property of Room2DComparisonProperties). Likewise, the totals of each
+        Story are only recomputed when one of its Room2Ds has changed. So calling
+        this method after editing a few Room2Ds of a large Model only costs
+        the evaluation of the edited Room2Ds and their Stories.
+
+        Returns:
+            A dictionary with two keys.
+
+            -   stories: A dictionary with Story identifiers as keys and metric
+                dictionaries as values. The metric dictionaries have the same
+                keys as Room2DComparisonProperties.comparison_metrics and they
+                are the sum of all Room2Ds in the Story. The percent changes are
+                computed from the summed absolute differences and comparison values.
+
+            -   buildings: A dictionary with Building identifiers as keys and metric
+                dictionaries as values. These are the sum of the Stories in the
+                Building, accounting for the Story multipliers.
+        """
+        story_rollups, story_totals, bldg_totals = {}, {}, {}
+        for bldg in self.host.buildings:
+            bldg_sum = dict.fromkeys(_ADDITIVE_METRICS, 0)
+            for story in bldg.unique_stories:
+                records = tuple(room.properties.comparison._current_metrics()
+                                for room in story.room_2ds)
+                cached = self._story_rollups.get(story.identifier)
+                if cached is not None and len(cached[0]) == len(records) and \
+                        all(r_1 is r_2 for r_1, r_2 in zip(cached[0], records)):
+                    story_sum = cached[1]
+                else:
+                    story_sum = dict.fromkeys(_ADDITIVE_METRICS, 0)
+                    for record in records:
+                        for metric in _ADDITIVE_METRICS:
+                            story_sum[metric] += record[metric]
+                story_rollups[story.identifier] = (records, story_sum)
+                story_totals[story.identifier] = _metrics_from_sums(story_sum)
+                for metric in _ADDITIVE_METRICS:
+                    bldg_sum[metric] += story_sum[metric] * story.multiplier
+            bldg_totals[bldg.identifier] = _metrics_from_sums(bldg_sum)
+        self._story_rollups = story_rollups
+        return {'stories': story_totals, 'buildings': bldg_totals}
 
     def to_dict(self):
         """Return Model comparison properties as a dictionary."""
@@ -80,8 +708,183 @@ class ModelComparisonProperties(object):
         _host = new_host or self._host
         return ModelComparisonProperties(_host)
 
+    def _room_states(self):
+        """Get a list of tuples with each host Room2D and its comparison state."""
+        room_states = []
+        for room in self.host.room_2ds:
+            state = room.properties.comparison._comparison_state()
+            room_states.append((room, state))
+        return room_states
+
+    def _rooms_from_input(self, rooms):
+        """Get a list of host Room2Ds from a list of Room2Ds or their identifiers."""
+        if all(not isinstance(room, (str, type(u''))) for room in rooms):
+            return list(rooms)
+        host_rooms = {room.identifier: room for room in self.host.room_2ds}
+        try:
+            return [host_rooms[room] if isinstance(room, (str, type(u''))) else room
+                    for room in rooms]
+        except KeyError as e:
+            raise ValueError('Room2D "{}" was not found in the model.'.format(e.args[0]))
+
+    @staticmethod
+    def _match_rooms(rooms, comparison_model, match_keys):
+        """Match Room2Ds with those of a comparison Model using a list of keys.
+
+        A hash index of the comparison Room2Ds is built for each key such that
+        the matching time scales linearly with the number of Room2Ds. Each index
+        only holds the keys of the rooms that are still unmatched, which keeps it
+        small when only a subset of the host Room2Ds is matched. Each key is
+        tried for all of the unmatched rooms before the next key is used and
+        each comparison Room2D is matched at most once. Identifiers that are
+        shared by several comparison Room2Ds are matched with the first of them
+        while other keys that are shared are ambiguous and they are not used.
+
+        Args:
+            rooms: A list of host Room2Ds to be matched.
+            comparison_model: A dragonfly Model with the Room2Ds to be matched.
+            match_keys: A list of key names from the MATCH_KEYS.
+
+        Returns:
+            A list that aligns with the input rooms, with a tuple of the matched
+            comparison Room2D and the key name for each matched Room2D and None
+            for each unmatched Room2D.
+        """
+        for key in match_keys:
+            assert key in MATCH_KEYS, 'Match key "{}" is not recognized. ' \
+                'Choose from: {}'.format(key, ', '.join(MATCH_KEYS))
+        comp_rooms = comparison_model.room_2ds
+        matches, used = [None] * len(rooms), set()
+        unmatched = list(range(len(rooms)))
+        for key in match_keys:
+            key_func = _MATCH_KEY_FUNCTIONS[key]
+            room_keys = {r_i: key_func(rooms[r_i]) for r_i in unmatched}
+            index = ModelComparisonProperties._comparison_room_index(
+                comp_rooms, key_func, set(room_keys.values()), key == 'identifier')
+            still_unmatched = []
+            for r_i in unmatched:
+                c_i = index.get(room_keys[r_i])
+                if c_i is None or c_i in used:
+                    still_unmatched.append(r_i)
+                    continue
+                used.add(c_i)
+                matches[r_i] = (comp_rooms[c_i], key)
+            unmatched = still_unmatched
+            if not unmatched:
+                break
+        return matches
+
+    @staticmethod
+    def _comparison_room_index(comp_rooms, key_func, keys, first_match=False):
+        """Get a dictionary of comparison Room2D indices for a set of requested keys.
+
+        Args:
+            comp_rooms: A list of comparison Room2Ds to be indexed.
+            key_func: A function that returns the matching key of a Room2D.
+            keys: A set of the keys to be included in the index. Comparison
+                Room2Ds with other keys are not indexed.
+            first_match: Boolean to note whether keys that are shared by several
+                comparison Room2Ds should have the index of the first of them
+                rather than being ambiguous. (Default: False).
+
+        Returns:
+            A dictionary with the requested keys that were found in the comp_rooms
+            as keys and the indices of the comparison Room2Ds as values. Unless
+            first_match is True, keys that are shared by several comparison
+            Room2Ds have a value of None.
+        """
+        index = {}
+        for c_i, comp_room in enumerate(comp_rooms):
+            c_key = key_func(comp_room)
+            if c_key in keys:
+                if c_key not in index:
+                    index[c_key] = c_i
+                elif not first_match:
+                    index[c_key] = None
+        return index
+
+    @staticmethod
+    def _check_metrics(metrics):
+        """Check that a list of comparison metric names is valid."""
+        if metrics is None:
+            return COMPARISON_METRICS
+        metrics = tuple(metrics)
+        for metric in metrics:
+            assert metric in COMPARISON_METRICS, \
+                'Comparison metric "{}" is not recognized.'.format(metric)
+        return metrics
+
     def ToString(self):
         return self.__repr__()
 
     def __repr__(self):
         return 'Model Comparison Properties: {}'.format(self.host.identifier)
+
+
+_ADDITIVE_METRICS = tuple(
+    base + suffix for base in BASE_METRICS
+    for suffix in ('', '_difference', '_abs_difference'))
+
+
+def _metrics_from_sums(metric_sums):
+    """Get a full metric dictionary from a dictionary of summed additive metrics."""
+    metrics = dict(metric_sums)
+    for base in BASE_METRICS:
+        try:
+            pct_change = \
+                (metric_sums['{}_abs_difference'.format(base)] / metric_sums[base]) * 100
+        except ZeroDivisionError:
+            pct_change = float('inf')
+        metrics['{}_percent_change'.format(base)] = pct_change
+    return metrics
+
+
+def _story_display_name_key(room):
+    """Get a matching key from the display names of a Room2D and its Story."""
+    story = room.parent
+    return (story.display_name if story is not None else None, room.display_name)
+
+
+def _normalized_name_key(room):
+    """Get a matching key from the Room2D display_name in a normalized form."""
+    return _NON_ALPHANUMERIC.sub('', room.display_name.lower())
+
+
+_NON_ALPHANUMERIC = re.compile(r'[\W_]+', re.UNICODE)
+_MATCH_KEY_FUNCTIONS = {
+    'identifier': lambda room: room.identifier,
+    'story_display_name': _story_display_name_key,
+    'normalized_name': _normalized_name_key
+}
+
+
+def _same_state(state_1, state_2):
+    """Check whether two comparison states reference the same objects."""
+    return all(obj_1 is obj_2 for obj_1, obj_2 in zip(state_1, state_2))
+
+
+def _npy_bytes(descr, count, data):
+    """Get the bytes of a one-dimensional NPY file from its data type and data."""
+    header = "{{'descr': '{}', 'fortran_order': False, 'shape': ({},), }}".format(
+        descr, count)
+    # pad the header so that the data starts on a 64-byte boundary
+    header_len = len(header) + 1
+    header += ' ' * ((64 - (10 + header_len) % 64) % 64) + '\n'
+    len_bytes = bytearray((len(header) & 0xFF, len(header) >> 8))
+    return b'\x93NUMPY\x01\x00' + bytes(len_bytes) + header.encode('latin-1') + data
+
+
+def _float_npy_bytes(values):
+    """Get the bytes of an NPY file from an array of 64-bit floats."""
+    if sys.byteorder == 'big':
+        values = array('d', values)
+        values.byteswap()
+    data = values.tobytes() if hasattr(values, 'tobytes') else values.tostring()
+    return _npy_bytes('<f8', len(values), data)
+
+
+def _text_npy_bytes(values):
+    """Get the bytes of an NPY file from a list of text strings."""
+    max_len = max([len(val) for val in values] + [1])
+    data = b''.join(val.ljust(max_len, '\0').encode('utf-32-le') for val in values)
+    return _npy_bytes('<U{}'.format(max_len), len(values), data)
@@ -1,13 +1,23 @@
 # coding=utf-8
 """Room2D Comparison Properties."""
 import math
+import threading
 
+from ladybug_geometry.geometry2d import Point2D, Polygon2D
 from ladybug_geometry.geometry3d import Point3D, Vector3D, Plane, Face3D
-from dragonfly.windowparameter import _WindowParameterBase, _AsymmetricBase
+import ladybug_geometry.boolean as pb
+from dragonfly.windowparameter import _WindowParameterBase
 from dragonfly.skylightparameter import _SkylightParameterBase, DetailedSkylights
 import dragonfly.windowparameter as glzpar
 import dragonfly.skylightparameter as skypar
 
+BASE_METRICS = ('floor_area', 'wall_area', 'wall_sub_face_area', 'roof_sub_face_area',
+                'sub_face_area', 'window_area', 'door_area')
+METRIC_SUFFIXES = ('', '_difference', '_abs_difference', '_percent_change')
+COMPARISON_METRICS = tuple(
+    base + suffix for base in BASE_METRICS for suffix in METRIC_SUFFIXES)
+_WRITE_LOCK = threading.RLock()  # serializes all edits to the comparison states
+
 
 class Room2DComparisonProperties(object):
     """Comparison Properties for Dragonfly Room2D.
@@ -29,6 +39,7 @@ class Room2DComparisonProperties(object):
         * comparison_floor_geometry
         * comparison_windows
         * comparison_skylight
+        * match_key
         * floor_area
         * floor_area_difference
         * floor_area_abs_difference
@@ -57,17 +68,41 @@ class Room2DComparisonProperties(object):
         * door_area_difference
         * door_area_abs_difference
         * door_area_percent_change
+        * is_stale
+
+    Concurrency:
+        The comparison floor geometry, windows and skylight are held together
+        in a single immutable tuple and every edit (including the setters, move,
+        rotate_xy, scale, reset and the lazy parsing of dictionaries) builds a
+        new tuple that replaces the old one in a single assignment. Edits are
+        serialized with a lock while reads take no lock. So any number of
+        threads can read the metrics while another thread edits the comparison
+        attributes and each metric is computed from either the complete old
+        state or the complete new state. Dictionaries are parsed before the lock
+        is taken such that the Room2Ds of a Model can be loaded concurrently and
+        only the assignment of the parsed state is serialized. The
+        comparison_metrics dictionary is computed from one state such that all
+        of its values are consistent with one another, which is not guaranteed
+        when reading several properties one after the other during an edit.
+        The host Room2D is not protected by this model and it should not be
+        edited while metrics are being read.
     """
-    __slots__ = ('_host', '_comparison_floor_geometry', '_comparison_windows',
-                 '_comparison_skylight')
+    __slots__ = ('_host', '_state', '_metrics_cache', '_host_cache', '_pending_dict',
+                 '_match_key')
 
     def __init__(self, host, comparison_floor_geometry=None, comparison_windows=None,
                  comparison_skylight=None):
         """Initialize Room2D Comparison properties."""
         self._host = host
-        self.comparison_floor_geometry = comparison_floor_geometry
-        self.comparison_windows = comparison_windows
-        self.comparison_skylight = comparison_skylight
+        self._metrics_cache = None
+        self._host_cache = None  # host metrics shared by all comparison states
+        self._pending_dict = None  # unparsed dictionary when loaded lazily
+        self._match_key = None
+        self._state = (  # tuple of the floor geometry, windows and skylight
+            _check_floor_geometry(comparison_floor_geometry),
+            _check_windows(comparison_windows),
+            _check_skylight(comparison_skylight)
+        )
 
     @property
     def host(self):
@@ -81,20 +116,14 @@ class Room2DComparisonProperties(object):
         If not set, all properties relating to floor geometry comparison will
         be zero (aka. unchanged).
         """
-        return self._comparison_floor_geometry
+        return self._comparison_state()[0]
 
     @comparison_floor_geometry.setter
     def comparison_floor_geometry(self, value):
-        if value is not None:
-            # process the floor_geometry
-            assert isinstance(value, Face3D), \
-                'Expected ladybug_geometry Face3D. Got {}'.format(type(value))
-            if value.normal.z < 0:  # ensure upward-facing Face3D
-                value = value.flip()
-            # ensure a global 2D origin, which helps in solve adjacency and the dict schema
-            o_pl = Plane(Vector3D(0, 0, 1), Point3D(0, 0, value.plane.o.z))
-            value = Face3D(value.boundary, o_pl, value.holes)
-        self._comparison_floor_geometry = value
+        value = _check_floor_geometry(value)
+        with _WRITE_LOCK:
+            _, windows, skylight = self._comparison_state()
+            self._state = (value, windows, skylight)
 
     @property
     def comparison_windows(self):
@@ -103,18 +132,14 @@ class Room2DComparisonProperties(object):
         If not set, all properties relating to wall sub-face geometry comparison
         will be zero (aka. unchanged).
         """
-        return self._comparison_windows
+        return self._comparison_state()[1]
 
     @comparison_windows.setter
     def comparison_windows(self, value):
-        if value is not None:
-            if not isinstance(value, tuple):
-                value = tuple(value)
-            for val in value:
-                if val is not None:
-                    assert isinstance(val, _WindowParameterBase), \
-                        'Expected Window Parameters. Got {}'.format(type(value))
-        self._comparison_windows = value
+        value = _check_windows(value)
+        with _WRITE_LOCK:
+            floor_geometry, _, skylight = self._comparison_state()
+            self._state = (floor_geometry, value, skylight)
 
     @property
     def comparison_skylight(self):
@@ -123,31 +148,55 @@ class Room2DComparisonProperties(object):
         If not set, all properties relating to roof sub-face geometry comparison
         will be zero (aka. unchanged).
         """
-        return self._comparison_skylight
+        return self._comparison_state()[2]
 
     @comparison_skylight.setter
     def comparison_skylight(self, value):
+        value = _check_skylight(value)
+        with _WRITE_LOCK:
+            floor_geometry, windows, _ = self._comparison_state()
+            self._state = (floor_geometry, windows, value)
+
+    @property
+    def match_key(self):
+        """Get or set text for the key that matched the host with its comparison Room2D.
+
+        This is set by the set_from_model method of the ModelComparisonProperties
+        (eg. identifier, story_display_name, normalized_name) and it is None
+        if the comparison attributes were not set by matching Room2Ds.
+        """
+        return self._match_key
+
+    @match_key.setter
+    def match_key(self, value):
         if value is not None:
-            assert isinstance(value, _SkylightParameterBase), \
-                'Expected Skylight Parameters. Got {}'.format(type(value))
-        self._comparison_skylight = value
+            value = str(value)
+        self._match_key = value
 
     @property
     def floor_segments(self):
         """Get a list of LineSegment3D objects for each wall of the comparison Room."""
         fg = self.comparison_floor_geometry
-        if fg is None:
-            return None
-        return fg.boundary_segments if fg.holes is None else \
-            fg.boundary_segments + tuple(s for hole in fg.hole_segments for s in hole)
+        return _floor_segments(fg) if fg is not None else None
+
+    @property
+    def is_stale(self):
+        """Get a boolean for whether the cached comparison_metrics are out of date.
+
+        This will be True if the comparison_metrics have never been computed or if
+        the floor geometry, floor-to-ceiling height, window parameters, skylight
+        parameters or top exposure of the host Room2D or any of the comparison
+        attributes have been edited since the metrics were last computed.
+        """
+        cache = self._metrics_cache
+        return cache is None or \
+            not _same_state_key(cache[0], self._state_key(self._comparison_state()))
 
     @property
     def floor_area(self):
         """Get a number for the floor area of the Room2D to which the host is compared.
         """
-        if self.comparison_floor_geometry is None:
-            return self.host.floor_area
-        return self.comparison_floor_geometry.area
+        return self._floor_area(self._comparison_state())
 
     @property
     def floor_area_difference(self):
@@ -156,7 +205,7 @@ class Room2DComparisonProperties(object):
         This number will be positive if the floor area increased in the host room
         compared to the comparison room and negative if it decreased.
         """
-        return self.host.floor_area - self.floor_area
+        return self._host_values()['floor_area'] - self.floor_area
 
     @property
     def floor_area_abs_difference(self):
@@ -168,19 +217,13 @@ class Room2DComparisonProperties(object):
     def floor_area_percent_change(self):
         """Get a number between 0 an 100 for the percent change between floor areas.
         """
-        try:
-            return (self.floor_area_abs_difference / self.floor_area) * 100
-        except ZeroDivisionError:
-            return float('inf')
+        return _percent_change(self._host_values()['floor_area'], self.floor_area)
 
     @property
     def wall_area(self):
         """Get a number for the wall area of the Room2D to which the host is compared.
         """
-        segs = self.host.floor_segments if self.comparison_floor_geometry is None \
-            else self.floor_segments
-        ftc = self.host.floor_to_ceiling_height
-        return sum(seg.length * ftc for seg in segs)
+        return self._wall_area(self._comparison_state())
 
     @property
     def wall_area_difference(self):
@@ -189,10 +232,7 @@ class Room2DComparisonProperties(object):
         This number will be positive if the wall area increased in the host room
         compared to the comparison room and negative if it decreased.
         """
-        segs = self.host.floor_segments
-        ftc = self.host.floor_to_ceiling_height
-        host_floor_area = sum(seg.length * ftc for seg in segs)
-        return host_floor_area - self.wall_area
+        return self._host_values()['wall_area'] - self.wall_area
 
     @property
     def wall_area_abs_difference(self):
@@ -204,10 +244,7 @@ class Room2DComparisonProperties(object):
     def wall_area_percent_change(self):
         """Get a number between 0 an 100 for the percent change between wall areas.
         """
-        try:
-            return (self.wall_area_abs_difference / self.wall_area) * 100
-        except ZeroDivisionError:
-            return float('inf')
+        return _percent_change(self._host_values()['wall_area'], self.wall_area)
 
     @property
     def wall_sub_face_area(self):
@@ -215,14 +252,7 @@ class Room2DComparisonProperties(object):
 
         This includes both Apertures and Doors.
         """
-        if self.comparison_windows is None or self.comparison_floor_geometry is None:
-            return self.host.wall_sub_face_area
-        glz_areas = []
-        for seg, glz in zip(self.floor_segments, self.comparison_windows):
-            if glz is not None:
-                area = glz.area_from_segment(seg, self.host.floor_to_ceiling_height)
-                glz_areas.append(area)
-        return sum(glz_areas)
+        return self._wall_sub_face_area(self._comparison_state())
 
     @property
     def wall_sub_face_area_difference(self):
@@ -231,7 +261,7 @@ class Room2DComparisonProperties(object):
         This number will be positive if the sub-face area increased in the host room
         compared to the comparison room and negative if it decreased.
         """
-        return self.host.wall_sub_face_area - self.wall_sub_face_area
+        return self._host_values()['wall_sub_face_area'] - self.wall_sub_face_area
 
     @property
     def wall_sub_face_area_abs_difference(self):
@@ -243,10 +273,8 @@ class Room2DComparisonProperties(object):
     def wall_sub_face_area_percent_change(self):
         """Get a number between 0 an 100 for the percent change between wall sub-face areas.
         """
-        try:
-            return (self.wall_sub_face_area_abs_difference / self.wall_sub_face_area) * 100
-        except ZeroDivisionError:
-            return float('inf')
+        return _percent_change(
+            self._host_values()['wall_sub_face_area'], self.wall_sub_face_area)
 
     @property
     def roof_sub_face_area(self):
@@ -254,11 +282,7 @@ class Room2DComparisonProperties(object):
 
         This includes both Apertures and overhead Doors.
         """
-        if self.host.is_top_exposed and self.comparison_skylight is not None and \
-                self.comparison_floor_geometry is not None:
-            sky_par = self.comparison_skylight
-            return sky_par.area_from_face(self.comparison_floor_geometry)
-        return self.host.roof_sub_face_area
+        return self._roof_sub_face_area(self._comparison_state())
 
     @property
     def roof_sub_face_area_difference(self):
@@ -267,7 +291,7 @@ class Room2DComparisonProperties(object):
         This number will be positive if the sub-face area increased in the host room
         compared to the comparison room and negative if it decreased.
         """
-        return self.host.roof_sub_face_area - self.roof_sub_face_area
+        return self._host_values()['roof_sub_face_area'] - self.roof_sub_face_area
 
     @property
     def roof_sub_face_area_abs_difference(self):
@@ -279,10 +303,8 @@ class Room2DComparisonProperties(object):
     def roof_sub_face_area_percent_change(self):
         """Get a number between 0 an 100 for the percent change between roof sub-face areas.
         """
-        try:
-            return (self.roof_sub_face_area_abs_difference / self.roof_sub_face_area) * 100
-        except ZeroDivisionError:
-            return float('inf')
+        return _percent_change(
+            self._host_values()['roof_sub_face_area'], self.roof_sub_face_area)
 
     @property
     def sub_face_area(self):
@@ -290,7 +312,8 @@ class Room2DComparisonProperties(object):
 
         This includes both Apertures and overhead Doors.
         """
-        return self.wall_sub_face_area + self.roof_sub_face_area
+        state = self._comparison_state()
+        return self._wall_sub_face_area(state) + self._roof_sub_face_area(state)
 
     @property
     def sub_face_area_difference(self):
@@ -299,7 +322,9 @@ class Room2DComparisonProperties(object):
         This number will be positive if the sub-face area increased in the host room
         compared to the comparison room and negative if it decreased.
         """
-        return self.wall_sub_face_area_difference + self.roof_sub_face_area_difference
+        host_vals = self._host_values()
+        return host_vals['wall_sub_face_area'] + host_vals['roof_sub_face_area'] - \
+            self.sub_face_area
 
     @property
     def sub_face_area_abs_difference(self):
@@ -311,10 +336,10 @@ class Room2DComparisonProperties(object):
     def sub_face_area_percent_change(self):
         """Get a number between 0 an 100 for the percent change between sub-face areas.
         """
-        try:
-            return (self.sub_face_area_abs_difference / self.sub_face_area) * 100
-        except ZeroDivisionError:
-            return float('inf')
+        host_vals = self._host_values()
+        return _percent_change(
+            host_vals['wall_sub_face_area'] + host_vals['roof_sub_face_area'],
+            self.sub_face_area)
 
     @property
     def window_area(self):
@@ -322,34 +347,7 @@ class Room2DComparisonProperties(object):
 
         This includes both windows in walls and roofs.
         """
-        # compute the window area
-        if self.comparison_windows is None or self.comparison_floor_geometry is None:
-            segs, win_pars = self.host.floor_segments, self.host.window_parameters
-        else:
-            segs, win_pars = self.floor_segments, self.comparison_windows
-        glz_areas = []
-        for seg, glz in zip(segs, win_pars):
-            if isinstance(glz, _AsymmetricBase):
-                glz = glz.remove_doors()
-            if glz is not None:
-                area = glz.area_from_segment(seg, self.host.floor_to_ceiling_height)
-                glz_areas.append(area)
-        # compute the skylight area
-        if self.host.is_top_exposed:
-            if self.comparison_skylight is not None and \
-                    self.comparison_floor_geometry is not None:
-                sky_par = self.comparison_skylight
-                if isinstance(sky_par, DetailedSkylights):
-                    sky_par = sky_par.remove_doors()
-                if sky_par is not None:
-                    glz_areas.append(sky_par.area_from_face(self.comparison_floor_geometry))
-            else:
-                sky_par = self.host.skylight_parameters
-                if isinstance(sky_par, DetailedSkylights):
-                    sky_par = sky_par.remove_doors()
-                if sky_par is not None:
-                    glz_areas.append(sky_par.area_from_face(self.host.floor_geometry))
-        return sum(glz_areas)
+        return self._comparison_window_door_areas(self._comparison_state())[0]
 
     @property
     def window_area_difference(self):
@@ -358,23 +356,7 @@ class Room2DComparisonProperties(object):
         This number will be positive if the window area increased in the host room
         compared to the comparison room and negative if it decreased.
         """
-        # compute the window area
-        segs, win_pars = self.host.floor_segments, self.host.window_parameters
-        glz_areas = []
-        for seg, glz in zip(segs, win_pars):
-            if isinstance(glz, _AsymmetricBase):
-                glz = glz.remove_doors()
-            if glz is not None:
-                area = glz.area_from_segment(seg, self.host.floor_to_ceiling_height)
-                glz_areas.append(area)
-        # compute the skylight area
-        if self.host.is_top_exposed:
-            sky_par = self.host.skylight_parameters
-            if isinstance(sky_par, DetailedSkylights):
-                sky_par = sky_par.remove_doors()
-            if sky_par is not None:
-                glz_areas.append(sky_par.area_from_face(self.host.floor_geometry))
-        return sum(glz_areas) - self.window_area
+        return self._host_values()['window_area'] - self.window_area
 
     @property
     def window_area_abs_difference(self):
@@ -386,10 +368,7 @@ class Room2DComparisonProperties(object):
     def window_area_percent_change(self):
         """Get a number between 0 an 100 for the percent change between window areas.
         """
-        try:
-            return (self.window_area_abs_difference / self.window_area) * 100
-        except ZeroDivisionError:
-            return float('inf')
+        return _percent_change(self._host_values()['window_area'], self.window_area)
 
     @property
     def door_area(self):
@@ -397,35 +376,7 @@ class Room2DComparisonProperties(object):
 
         This includes both doors in walls and roofs.
         """
-        # compute the window area
-        if self.comparison_windows is None or self.comparison_floor_geometry is None:
-            segs, win_pars = self.host.floor_segments, self.host.window_parameters
-        else:
-            segs, win_pars = self.floor_segments, self.comparison_windows
-        glz_areas = []
-        for seg, glz in zip(segs, win_pars):
-            if isinstance(glz, _AsymmetricBase):
-                glz = glz.remove_windows()
-                if glz is not None:
-                    area = glz.area_from_segment(seg, self.host.floor_to_ceiling_height)
-                    glz_areas.append(area)
-        # compute the skylight area
-        if self.host.is_top_exposed:
-            if self.comparison_skylight is not None and \
-                    self.comparison_floor_geometry is not None:
-                sky_par = self.comparison_skylight
-                if isinstance(sky_par, DetailedSkylights):
-                    sky_par = sky_par.remove_doors()
-                    if sky_par is not None:
-                        glz_areas.append(
-                            sky_par.area_from_face(self.comparison_floor_geometry))
-            else:
-                sky_par = self.host.skylight_parameters
-                if isinstance(sky_par, DetailedSkylights):
-                    sky_par = sky_par.remove_windows()
-                    if sky_par is not None:
-                        glz_areas.append(sky_par.area_from_face(self.host.floor_geometry))
-        return sum(glz_areas)
+        return self._comparison_window_door_areas(self._comparison_state())[1]
 
     @property
     def door_area_difference(self):
@@ -434,23 +385,7 @@ class Room2DComparisonProperties(object):
         This number will be positive if the door area increased in the host room
         compared to the comparison room and negative if it decreased.
         """
-        # compute the door area
-        segs, win_pars = self.host.floor_segments, self.host.window_parameters
-        glz_areas = []
-        for seg, glz in zip(segs, win_pars):
-            if isinstance(glz, _AsymmetricBase):
-                glz = glz.remove_windows()
-                if glz is not None:
-                    area = glz.area_from_segment(seg, self.host.floor_to_ceiling_height)
-                    glz_areas.append(area)
-        # compute the skylight area
-        if self.host.is_top_exposed:
-            sky_par = self.host.skylight_parameters
-            if isinstance(sky_par, DetailedSkylights):
-                sky_par = sky_par.remove_windows()
-                if sky_par is not None:
-                    glz_areas.append(sky_par.area_from_face(self.host.floor_geometry))
-        return sum(glz_areas) - self.door_area
+        return self._host_values()['door_area'] - self.door_area
 
     @property
     def door_area_abs_difference(self):
@@ -462,10 +397,406 @@ class Room2DComparisonProperties(object):
     def door_area_percent_change(self):
         """Get a number between 0 an 100 for the percent change between door areas.
         """
-        try:
-            return (self.door_area_abs_difference / self.door_area) * 100
-        except ZeroDivisionError:
-            return float('inf')
+        return _percent_change(self._host_values()['door_area'], self.door_area)
+
+    def host_metrics(self):
+        """Get a dictionary of the metric values of the host Room2D.
+
+        These are the same host-side values that are used to evaluate all of the
+        difference properties and they do not depend on the comparison attributes.
+        The keys of the dictionary are floor_area, wall_area, wall_sub_face_area,
+        roof_sub_face_area, window_area and door_area.
+
+        The values are cached and they are only recomputed when the host Room2D
+        has been edited since the last call. So they are shared by all of the
+        difference properties and by every comparison state that is assigned
+        to this object (eg. with set_from_room_2d or Model snapshots).
+        """
+        return dict(self._host_values())
+
+    def comparison_metrics(self):
+        """Get a dictionary with all of the comparison metrics of this object.
+
+        This is equivalent to reading each of the metric properties of this object
+        (eg. floor_area, floor_area_difference, floor_area_abs_difference,
+        floor_area_percent_change) but the host and comparison values are only
+        computed once for the whole dictionary. The base metrics in the dictionary
+        are floor_area, wall_area, wall_sub_face_area, roof_sub_face_area,
+        sub_face_area, window_area and door_area and each of them is accompanied
+        by keys for the _difference, _abs_difference and _percent_change. The
+        full list of keys is available in the COMPARISON_METRICS of this module.
+
+        The metrics are cached and they are only recomputed when the host Room2D
+        or the comparison attributes have been edited since the last call.
+        """
+        return dict(self._current_metrics())
+
+    def _current_metrics(self):
+        """Get the cached comparison metrics, recomputing them if they are stale.
+
+        The returned dictionary is the cached object itself so it should not be
+        edited. The same object is returned for as long as the metrics are valid.
+        """
+        state = self._comparison_state()
+        key = self._state_key(state)
+        cache = self._metrics_cache
+        if cache is not None and _same_state_key(cache[0], key):
+            return cache[1]
+        metrics = self._compute_metrics(state)
+        self._metrics_cache = (key, metrics)
+        return metrics
+
+    def _host_values(self):
+        """Get the cached host metrics, recomputing them if the host has been edited.
+
+        The returned dictionary is the cached object itself so it should not be
+        edited. The same object is returned for as long as the host is unchanged.
+        """
+        key = self._host_key()
+        cache = self._host_cache
+        if cache is not None and _same_state_key(cache[0], key):
+            return cache[1]
+        host = self.host
+        window_area, door_area = self._host_window_door_areas()
+        values = {
+            'floor_area': host.floor_area,
+            'wall_area': self._host_wall_area(),
+            'wall_sub_face_area': host.wall_sub_face_area,
+            'roof_sub_face_area': host.roof_sub_face_area,
+            'window_area': window_area,
+            'door_area': door_area
+        }
+        self._host_cache = (key, values)
+        return values
+
+    def _host_key(self):
+        """Get a key for the state of the host Room2D used by the host metrics.
+
+        The geometry and parameter objects are immutable and any edit to them
+        assigns a new object. So the key holds references to these objects, which
+        are compared by identity, along with the numerical host attributes.
+        """
+        host = self.host
+        objects = (host.floor_geometry, host.skylight_parameters) + \
+            host.window_parameters
+        values = (host.floor_to_ceiling_height, host.is_top_exposed)
+        return objects, values
+
+    def _state_key(self, state):
+        """Get a key for the state of the host and comparison used by the metrics."""
+        objects, values = self._host_key()
+        return state + objects, values
+
+    def _compute_metrics(self, state):
+        """Compute a dictionary of all comparison metrics from a comparison state."""
+        host_vals = dict(self._host_values())
+        host_vals['sub_face_area'] = \
+            host_vals['wall_sub_face_area'] + host_vals['roof_sub_face_area']
+        wall_sub_face_area = self._wall_sub_face_area(state)
+        roof_sub_face_area = self._roof_sub_face_area(state)
+        window_area, door_area = self._comparison_window_door_areas(state)
+        comp_vals = (
+            ('floor_area', self._floor_area(state)),
+            ('wall_area', self._wall_area(state)),
+            ('wall_sub_face_area', wall_sub_face_area),
+            ('roof_sub_face_area', roof_sub_face_area),
+            ('sub_face_area', wall_sub_face_area + roof_sub_face_area),
+            ('window_area', window_area),
+            ('door_area', door_area)
+        )
+        metrics = {}
+        for metric, comp_val in comp_vals:
+            diff = host_vals[metric] - comp_val
+            metrics[metric] = comp_val
+            metrics['{}_difference'.format(metric)] = diff
+            metrics['{}_abs_difference'.format(metric)] = abs(diff)
+            metrics['{}_percent_change'.format(metric)] = \
+                _percent_change(host_vals[metric], comp_val)
+        return metrics
+
+    def _floor_area(self, state):
+        """Get the comparison floor area from a comparison state."""
+        fg = state[0]
+        return self.host.floor_area if fg is None else fg.area
+
+    def _wall_area(self, state):
+        """Get the comparison wall area from a comparison state."""
+        fg = state[0]
+        segs = self.host.floor_segments if fg is None else _floor_segments(fg)
+        ftc = self.host.floor_to_ceiling_height
+        return sum(seg.length * ftc for seg in segs)
+
+    def _wall_sub_face_area(self, state):
+        """Get the comparison wall sub-face area from a comparison state."""
+        segs, windows = self._comparison_segments(state)
+        if windows is None:
+            return self.host.wall_sub_face_area
+        ftc = self.host.floor_to_ceiling_height
+        glz_areas = []
+        for seg, glz in zip(segs, windows):
+            if glz is not None:
+                glz_areas.append(glz.area_from_segment(seg, ftc))
+        return sum(glz_areas)
+
+    def _roof_sub_face_area(self, state):
+        """Get the comparison roof sub-face area from a comparison state."""
+        fg, _, skylight = state
+        if self.host.is_top_exposed and skylight is not None and fg is not None:
+            return skylight.area_from_face(fg)
+        return self.host.roof_sub_face_area
+
+    def approximate_metrics(self):
+        """Get a quick approximation of the floor, wall and window area metrics.
+
+        The host values are the exact ones of the host_metrics, which are cached
+        and shared with all comparison states. For the comparison, the floor area
+        is computed with the shoelace formula and the wall area is computed from
+        the perimeter and the floor-to-ceiling height, both using the 2D vertex
+        coordinates of the floor geometry without building any segment objects.
+        The window areas of the built-in window and skylight parameter types are
+        evaluated from the segment lengths and floor areas alone. Any other
+        parameter types are estimated as half of the wall or roof area they are
+        applied to, with an error bound of the other half. Use the
+        comparison_metrics method for the exact computation.
+
+        Returns:
+            A dictionary with the following keys.
+
+            -   floor_area: The comparison floor area.
+
+            -   floor_area_difference: The difference between the host and
+                comparison floor area.
+
+            -   wall_area: The comparison wall area.
+
+            -   wall_area_difference: The difference between the host and
+                comparison wall area.
+
+            -   window_area: The estimated comparison window area.
+
+            -   window_area_difference: The estimated difference between the host
+                and comparison window area.
+
+            -   max_error: The maximum absolute error of the window area
+                difference. The floor and wall areas are only subject to
+                floating point error.
+        """
+        host, ftc = self.host, self.host.floor_to_ceiling_height
+        fg, comp_windows, comp_skylight = self._comparison_state()
+        host_vals = self._host_values()  # exact host values shared with the metrics
+        host_area, host_wall = host_vals['floor_area'], host_vals['wall_area']
+        host_win = host_vals['window_area']
+        if fg is None:  # the comparison is the host
+            comp_area, comp_wall, comp_win, error = host_area, host_wall, host_win, 0
+        else:
+            comp_area, comp_lengths = _floor_area_lengths(fg)
+            comp_wall = sum(comp_lengths) * ftc
+            if comp_windows is None:  # the host windows are used on the host walls
+                comp_win, error = host_win - self._host_skylight_area(), 0
+            else:
+                comp_win, error = _approximate_window_area(
+                    comp_lengths, comp_windows, ftc)
+            if host.is_top_exposed:
+                if comp_skylight is not None:
+                    c_sky, c_sky_err = \
+                        _approximate_skylight_area(comp_area, comp_skylight)
+                else:
+                    c_sky, c_sky_err = self._host_skylight_area(), 0
+                comp_win, error = comp_win + c_sky, error + c_sky_err
+
+        return {
+            'floor_area': comp_area,
+            'floor_area_difference': host_area - comp_area,
+            'wall_area': comp_wall,
+            'wall_area_difference': host_wall - comp_wall,
+            'window_area': comp_win,
+            'window_area_difference': host_win - comp_win,
+            'max_error': error
+        }
+
+    def segment_differences(self, tolerance=0.01, angle_tolerance=1.0):
+        """Get the differences between each host floor segment and its comparison.
+
+        Host floor segments are paired with comparison floor segments that are
+        parallel and lie along the same line within the tolerance. Candidate
+        pairs are found with a hash grid of the segment directions and line
+        offsets such that the matching time scales linearly with the number
+        of segments. When several comparison segments are candidates, the one
+        with the closest midpoint is used. Comparison segments that are not
+        paired with any host segment are reported after the host segments such
+        that the sum of the wall_area_difference of all items is equal to the
+        wall_area_difference of this object.
+
+        Args:
+            tolerance: The maximum distance between the line of a host segment
+                and the midpoint of a comparison segment for them to be paired.
+                (Default: 0.01, suitable for objects in meters).
+            angle_tolerance: The max angle in degrees that the directions of two
+                segments can differ from one another for them to be paired.
+                (Default: 1).
+
+        Returns:
+            A list with one tuple for each of the host floor_segments followed by
+            one tuple for each comparison floor segment that is not paired with
+            a host segment. Each tuple has the following five items.
+
+            -   host_index: An integer for the index of the host floor segment.
+                Will be None for comparison segments that are not paired with
+                any host segment (aka. walls that were removed in the host),
+                in which case the differences below are the negative of the
+                comparison values.
+
+            -   comparison_index: An integer for the index of the comparison
+                floor segment that is paired with the host segment. Will be None
+                if no comparison segment was paired with it (aka. walls that
+                were added in the host), in which case the differences below
+                are the full host values.
+
+            -   length_difference: The difference between the host and comparison
+                segment lengths.
+
+            -   wall_area_difference: The difference between the host and
+                comparison wall areas of the segment.
+
+            -   window_area_difference: The difference between the host and
+                comparison window areas of the segment.
+        """
+        host, ftc = self.host, self.host.floor_to_ceiling_height
+        host_segs, host_glz = host.floor_segments, host.window_parameters
+        comp_segs, comp_glz = self._comparison_segments(self._comparison_state())
+
+        # build a grid of the comparison segments using their direction and offset
+        ang_bin = math.radians(angle_tolerance)
+        ang_count = max(int(2 * math.pi / ang_bin), 1) if ang_bin > 0 else 1
+        origin = host.floor_geometry.min  # local origin keeps line offsets small
+        grid = {}
+        for i, seg in enumerate(comp_segs):
+            a_i, o_i = _segment_grid_key(seg, origin, ang_count, tolerance)
+            try:
+                grid[(a_i, o_i)].append(i)
+            except KeyError:
+                grid[(a_i, o_i)] = [i]
+
+        # pair each of the host segments with a comparison segment
+        used, differences = set(), []
+        for h_i, (seg, glz) in enumerate(zip(host_segs, host_glz)):
+            a_i, o_i = _segment_grid_key(seg, origin, ang_count, tolerance)
+            mid, best_i, best_dist = seg.midpoint, None, None
+            for a_n in (a_i - 1, a_i, a_i + 1):
+                for o_n in (o_i - 1, o_i, o_i + 1):
+                    for c_i in grid.get((a_n % ang_count, o_n), ()):
+                        if c_i in used:
+                            continue
+                        c_seg = comp_segs[c_i]
+                        if not _segments_collinear(
+                                seg, c_seg, tolerance, angle_tolerance):
+                            continue
+                        dist = mid.distance_to_point(c_seg.midpoint)
+                        if best_dist is None or dist < best_dist:
+                            best_i, best_dist = c_i, dist
+            host_len = seg.length
+            # the host windows are unchanged when the comparison uses the host glazing
+            host_win = _segment_window_area(glz, seg, ftc) \
+                if comp_glz is not None else 0
+            if best_i is None:
+                differences.append((h_i, None, host_len, host_len * ftc, host_win))
+                continue
+            used.add(best_i)
+            c_seg = comp_segs[best_i]
+            len_diff = host_len - c_seg.length
+            win_diff = host_win - _segment_window_area(comp_glz[best_i], c_seg, ftc) \
+                if comp_glz is not None else 0
+            differences.append((h_i, best_i, len_diff, len_diff * ftc, win_diff))
+
+        # add the comparison segments that were not paired with a host segment
+        for c_i, c_seg in enumerate(comp_segs):
+            if c_i not in used:
+                comp_len = c_seg.length
+                comp_win = _segment_window_area(comp_glz[c_i], c_seg, ftc) \
+                    if comp_glz is not None else 0
+                differences.append((None, c_i, -comp_len, -comp_len * ftc, -comp_win))
+        return differences
+
+    def floor_changes(self, tolerance=0.01, angle_tolerance=1.0):
+        """Get the floor regions that were added and removed between comparison and host.
+
+        Unlike the floor_area_difference, which is a net value, this accounts for
+        rooms that moved or changed shape without changing their floor area. The
+        bounding boxes of the floors are compared first such that polygon
+        booleans are only used when the floors overlap one another.
+
+        Args:
+            tolerance: The minimum difference between coordinate values at which
+                vertices are considered distinct from one another.
+                (Default: 0.01, suitable for objects in meters).
+            angle_tolerance: The max angle in degrees that the floor normals can
+                differ from one another for them to be considered coplanar.
+                (Default: 1).
+
+        Returns:
+            A dictionary with the following keys.
+
+            -   added: A list of Face3D for the floor regions of the host that
+                are not in the comparison floor geometry.
+
+            -   removed: A list of Face3D for the floor regions of the comparison
+                floor geometry that are not in the host.
+
+            -   added_area: A number for the total area of the added regions.
+
+            -   removed_area: A number for the total area of the removed regions.
+        """
+        job = self._floor_change_job(tolerance, angle_tolerance)
+        if job is None:
+            added, removed = [], []
+        else:
+            added, removed = _floor_change_loops(job)
+        return _floor_change_result(added, removed, self.host.floor_height)
+
+    def orientation_areas(self, bin_count=4, north_angle=0):
+        """Get the wall and window area differences binned by facade orientation.
+
+        Args:
+            bin_count: An integer for the number of orientation bins. The first
+                bin is always centered on north and the bins proceed clockwise.
+                For example, the default of 4 yields bins for North, East, South
+                and West. (Default: 4).
+            north_angle: A number between -360 and 360 for the counterclockwise
+                difference between the North and the positive Y-axis in degrees.
+                (Default: 0).
+
+        Returns:
+            A dictionary with the following keys, each of which has a list with
+            one value for each orientation bin.
+
+            -   wall_area: The comparison wall area in each bin.
+
+            -   wall_area_difference: The difference between the host and
+                comparison wall area in each bin.
+
+            -   window_area: The comparison window area in each bin.
+
+            -   window_area_difference: The difference between the host and
+                comparison window area in each bin.
+        """
+        host, ftc = self.host, self.host.floor_to_ceiling_height
+        host_walls, host_wins = \
+            _orientation_bins(host.floor_segments, host.window_parameters,
+                              ftc, bin_count, north_angle)
+        comp_segs, comp_glz = self._comparison_segments(self._comparison_state())
+        if comp_glz is None:  # the host glazing is binned with the host walls
+            comp_walls, _ = _orientation_bins(
+                comp_segs, (None,) * len(comp_segs), ftc, bin_count, north_angle)
+            comp_wins = host_wins
+        else:
+            comp_walls, comp_wins = _orientation_bins(
+                comp_segs, comp_glz, ftc, bin_count, north_angle)
+        return {
+            'wall_area': comp_walls,
+            'wall_area_difference': [h - c for h, c in zip(host_walls, comp_walls)],
+            'window_area': comp_wins,
+            'window_area_difference': [h - c for h, c in zip(host_wins, comp_wins)]
+        }
 
     def set_from_room_2d(self, comparison_room_2d):
         """Set the attributes of this Room2DComparisonProperties using a Room2D.
@@ -473,15 +804,16 @@ class Room2DComparisonProperties(object):
         Args:
             comparison_room_2d: A Room2D to which the host Room2D is being compared.
         """
-        self.comparison_floor_geometry = comparison_room_2d.floor_geometry
-        self.comparison_windows = comparison_room_2d.window_parameters
-        self.comparison_skylight = comparison_room_2d.skylight_parameters
+        self._set_comparison_state((
+            _check_floor_geometry(comparison_room_2d.floor_geometry),
+            _check_windows(comparison_room_2d.window_parameters),
+            _check_skylight(comparison_room_2d.skylight_parameters)
+        ))
+        self._match_key = None
 
     def reset(self):
         """Reset the comparison attributes using the host Room2D."""
-        self.comparison_floor_geometry = self.host.floor_geometry
-        self.comparison_windows = self.host.window_parameters
-        self.comparison_skylight = self.host.skylight_parameters
+        self.set_from_room_2d(self.host)
 
     def restore(self):
         """Get a Room2D with host properties and geometry restored from the comparison.
@@ -494,19 +826,18 @@ class Room2DComparisonProperties(object):
         # grab the relevant properties from the host Room2D
         room_2d_class = self.host.__class__
         identifier = self.host.identifier
-        floor_geo = self.comparison_floor_geometry \
-            if self.comparison_floor_geometry is not None else self.host.floor_geometry
+        comp_floor, comp_windows, comp_skylight = self._comparison_state()
+        floor_geo = comp_floor if comp_floor is not None else self.host.floor_geometry
         ftc = self.host.floor_to_ceiling_height
-        w_par = self.comparison_windows \
-            if self.comparison_windows is not None else self.host.window_parameters
+        w_par = comp_windows if comp_windows is not None else self.host.window_parameters
         ground = self.host.is_ground_contact
         exposed = self.host.is_top_exposed
         new_room = room_2d_class(identifier, floor_geo, ftc, window_parameters=w_par,
                                  is_ground_contact=ground, is_top_exposed=exposed)
 
         # assign any additional properties to the new room
-        if self.comparison_skylight is not None:
-            new_room._skylight_parameters = self.comparison_skylight
+        if comp_skylight is not None:
+            new_room._skylight_parameters = comp_skylight
         new_room._has_floor = self.host._has_floor
         new_room._has_ceiling = self.host._has_ceiling
         new_room._ceiling_plenum_depth = self.host._ceiling_plenum_depth
@@ -526,11 +857,13 @@ class Room2DComparisonProperties(object):
             moving_vec: A ladybug_geometry Vector3D with the direction and distance
                 to move the room.
         """
-        if self.comparison_floor_geometry is not None:
-            self.comparison_floor_geometry = \
-                self.comparison_floor_geometry.move(moving_vec)
-        if isinstance(self.comparison_skylight, DetailedSkylights):
-            self.comparison_skylight = self.comparison_skylight.move(moving_vec)
+        with _WRITE_LOCK:
+            floor_geometry, windows, skylight = self._comparison_state()
+            if floor_geometry is not None:
+                floor_geometry = _check_floor_geometry(floor_geometry.move(moving_vec))
+            if isinstance(skylight, DetailedSkylights):
+                skylight = skylight.move(moving_vec)
+            self._state = (floor_geometry, windows, skylight)
 
     def rotate_xy(self, angle, origin):
         """Rotate these properties counterclockwise in the XY plane by a certain angle.
@@ -540,11 +873,14 @@ class Room2DComparisonProperties(object):
             origin: A ladybug_geometry Point3D for the origin around which the
                 object will be rotated.
         """
-        if self.comparison_floor_geometry is not None:
-            self.comparison_floor_geometry = \
-                self.comparison_floor_geometry.rotate_xy(math.radians(angle), origin)
-        if isinstance(self.comparison_skylight, DetailedSkylights):
-            self.comparison_skylight = self.comparison_skylight.rotate(angle, origin)
+        with _WRITE_LOCK:
+            floor_geometry, windows, skylight = self._comparison_state()
+            if floor_geometry is not None:
+                floor_geometry = _check_floor_geometry(
+                    floor_geometry.rotate_xy(math.radians(angle), origin))
+            if isinstance(skylight, DetailedSkylights):
+                skylight = skylight.rotate(angle, origin)
+            self._state = (floor_geometry, windows, skylight)
 
     def scale(self, factor, origin=None):
         """Scale these properties by a factor from an origin point.
@@ -554,25 +890,25 @@ class Room2DComparisonProperties(object):
             origin: A ladybug_geometry Point3D representing the origin from which
                 to scale. If None, it will be scaled from the World origin (0, 0, 0).
         """
-        # scale the floor geometry
-        if self.comparison_floor_geometry is not None:
-            self.comparison_floor_geometry = \
-                self.comparison_floor_geometry.scale(factor, origin)
-        # scale the window parameters
-        if self.comparison_windows is not None:
-            scaled_windows = []
-            for win_par in self.comparison_windows:
-                s_wp = win_par.scale(factor) if win_par is not None else None
-                scaled_windows.append(s_wp)
-            self.comparison_windows = tuple(scaled_windows)
-        # scale the skylight parameters
-        if self.comparison_skylight is not None:
-            self.comparison_skylight = self.comparison_skylight.scale(factor, origin) \
-                if isinstance(self.comparison_skylight, DetailedSkylights) else \
-                self.comparison_skylight.scale(factor)
+        with _WRITE_LOCK:
+            floor_geometry, windows, skylight = self._comparison_state()
+            # scale the floor geometry
+            if floor_geometry is not None:
+                floor_geometry = \
+                    _check_floor_geometry(floor_geometry.scale(factor, origin))
+            # scale the window parameters
+            if windows is not None:
+                windows = tuple(win_par.scale(factor) if win_par is not None else None
+                                for win_par in windows)
+            # scale the skylight parameters
+            if skylight is not None:
+                skylight = skylight.scale(factor, origin) \
+                    if isinstance(skylight, DetailedSkylights) else \
+                    skylight.scale(factor)
+            self._state = (floor_geometry, windows, skylight)
 
     @classmethod
-    def from_dict(cls, data, host):
+    def from_dict(cls, data, host, lazy=False):
         """Create Room2DComparisonProperties from a dictionary.
 
         Args:
@@ -584,58 +920,89 @@ class Room2DComparisonProperties(object):
 
             {
             "type": 'Room2DComparisonProperties',
-            "modifier_set": {},  # A ModifierSet dictionary
-            "grid_parameters": []  # A list of GridParameter dictionaries
+            "floor_boundary": [(0, 0), (10, 0), (10, 10), (0, 10)],
+            "floor_holes": [],  # optional list of lists of hole coordinates
+            "window_parameters": [],  # list of WindowParameter dictionaries
+            "skylight_parameters": {},  # SkylightParameter dictionary
+            "match_key": "identifier"  # optional key that matched the comparison
+            }
+
+        Instead of the floor_boundary and floor_holes, the dictionary can have a
+        floor_delta relative to the floor geometry of the host. This is a
+        dictionary in the format below, which lists the index and the new X and
+        Y coordinates of each changed vertex. The vertex counts and a checksum of
+        the coordinates of the host floor geometry from which the delta was made
+        are used to check that it is applied to the same host floor geometry and
+        a ValueError is raised if the host floor geometry has been edited since.
+
+        .. code-block:: python
+
+            {
+            "host_vertex_counts": [4, 4],  # boundary followed by each hole
+            "host_checksum": 336.0,  # checksum of the host floor coordinates
+            "boundary": [[1, 10.5, 0], [2, 10.5, 10.5]],  # empty if unchanged
+            "holes": [[]]  # optional list of changed vertices for each hole
             }
+
+        Args:
+            data: A dictionary in the format above.
+            host: A Room2D object that hosts these properties.
+            lazy: Boolean to note whether the dictionary should only be parsed
+                into geometry and parameters the first time that the comparison
+                attributes are accessed. See the apply_properties_from_dict
+                method for more information. (Default: False).
         """
         assert data['type'] == 'Room2DComparisonProperties', \
             'Expected Room2DComparisonProperties. Got {}.'.format(data['type'])
         new_prop = cls(host)
-        new_prop.apply_properties_from_dict(data)
+        new_prop.apply_properties_from_dict(data, lazy)
         return new_prop
 
-    def apply_properties_from_dict(self, data):
+    def apply_properties_from_dict(self, data, lazy=False):
         """Apply properties from a Room2DComparisonProperties dictionary.
 
         Args:
             data: A Room2DComparisonProperties dict (typically coming from a Model).
+            lazy: Boolean to note whether the dictionary should be kept as it is
+                and only parsed into geometry and parameters the first time that
+                the comparison attributes (or any metric using them) are accessed.
+                The host floor geometry at the time of this call is recorded such
+                that any floor_delta is always applied to the correct geometry.
+                Note that, when True, any invalid data in the dictionary will
+                only raise an exception upon first access. (Default: False).
         """
-        # re-assemble the floor_geometry
-        if 'floor_boundary' in data and data['floor_boundary'] is not None:
-            fh = self.host.floor_height
-            bound_verts = [Point3D(pt[0], pt[1], fh) for pt in data['floor_boundary']]
-            if 'floor_holes' in data:
-                hole_verts = [[Point3D(pt[0], pt[1], fh) for pt in hole]
-                              for hole in data['floor_holes']]
-            else:
-                hole_verts = None
-            self.comparison_floor_geometry = Face3D(bound_verts, None, hole_verts)
-
-        # re-assemble window parameters
-        if 'window_parameters' in data and data['window_parameters'] is not None:
-            glz_pars = []
-            for glz_dict in data['window_parameters']:
-                if glz_dict is not None:
-                    try:
-                        glz_class = getattr(glzpar, glz_dict['type'])
-                    except AttributeError:
-                        raise ValueError(
-                            'Window parameter "{}" is not recognized.'.format(
-                                glz_dict['type']))
-                    glz_pars.append(glz_class.from_dict(glz_dict))
+        host_geo, floor_height = self.host.floor_geometry, self.host.floor_height
+        if 'match_key' in data:
+            self.match_key = data['match_key']
+        # parse the dictionary outside of the lock so that rooms load concurrently
+        parsed = None if lazy else _state_from_dict(data, host_geo, floor_height)
+        while True:
+            self._comparison_state()  # parse any dictionary that is already pending
+            with _WRITE_LOCK:
+                if self._pending_dict is not None:  # another dict was just applied
+                    continue
+                if lazy:
+                    self._pending_dict = (data, host_geo, floor_height)
                 else:
-                    glz_pars.append(None)
-            self.comparison_windows = glz_pars
+                    self._state = _merged_state(parsed, self._state)
+                return
 
-        # assign any skylight parameters if they are specified
-        if 'skylight_parameters' in data and data['skylight_parameters'] is not None:
-            try:
-                sky_class = getattr(skypar, data['skylight_parameters']['type'])
-            except AttributeError:
-                raise ValueError(
-                    'Skylight parameter "{}" is not recognized.'.format(
-                        data['skylight_parameters']['type']))
-            self.comparison_skylight = sky_class.from_dict(data['skylight_parameters'])
+    def _load_pending_dict(self):
+        """Parse a dictionary that was applied lazily into comparison attributes.
+
+        The dictionary is parsed outside of the lock and the new state is assigned
+        before the pending dictionary is cleared such that other threads never
+        see the Room2D without either of them.
+        """
+        pending = self._pending_dict
+        if pending is None:  # another thread parsed it first
+            return
+        parsed = _state_from_dict(*pending)
+        with _WRITE_LOCK:
+            if self._pending_dict is not pending:  # parsed or replaced by another thread
+                return
+            self._state = _merged_state(parsed, self._state)
+            self._pending_dict = None
 
     def to_dict(self, abridged=False):
         """Return Room2D comparison properties as a dictionary.
@@ -643,31 +1010,39 @@ class Room2DComparisonProperties(object):
         Args:
             abridged: Boolean for whether the full dictionary of the Room2D should
                 be written (False) or just the identifier of the the individual
-                properties (True). Default: False.
+                properties (True). When True, the comparison floor geometry is
+                written as a floor_delta relative to the host floor geometry
+                whenever the two have matching vertex counts, which can only be
+                loaded onto the same host floor geometry. Default: False.
         """
         base = {'comparison': {}}
         base['comparison']['type'] = 'Room2DComparisonProperties'
+        floor_geometry, windows, skylight = self._comparison_state()
 
         # write the floor geometry into the dictionary
-        if self.comparison_floor_geometry is not None:
-            base['comparison']['floor_boundary'] = \
-                [(p.x, p.y) for p in self.comparison_floor_geometry.boundary]
-            if self.comparison_floor_geometry.has_holes:
-                base['comparison']['floor_holes'] = \
-                    [[(p.x, p.y) for p in hole]
-                     for hole in self.comparison_floor_geometry.holes]
+        if floor_geometry is not None:
+            floor_delta = self._floor_delta(floor_geometry) if abridged else None
+            if floor_delta is not None:
+                base['comparison']['floor_delta'] = floor_delta
+            else:
+                base['comparison']['floor_boundary'] = \
+                    [(p.x, p.y) for p in floor_geometry.boundary]
+                if floor_geometry.has_holes:
+                    base['comparison']['floor_holes'] = \
+                        [[(p.x, p.y) for p in hole] for hole in floor_geometry.holes]
 
         # write the window parameters into the dictionary
-        if self.comparison_windows is not None:
+        if windows is not None:
             base['comparison']['window_parameters'] = []
-            for glz in self.comparison_windows:
+            for glz in windows:
                 val = glz.to_dict() if glz is not None else None
                 base['comparison']['window_parameters'].append(val)
 
         # write the skylights into the dict
-        if self.comparison_skylight is not None:
-            base['comparison']['skylight_parameters'] = \
-                self.comparison_skylight.to_dict()
+        if skylight is not None:
+            base['comparison']['skylight_parameters'] = skylight.to_dict()
+        if self._match_key is not None:
+            base['comparison']['match_key'] = self._match_key
         return base
 
     def duplicate(self, new_host=None):
@@ -678,13 +1053,679 @@ class Room2DComparisonProperties(object):
                 If None, the properties will be duplicated with the same host.
         """
         _host = new_host or self._host
-        new_r = Room2DComparisonProperties(_host, self._comparison_floor_geometry)
-        new_r._comparison_windows = self._comparison_windows
-        new_r._comparison_skylight = self._comparison_skylight
+        new_r = Room2DComparisonProperties(_host)
+        # the comparison geometry and parameters are immutable and the transform
+        # methods assign new objects, so they can be shared between the copies
+        new_r._pending_dict = self._pending_dict  # read before the state it replaces
+        new_r._state = self._state
+        new_r._match_key = self._match_key
+        new_r._host_cache = self._host_cache  # keyed on host objects so safe to share
         return new_r
 
+    def _comparison_state(self):
+        """Get a tuple of the comparison floor geometry, windows and skylight.
+
+        The tuple is immutable and it is replaced as a whole upon any edit. So
+        callers that need several comparison attributes should get this tuple
+        once and use it for the whole computation.
+        """
+        while self._pending_dict is not None:
+            self._load_pending_dict()
+        return self._state
+
+    def _set_comparison_state(self, state):
+        """Set the comparison attributes from a tuple like that of _comparison_state.
+        """
+        with _WRITE_LOCK:
+            self._state = state
+            self._pending_dict = None
+
+    def _host_wall_area(self):
+        """Get the wall area of the host Room2D computed from its floor segments."""
+        ftc = self.host.floor_to_ceiling_height
+        return sum(seg.length * ftc for seg in self.host.floor_segments)
+
+    def _floor_delta(self, comp_geo):
+        """Get a floor_delta of a comparison floor geometry relative to the host.
+
+        Will be None if the vertex counts of the host and comparison do not match.
+        The vertex counts and coordinate checksum of the host are included such
+        that the delta is never applied to a host floor that has been edited.
+        """
+        host_geo = self.host.floor_geometry
+        host_holes = host_geo.holes if host_geo.has_holes else ()
+        comp_holes = comp_geo.holes if comp_geo.has_holes else ()
+        if len(host_holes) != len(comp_holes):
+            return None
+        loop_deltas = []
+        loops = [(host_geo.boundary, comp_geo.boundary)] + \
+            list(zip(host_holes, comp_holes))
+        for host_loop, comp_loop in loops:
+            if len(host_loop) != len(comp_loop):
+                return None
+            loop_deltas.append(
+                [[i, c_pt.x, c_pt.y]
+                 for i, (h_pt, c_pt) in enumerate(zip(host_loop, comp_loop))
+                 if h_pt.x != c_pt.x or h_pt.y != c_pt.y])
+        host_loops = [host_geo.boundary] + list(host_holes)
+        floor_delta = {
+            'host_vertex_counts': [len(loop) for loop in host_loops],
+            'host_checksum': _loops_checksum(host_loops),
+            'boundary': loop_deltas[0]
+        }
+        if len(loop_deltas) > 1:
+            floor_delta['holes'] = loop_deltas[1:]
+        return floor_delta
+
+    def _floor_change_job(self, tolerance, angle_tolerance):
+        """Get a tuple of packed data used to evaluate the floor changes of the room.
+
+        The comparison floor is placed at the height of the host floor and the
+        result is None if the host and comparison floors have the same vertices.
+        """
+        comp_geo = self.comparison_floor_geometry
+        if comp_geo is None:
+            return None
+        host_loops = _packed_loops(self.host.floor_geometry)
+        comp_loops = _packed_loops(comp_geo)
+        if host_loops == comp_loops:
+            return None
+        return host_loops, comp_loops, self.host.floor_height, \
+            tolerance, angle_tolerance
+
+    def _host_window_door_areas(self):
+        """Get the window and door areas of the host Room2D in walls and roofs."""
+        host = self.host
+        sky_par = host.skylight_parameters if host.is_top_exposed else None
+        return _window_door_areas(
+            host.floor_segments, host.window_parameters,
+            host.floor_to_ceiling_height, sky_par, host.floor_geometry)
+
+    def _host_skylight_area(self):
+        """Get the skylight area of the host Room2D (zero if its top is not exposed).
+        """
+        host = self.host
+        sky_par = host.skylight_parameters
+        if not host.is_top_exposed or sky_par is None:
+            return 0
+        kernel = _area_kernel(_SKYLIGHT_AREA_KERNELS, sky_par)
+        return kernel(sky_par, host.floor_geometry)[0]
+
+    def _comparison_segments(self, state):
+        """Get the comparison wall segments and the window parameters aligned with them.
+
+        The window parameters are None when the comparison uses the glazing of the
+        host, which is the case when the comparison has no window parameters or no
+        floor geometry. The host window parameters only align with the host floor
+        segments so, in this case, the comparison glazing is the host glazing on
+        the host walls and it should not be applied to the comparison segments.
+        """
+        fg, windows, _ = state
+        if fg is None:
+            return self.host.floor_segments, None
+        return _floor_segments(fg), windows
+
+    def _comparison_window_door_areas(self, state):
+        """Get the window and door areas of a comparison state in walls and roofs."""
+        host, (fg, _, skylight) = self.host, state
+        segs, win_pars = self._comparison_segments(state)
+        if win_pars is None:
+            segs, win_pars = host.floor_segments, host.window_parameters
+        sky_par, sky_face = None, None
+        if host.is_top_exposed:
+            if skylight is not None and fg is not None:
+                sky_par, sky_face = skylight, fg
+            else:
+                sky_par, sky_face = host.skylight_parameters, host.floor_geometry
+        return _window_door_areas(
+            segs, win_pars, host.floor_to_ceiling_height, sky_par, sky_face)
+
     def ToString(self):
         return self.__repr__()
 
     def __repr__(self):
         return 'Room2D Comparison Properties: {}'.format(self.host.identifier)
+
+
+def _check_floor_geometry(value):
+    """Check a comparison floor geometry and give it an upward normal and global origin.
+    """
+    if value is not None:
+        assert isinstance(value, Face3D), \
+            'Expected ladybug_geometry Face3D. Got {}'.format(type(value))
+        value = _global_floor(value)
+    return value
+
+
+def _check_floor_geometries(values):
+    """Check a list of comparison floor geometries with one type check for all of them.
+    """
+    bad = [v for v in values if v is not None and not isinstance(v, Face3D)]
+    assert len(bad) == 0, \
+        'Expected ladybug_geometry Face3D. Got {}'.format(type(bad[0]))
+    return [_global_floor(v) if v is not None else None for v in values]
+
+
+def _global_floor(value):
+    """Get a Face3D with an upward normal and a plane with the global 2D origin.
+
+    Face3Ds that already have such a plane are returned as they are.
+    """
+    pl = value.plane
+    if pl.n.z == 1 and pl.o.x == 0 and pl.o.y == 0 and pl.x.x == 1:
+        return value
+    if value.normal.z < 0:  # ensure upward-facing Face3D
+        value = value.flip()
+    # ensure a global 2D origin, which helps in solve adjacency and the dict schema
+    # the vertices of an upward-facing Face3D are already counterclockwise in XY
+    o_pl = Plane(Vector3D(0, 0, 1), Point3D(0, 0, value.plane.o.z))
+    return Face3D(value.boundary, o_pl, value.holes,
+                  enforce_right_hand=value.normal.z == 0)
+
+
+def _check_windows(value):
+    """Check comparison window parameters and convert them to a tuple."""
+    if value is not None:
+        if not isinstance(value, tuple):
+            value = tuple(value)
+        for val in value:
+            if val is not None:
+                assert isinstance(val, _WindowParameterBase), \
+                    'Expected Window Parameters. Got {}'.format(type(value))
+    return value
+
+
+def _check_skylight(value):
+    """Check comparison skylight parameters."""
+    if value is not None:
+        assert isinstance(value, _SkylightParameterBase), \
+            'Expected Skylight Parameters. Got {}'.format(type(value))
+    return value
+
+
+def _check_windows_list(values):
+    """Check a list of comparison window parameters with one type check for all of them.
+    """
+    values = [tuple(v) if v is not None and not isinstance(v, tuple) else v
+              for v in values]
+    bad = [val for v in values if v is not None for val in v
+           if val is not None and not isinstance(val, _WindowParameterBase)]
+    assert len(bad) == 0, 'Expected Window Parameters. Got {}'.format(type(bad[0]))
+    return values
+
+
+def _check_skylights(values):
+    """Check a list of comparison skylight parameters with one type check for all."""
+    bad = [v for v in values
+           if v is not None and not isinstance(v, _SkylightParameterBase)]
+    assert len(bad) == 0, 'Expected Skylight Parameters. Got {}'.format(type(bad[0]))
+    return list(values)
+
+
+def _floor_segments(floor_geometry):
+    """Get a tuple of LineSegment3D for the boundary and holes of a floor Face3D."""
+    fg = floor_geometry
+    return fg.boundary_segments if fg.holes is None else \
+        fg.boundary_segments + tuple(s for hole in fg.hole_segments for s in hole)
+
+
+def _percent_change(host_value, comparison_value):
+    """Get the percent change between a host and comparison value."""
+    try:
+        return (abs(host_value - comparison_value) / comparison_value) * 100
+    except ZeroDivisionError:
+        return float('inf')
+
+
+def _state_from_dict(data, host_geo, fh):
+    """Get a comparison state tuple from a Room2DComparisonProperties dict.
+
+    Args:
+        data: A Room2DComparisonProperties dictionary.
+        host_geo: The host floor geometry to which any floor_delta is applied.
+        fh: The floor height of the host at the time the data was applied.
+
+    Returns:
+        A tuple of the floor geometry, windows and skylight in the dictionary,
+        where the attributes that are not in the dictionary are None. Use the
+        _merged_state function to combine it with the current state.
+    """
+    floor_geometry, windows, skylight = None, None, None
+    # re-assemble the floor_geometry
+    if 'floor_delta' in data and data['floor_delta'] is not None:
+        floor_geometry = \
+            _check_floor_geometry(_floor_from_delta(data['floor_delta'], host_geo, fh))
+    elif 'floor_boundary' in data and data['floor_boundary'] is not None:
+        bound_verts = [Point3D(pt[0], pt[1], fh) for pt in data['floor_boundary']]
+        if 'floor_holes' in data:
+            hole_verts = [[Point3D(pt[0], pt[1], fh) for pt in hole]
+                          for hole in data['floor_holes']]
+        else:
+            hole_verts = None
+        floor_geometry = _floor_face(bound_verts, hole_verts, fh)
+
+    # re-assemble window parameters
+    if 'window_parameters' in data and data['window_parameters'] is not None:
+        glz_pars = []
+        for glz_dict in data['window_parameters']:
+            if glz_dict is not None:
+                try:
+                    glz_class = getattr(glzpar, glz_dict['type'])
+                except AttributeError:
+                    raise ValueError(
+                        'Window parameter "{}" is not recognized.'.format(
+                            glz_dict['type']))
+                glz_pars.append(glz_class.from_dict(glz_dict))
+            else:
+                glz_pars.append(None)
+        windows = _check_windows(glz_pars)
+
+    # assign any skylight parameters if they are specified
+    if 'skylight_parameters' in data and data['skylight_parameters'] is not None:
+        try:
+            sky_class = getattr(skypar, data['skylight_parameters']['type'])
+        except AttributeError:
+            raise ValueError(
+                'Skylight parameter "{}" is not recognized.'.format(
+                    data['skylight_parameters']['type']))
+        skylight = _check_skylight(
+            sky_class.from_dict(data['skylight_parameters']))
+    return floor_geometry, windows, skylight
+
+
+def _merged_state(parsed, state):
+    """Merge a state parsed from a dict with the current state for absent attributes.
+    """
+    return tuple(cur if new is None else new for new, cur in zip(parsed, state))
+
+
+def _floor_from_delta(floor_delta, host_geo, fh):
+    """Get a comparison floor Face3D from a floor_delta and a host floor geometry.
+
+    A ValueError is raised if the host floor geometry does not match the vertex
+    counts and coordinate checksum of the host from which the delta was made.
+    """
+    host_holes = host_geo.holes if host_geo.has_holes else ()
+    host_loops = [host_geo.boundary] + list(host_holes)
+    host_counts = [len(loop) for loop in host_loops]
+    if floor_delta['host_vertex_counts'] != host_counts:
+        raise ValueError(
+            'Comparison floor_delta was made from a host floor with vertex counts '
+            '{} but the host floor has {}.'.format(
+                floor_delta['host_vertex_counts'], host_counts))
+    checksum, delta_checksum = _loops_checksum(host_loops), floor_delta['host_checksum']
+    if abs(checksum - delta_checksum) > 1e-9 * max(abs(checksum), 1.0):
+        raise ValueError(
+            'Comparison floor_delta was made from a host floor with different '
+            'coordinates than those of the current host floor.')
+    delta_holes = floor_delta.get('holes', [[] for _ in host_holes])
+    deltas = [floor_delta['boundary']] + list(delta_holes)
+    if all(len(delta) == 0 for delta in deltas):
+        return host_geo
+    loops = []
+    for host_loop, delta in zip(host_loops, deltas):
+        verts = [Point3D(pt.x, pt.y, fh) for pt in host_loop]
+        for i, x, y in delta:
+            verts[i] = Point3D(x, y, fh)
+        loops.append(verts)
+    return _floor_face(loops[0], loops[1:] if host_holes else None, fh)
+
+
+def _floor_face(boundary, holes, floor_height):
+    """Get an upward-facing floor Face3D with a global 2D origin from its vertices.
+
+    The Face3D is built once with the same plane and vertex order that the
+    _global_floor function would give it, such that it is returned as it is
+    when the floor geometry is checked. Only clockwise boundaries with holes
+    are built twice since their flipped vertices cannot be built directly.
+    """
+    if holes:
+        area = sum(p_1.x * p_2.y - p_2.x * p_1.y
+                   for p_1, p_2 in zip(boundary, boundary[1:] + boundary[:1]))
+        if area < 0:  # clockwise boundary
+            return _global_floor(Face3D(boundary, None, holes))
+    o_pl = Plane(Vector3D(0, 0, 1), Point3D(0, 0, floor_height))
+    return Face3D(boundary, o_pl, holes)
+
+
+def _loops_checksum(loops):
+    """Get a number that checks the X and Y coordinates of a list of vertex loops.
+
+    Each coordinate is weighted by its position in the loop such that reordered
+    vertices also change the checksum.
+    """
+    checksum = 0
+    for loop in loops:
+        for i, pt in enumerate(loop):
+            checksum += (2 * i + 1) * pt.x + (2 * i + 2) * pt.y
+    return checksum
+
+
+def _floor_change_loops(job):
+    """Get the packed loops of the added and removed floor regions of a room.
+
+    Args:
+        job: A tuple of the host floor loops, the comparison floor loops, the
+            floor height, the tolerance and the angle tolerance in degrees.
+
+    Returns:
+        A tuple with a list of the added regions and a list of the removed
+        regions, where each region is a list of packed coordinate loops.
+    """
+    host_loops, comp_loops, floor_height, tolerance, angle_tolerance = job
+    if not _bounding_boxes_overlap(host_loops[0], comp_loops[0], tolerance):
+        return [host_loops], [comp_loops]
+    if len(host_loops) == 1 and len(comp_loops) == 1:
+        # floors without holes share one preprocessing step for both booleans
+        host_poly = Polygon2D([Point2D(x, y) for x, y in host_loops[0]])
+        comp_poly = Polygon2D([Point2D(x, y) for x, y in comp_loops[0]])
+        bool_polys = Polygon2D.preprocess_polygons_for_boolean(
+            [host_poly, comp_poly], tolerance)
+        if len(bool_polys) <= 1:
+            return [], []
+        b_tol = tolerance / 1000
+        added = pb.difference(bool_polys[0], bool_polys[1], b_tol)
+        removed = pb.difference(bool_polys[1], bool_polys[0], b_tol)
+        return _packed_regions(Polygon2D._from_bool_poly(added, tolerance)), \
+            _packed_regions(Polygon2D._from_bool_poly(removed, tolerance))
+    host_face = _face_from_loops(host_loops, floor_height)
+    comp_face = _face_from_loops(comp_loops, floor_height)
+    a_tol = math.radians(angle_tolerance)
+    added = host_face.coplanar_difference([comp_face], tolerance, a_tol)
+    removed = comp_face.coplanar_difference([host_face], tolerance, a_tol)
+    return [_packed_loops(face) for face in added], \
+        [_packed_loops(face) for face in removed]
+
+
+def _floor_change_result(added, removed, floor_height):
+    """Get a dictionary of floor changes from the packed added and removed loops."""
+    added = [_face_from_loops(loops, floor_height) for loops in added]
+    removed = [_face_from_loops(loops, floor_height) for loops in removed]
+    return {
+        'added': added,
+        'removed': removed,
+        'added_area': sum(face.area for face in added),
+        'removed_area': sum(face.area for face in removed)
+    }
+
+
+def _packed_regions(polygons):
+    """Get the packed coordinate loops of regions from the Polygon2Ds of a boolean.
+
+    Polygons inside another polygon are holes of that polygon, which are grouped
+    in the same way as the Face3D coplanar_difference method.
+    """
+    groups = []
+    for poly in sorted(polygons, key=lambda p: p.area, reverse=True):
+        for group in groups:
+            if group[0].is_polygon_inside(poly):  # it's a hole
+                group.append(poly)
+                break
+        else:  # it's a separate region
+            groups.append([poly])
+    return [_packed_polygon(group[0]) + [[(pt.x, pt.y) for pt in hole.vertices]
+                                         for hole in group[1:]]
+            for group in groups]
+
+
+def _packed_polygon(polygon):
+    """Get packed coordinate loops for a Polygon2D in counterclockwise order."""
+    if polygon.is_clockwise:
+        polygon = polygon.reverse()
+    return [[(pt.x, pt.y) for pt in polygon.vertices]]
+
+
+def _bounding_boxes_overlap(loop_1, loop_2, tolerance):
+    """Check whether the bounding boxes of two packed coordinate loops overlap."""
+    xs_1, ys_1 = [pt[0] for pt in loop_1], [pt[1] for pt in loop_1]
+    xs_2, ys_2 = [pt[0] for pt in loop_2], [pt[1] for pt in loop_2]
+    return min(xs_1) < max(xs_2) - tolerance and min(xs_2) < max(xs_1) - tolerance \
+        and min(ys_1) < max(ys_2) - tolerance and min(ys_2) < max(ys_1) - tolerance
+
+
+def _face_from_loops(loops, floor_height):
+    """Get a horizontal Face3D from packed coordinate loops and a floor height."""
+    boundary = [Point3D(x, y, floor_height) for x, y in loops[0]]
+    holes = [[Point3D(x, y, floor_height) for x, y in hole] for hole in loops[1:]]
+    return Face3D(boundary, None, holes if holes else None)
+
+
+def _packed_loops(face):
+    """Get lists of packed 2D coordinates for the boundary and holes of a Face3D."""
+    loops = [[(pt.x, pt.y) for pt in face.boundary]]
+    if face.has_holes:
+        loops.extend([(pt.x, pt.y) for pt in hole] for hole in face.holes)
+    return loops
+
+
+def _floor_area_lengths(face):
+    """Get the area and the segment lengths of a floor from its 2D vertex coordinates.
+
+    The area is computed with the shoelace formula and the lengths are ordered in
+    the same way as the floor_segments, without building any segment objects.
+    """
+    loops = (face.boundary,) + face.holes if face.has_holes else (face.boundary,)
+    areas, lengths = [], []
+    for loop in loops:
+        last_pt = loop[-1]
+        x_1, y_1, area = last_pt.x, last_pt.y, 0
+        for pt in loop:
+            x_2, y_2 = pt.x, pt.y
+            area += x_1 * y_2 - x_2 * y_1
+            lengths.append(math.sqrt((x_2 - x_1) ** 2 + (y_2 - y_1) ** 2))
+            x_1, y_1 = x_2, y_2
+        areas.append(abs(area) / 2)
+        lengths.append(lengths.pop(-len(loop)))  # the first length closes the loop
+    return areas[0] - sum(areas[1:]), lengths
+
+
+class _SegmentLength(object):
+    """Lightweight stand-in for a LineSegment3D that only has a length."""
+    __slots__ = ('length',)
+
+    def __init__(self, length):
+        self.length = length
+
+
+class _FaceArea(object):
+    """Lightweight stand-in for a Face3D that only has an area."""
+    __slots__ = ('area',)
+
+    def __init__(self, area):
+        self.area = area
+
+
+def _approximate_window_area(lengths, window_parameters, floor_to_ceiling_height):
+    """Get an estimate of the window area of walls along with its error bound."""
+    window_area, error = 0, 0
+    for length, glz in zip(lengths, window_parameters):
+        if glz is None:
+            continue
+        if glz.__class__ in _LENGTH_WINDOW_CLASSES:
+            kernel = _area_kernel(_WINDOW_AREA_KERNELS, glz)
+            window_area += \
+                kernel(glz, _SegmentLength(length), floor_to_ceiling_height)[0]
+        else:
+            half_wall = length * floor_to_ceiling_height / 2
+            window_area += half_wall
+            error += half_wall
+    return window_area, error
+
+
+def _approximate_skylight_area(floor_area, skylight_parameters):
+    """Get an estimate of the skylight area of a roof along with its error bound."""
+    if skylight_parameters is None:
+        return 0, 0
+    if skylight_parameters.__class__ in _AREA_SKYLIGHT_CLASSES:
+        kernel = _area_kernel(_SKYLIGHT_AREA_KERNELS, skylight_parameters)
+        return kernel(skylight_parameters, _FaceArea(floor_area))[0], 0
+    return floor_area / 2, floor_area / 2
+
+
+def _same_state_key(key_1, key_2):
+    """Check whether two state keys of Room2DComparisonProperties are the same."""
+    return key_1[1] == key_2[1] and len(key_1[0]) == len(key_2[0]) and \
+        all(obj_1 is obj_2 for obj_1, obj_2 in zip(key_1[0], key_2[0]))
+
+
+def _segment_grid_key(segment, origin, angle_count, tolerance):
+    """Get a hash grid key for a segment using its direction and line offset."""
+    dir_x, dir_y = segment.v.x, segment.v.y
+    length = math.sqrt(dir_x ** 2 + dir_y ** 2)
+    if length == 0:
+        return 0, 0
+    dir_x, dir_y = dir_x / length, dir_y / length
+    angle = math.atan2(dir_y, dir_x) % (2 * math.pi)
+    offset = dir_x * (segment.p.y - origin.y) - dir_y * (segment.p.x - origin.x)
+    angle_i = int(angle / (2 * math.pi) * angle_count) % angle_count
+    offset_i = int(math.floor(offset / tolerance)) if tolerance > 0 else 0
+    return angle_i, offset_i
+
+
+def _segments_collinear(segment_1, segment_2, tolerance, angle_tolerance):
+    """Check whether two segments are parallel and lie along the same line."""
+    v_1, v_2 = segment_1.v, segment_2.v
+    len_1 = math.sqrt(v_1.x ** 2 + v_1.y ** 2)
+    len_2 = math.sqrt(v_2.x ** 2 + v_2.y ** 2)
+    if len_1 == 0 or len_2 == 0:
+        return len_1 == len_2 and \
+            segment_1.p.distance_to_point(segment_2.p) <= tolerance
+    cos_ang = (v_1.x * v_2.x + v_1.y * v_2.y) / (len_1 * len_2)
+    if cos_ang < math.cos(math.radians(angle_tolerance)):
+        return False
+    mid = segment_2.midpoint
+    dist = abs(v_1.x * (mid.y - segment_1.p.y) - v_1.y * (mid.x - segment_1.p.x)) / len_1
+    return dist <= tolerance
+
+
+def _orientation_bins(segments, window_parameters, floor_to_ceiling_height,
+                      bin_count, north_angle):
+    """Get lists of wall and window areas binned by the orientation of segments."""
+    walls, windows = [0] * bin_count, [0] * bin_count
+    bin_width = 360.0 / bin_count
+    for seg, glz in zip(segments, window_parameters):
+        dir_x, dir_y = seg.v.x, seg.v.y
+        if dir_x == 0 and dir_y == 0:
+            continue
+        # the outward normal is (dir_y, -dir_x) and its azimuth is clockwise from north
+        azimuth = math.degrees(math.atan2(dir_y, -dir_x)) + north_angle
+        bin_i = int(((azimuth + bin_width / 2) % 360) / bin_width) % bin_count
+        walls[bin_i] += seg.length * floor_to_ceiling_height
+        windows[bin_i] += _segment_window_area(glz, seg, floor_to_ceiling_height)
+    return walls, windows
+
+
+def _segment_window_area(window_parameter, segment, floor_to_ceiling_height):
+    """Get the window area of a single segment, excluding any doors."""
+    if window_parameter is None:
+        return 0
+    kernel = _area_kernel(_WINDOW_AREA_KERNELS, window_parameter)
+    return kernel(window_parameter, segment, floor_to_ceiling_height)[0]
+
+
+def _window_door_areas(segments, window_parameters, floor_to_ceiling_height,
+                       skylight_parameters=None, floor_geometry=None):
+    """Get the total window and door areas from window and skylight parameters.
+
+    Args:
+        segments: A list of LineSegment3D for the walls.
+        window_parameters: A list of WindowParameters that align with the segments.
+        floor_to_ceiling_height: The floor-to-ceiling height of the walls.
+        skylight_parameters: Optional SkylightParameters for the roof.
+        floor_geometry: The Face3D to which the skylight_parameters are applied.
+
+    Returns:
+        A tuple with the window area and the door area.
+    """
+    window_area, door_area = 0, 0
+    for seg, glz in zip(segments, window_parameters):
+        if glz is not None:
+            kernel = _area_kernel(_WINDOW_AREA_KERNELS, glz)
+            win_a, door_a = kernel(glz, seg, floor_to_ceiling_height)
+            window_area += win_a
+            door_area += door_a
+    if skylight_parameters is not None:
+        kernel = _area_kernel(_SKYLIGHT_AREA_KERNELS, skylight_parameters)
+        win_a, door_a = kernel(skylight_parameters, floor_geometry)
+        window_area += win_a
+        door_area += door_a
+    return window_area, door_area
+
+
+def _area_kernel(kernels, parameter):
+    """Get the area kernel for a window or skylight parameter from a dispatch table.
+
+    Subclasses that are not in the table use the kernel of their nearest base
+    class, which is then added to the table so that the lookup is only done once.
+    """
+    param_class = parameter.__class__
+    try:
+        return kernels[param_class]
+    except KeyError:
+        for base_class in param_class.__mro__:
+            if base_class in kernels:
+                kernels[param_class] = kernels[base_class]
+                return kernels[base_class]
+        raise ValueError('No area kernel found for {}.'.format(param_class))
+
+
+def _window_kernel(window_parameter, segment, floor_to_ceiling_height):
+    """Area kernel for window parameters that generate only windows."""
+    return window_parameter.area_from_segment(segment, floor_to_ceiling_height), 0
+
+
+def _rectangular_windows_kernel(window_parameter, segment, floor_to_ceiling_height):
+    """Area kernel for RectangularWindows, which may include doors."""
+    max_width, max_height = segment.length, floor_to_ceiling_height
+    window_area, door_area = 0, 0
+    zip_obj = zip(window_parameter.origins, window_parameter.widths,
+                  window_parameter.heights, window_parameter.are_doors)
+    for o, width, height, is_door in zip_obj:
+        final_width = max_width - o.x if width + o.x > max_width else width
+        final_height = max_height - o.y if height + o.y > max_height else height
+        if final_height > 0:  # inside wall boundary
+            if is_door:
+                door_area += final_width * final_height
+            else:
+                window_area += final_width * final_height
+    return window_area, door_area
+
+
+def _detailed_kernel(parameter, *args):
+    """Area kernel for DetailedWindows and DetailedSkylights, which may include doors.
+
+    The polygons of these parameters are independent of the wall or roof geometry
+    and each Polygon2D caches its own area. So the areas are only summed here.
+    """
+    window_area, door_area = 0, 0
+    for polygon, is_door in zip(parameter.polygons, parameter.are_doors):
+        if is_door:
+            door_area += polygon.area
+        else:
+            window_area += polygon.area
+    return window_area, door_area
+
+
+def _skylight_kernel(skylight_parameter, floor_geometry):
+    """Area kernel for skylight parameters that generate only skylights."""
+    return skylight_parameter.area_from_face(floor_geometry), 0
+
+
+_WINDOW_AREA_KERNELS = {
+    _WindowParameterBase: _window_kernel,
+    glzpar.RectangularWindows: _rectangular_windows_kernel,
+    glzpar.DetailedWindows: _detailed_kernel
+}
+_SKYLIGHT_AREA_KERNELS = {
+    _SkylightParameterBase: _skylight_kernel,
+    DetailedSkylights: _detailed_kernel
+}
+# parameter types with areas that only depend on segment lengths or floor areas
+_LENGTH_WINDOW_CLASSES = frozenset((
+    glzpar.SingleWindow, glzpar.SimpleWindowArea, glzpar.SimpleWindowRatio,
+    glzpar.RepeatingWindowRatio, glzpar.RepeatingWindowWidthHeight,
+    glzpar.RectangularWindows, glzpar.DetailedWindows
+))
+_AREA_SKYLIGHT_CLASSES = frozenset((
+    skypar.GriddedSkylightArea, skypar.GriddedSkylightRatio, DetailedSkylights
+))
@@ -0,0 +1,152 @@
+# coding=utf-8
+"""Rasterization of host and comparison floor plates into grids of change flags."""
+from __future__ import division
+
+import math
+
+HOST = 1  # flag for cells covered by a host floor
+COMPARISON = 2  # flag for cells covered by a comparison floor
+
+# translation tables used to add a flag to a run of cells in a single operation
+_ADD_HOST = bytes(bytearray((i | HOST) for i in range(256)))
+_ADD_COMPARISON = bytes(bytearray((i | COMPARISON) for i in range(256)))
+
+
+def rasterize_floors(host_floors, comparison_floors, resolution=1.0):
+    """Get a grid of cells flagged by whether host or comparison floors cover them.
+
+    The floors are rasterized with a scanline fill, where each row of cells is
+    filled with runs between the crossings of the floor boundaries and holes.
+    So the work scales with the number of rows and floor segments rather
+    than the number of cells. A cell is covered by a floor when its center is
+    inside the floor. Only the X and Y coordinates of the floors are used.
+
+    Args:
+        host_floors: A list of Face3D for the host floor plates.
+        comparison_floors: A list of Face3D for the comparison floor plates.
+        resolution: A number for the dimension of each square cell in model
+            units. (Default: 1).
+
+    Returns:
+        A dictionary with the following keys.
+
+        -   origin: A tuple with the X and Y coordinates of the corner of the
+            first cell of the grid.
+
+        -   resolution: A number for the dimension of each cell.
+
+        -   width: An integer for the number of cells in each row (along X).
+
+        -   height: An integer for the number of rows (along Y).
+
+        -   cells: A bytearray of width * height cell values in row-major
+            order starting from the origin. Each value is the sum of the HOST
+            flag (1) if a host floor covers the cell and the COMPARISON flag (2)
+            if a comparison floor covers it. So 0 means neither, 1 means host
+            only, 2 means comparison only and 3 means both. The bytearray
+            supports the buffer protocol such that it can be used without
+            copying (eg. numpy.frombuffer(cells, 'uint8').reshape(height, width)).
+
+        -   host_only: An integer for the number of cells with host only.
+
+        -   comparison_only: An integer for the number of cells with comparison only.
+
+        -   both: An integer for the number of cells with both.
+    """
+    assert resolution > 0, 'Raster resolution must be greater than zero. ' \
+        'Got {}.'.format(resolution)
+    host_loops = [_face_loops(face) for face in host_floors]
+    comp_loops = [_face_loops(face) for face in comparison_floors]
+    all_pts = [pt for loops in host_loops + comp_loops for pt in loops[0]]
+    if len(all_pts) == 0:
+        origin, width, height = (0, 0), 0, 0
+    else:
+        min_x = min(pt[0] for pt in all_pts)
+        min_y = min(pt[1] for pt in all_pts)
+        max_x = max(pt[0] for pt in all_pts)
+        max_y = max(pt[1] for pt in all_pts)
+        origin = (min_x, min_y)
+        width = max(int(math.ceil((max_x - min_x) / resolution)), 1)
+        height = max(int(math.ceil((max_y - min_y) / resolution)), 1)
+
+    cells = bytearray(width * height)
+    for loops in host_loops:
+        _fill_loops(cells, loops, origin, resolution, width, height, _ADD_HOST)
+    for loops in comp_loops:
+        _fill_loops(cells, loops, origin, resolution, width, height, _ADD_COMPARISON)
+    return {
+        'origin': origin,
+        'resolution': resolution,
+        'width': width,
+        'height': height,
+        'cells': cells,
+        'host_only': cells.count(HOST),
+        'comparison_only': cells.count(COMPARISON),
+        'both': cells.count(HOST | COMPARISON)
+    }
+
+
+def _face_loops(face):
+    """Get lists of (x, y) coordinates for the boundary and holes of a Face3D."""
+    loops = [[(pt.x, pt.y) for pt in face.boundary]]
+    if face.has_holes:
+        loops.extend([(pt.x, pt.y) for pt in hole] for hole in face.holes)
+    return loops
+
+
+def _fill_loops(cells, loops, origin, resolution, width, height, table):
+    """Add a flag to all cells with centers inside a floor using a scanline fill.
+
+    The boundary and holes are processed together with the even-odd rule such
+    that cells inside the holes are not filled. The rows are processed in slabs
+    between the vertex Y coordinates, within which the same edges are crossed
+    by every row. So the runs of cells only need to be recomputed for each row
+    when the slab has edges that are not parallel to the Y axis.
+    """
+    org_x, org_y = origin
+    edges = []
+    for loop in loops:
+        x_1, y_1 = loop[-1]
+        for x_2, y_2 in loop:
+            if y_1 != y_2:  # horizontal edges never cross a scanline
+                edges.append((x_1, y_1, x_2, y_2) if y_1 < y_2 else (x_2, y_2, x_1, y_1))
+            x_1, y_1 = x_2, y_2
+    slab_ys = sorted(set(y for edge in edges for y in (edge[1], edge[3])))
+    for slab_st, slab_end in zip(slab_ys[:-1], slab_ys[1:]):
+        row_st = max(_grid_index(slab_st, org_y, resolution), 0)
+        row_end = min(_grid_index(slab_end, org_y, resolution), height)
+        if row_end <= row_st:
+            continue
+        active = [(x_1, y_1, (x_2 - x_1) / (y_2 - y_1))
+                  for x_1, y_1, x_2, y_2 in edges if y_1 <= slab_st and y_2 >= slab_end]
+        if all(slope == 0 for _, _, slope in active):  # same runs for every row
+            runs = _row_runs(sorted(x for x, _, _ in active), org_x, resolution, width)
+            for row in range(row_st, row_end):
+                row_start = row * width
+                for col_st, col_end in runs:
+                    st, end = row_start + col_st, row_start + col_end
+                    cells[st:end] = cells[st:end].translate(table)
+            continue
+        for row in range(row_st, row_end):
+            y = org_y + (row + 0.5) * resolution
+            crossings = sorted(x + (y - y_1) * slope for x, y_1, slope in active)
+            row_start = row * width
+            for col_st, col_end in _row_runs(crossings, org_x, resolution, width):
+                st, end = row_start + col_st, row_start + col_end
+                cells[st:end] = cells[st:end].translate(table)
+
+
+def _grid_index(coordinate, grid_origin, resolution):
+    """Get the index of the first cell with a center at or after a coordinate."""
+    return int(math.ceil((coordinate - grid_origin) / resolution - 0.5))
+
+
+def _row_runs(crossings, org_x, resolution, width):
+    """Get a list of (start, end) column indices from sorted scanline crossings."""
+    runs = []
+    for i in range(0, len(crossings) - 1, 2):
+        col_st = max(_grid_index(crossings[i], org_x, resolution), 0)
+        col_end = min(_grid_index(crossings[i + 1], org_x, resolution), width)
+        if col_end > col_st:
+            runs.append((col_st, col_end))
+    return runs
@@ -0,0 +1,132 @@
+# coding=utf-8
+"""Functions for comparing a series of dragonfly Model revisions with one another."""
+from .parallel import map_jobs
+
+METRICS = ('floor_area', 'wall_area', 'wall_sub_face_area', 'roof_sub_face_area',
+           'window_area', 'door_area')
+
+
+def model_metric_values(model, metrics=METRICS):
+    """Get a dictionary of the per-room metric values of a dragonfly Model.
+
+    The values are computed once for each Room2D using the host-side values
+    of the Room2DComparisonProperties, which means that they can be re-used to
+    compare the Model against any number of other revisions.
+
+    Args:
+        model: A dragonfly Model for which metric values will be computed.
+        metrics: A list of metric names to be computed for each room. Choose
+            from the following. (Default: all of them).
+
+            * floor_area
+            * wall_area
+            * wall_sub_face_area
+            * roof_sub_face_area
+            * window_area
+            * door_area
+
+    Returns:
+        A dictionary with Room2D identifiers as keys and tuples of metric values
+        as values. The values in the tuples align with the input metrics.
+    """
+    _check_metrics(metrics)
+    room_values = {}
+    for room in model.room_2ds:
+        host_metrics = room.properties.comparison.host_metrics()
+        room_values[room.identifier] = tuple(host_metrics[m] for m in metrics)
+    return room_values
+
+
+def difference_matrices(models, metrics=METRICS, absolute=False, cpu_count=None):
+    """Get matrices of metric differences between every pair of Model revisions.
+
+    Each Model is evaluated only once and all pairwise differences are derived
+    from the cached per-room values, meaning that the comparison properties of
+    the input Models are never edited.
+
+    Args:
+        models: A list of dragonfly Models representing different revisions of
+            the same design.
+        metrics: A list of metric names for which difference matrices will be
+            computed. See the model_metric_values function for the acceptable
+            metric names. (Default: all of them).
+        absolute: A boolean to note whether the matrices should contain the sum
+            of absolute room-by-room differences (True) or the net difference
+            between Model totals (False). When True, Room2Ds are matched by
+            identifier and rooms that exist in only one of the two revisions
+            count their full value as a change. (Default: False).
+        cpu_count: An optional integer for the number of processes to be used to
+            evaluate the revision pairs. If None or 1, all pairs will be
+            evaluated in the current process. (Default: None).
+
+    Returns:
+        A dictionary with metric names as keys and N x N matrices as values,
+        where N is the number of input Models. Each matrix is a list of lists
+        where the value at [i][j] is the difference between models[i] and
+        models[j]. Net differences are positive if the metric increased in
+        models[i] compared to models[j].
+    """
+    all_values = [model_metric_values(model, metrics) for model in models]
+    count = len(all_values)
+    pairs = [(i, j) for i in range(count) for j in range(i + 1, count)]
+
+    # evaluate the differences between each pair of revisions
+    if absolute:
+        revision_values = (all_values, len(metrics))
+        pair_results = map_jobs(
+            _abs_pair_differences, pairs, cpu_count, revision_values)
+    else:
+        totals = [_metric_totals(values, len(metrics)) for values in all_values]
+        pair_results = [tuple(a - b for a, b in zip(totals[i], totals[j]))
+                        for i, j in pairs]
+
+    # assemble the results into matrices
+    matrices = {}
+    for m_i, metric in enumerate(metrics):
+        matrix = [[0] * count for _ in range(count)]
+        for (i, j), result in zip(pairs, pair_results):
+            matrix[i][j] = result[m_i]
+            matrix[j][i] = result[m_i] if absolute else -result[m_i]
+        matrices[metric] = matrix
+    return matrices
+
+
+def _check_metrics(metrics):
+    """Check that a list of metric names is valid."""
+    for metric in metrics:
+        assert metric in METRICS, 'Metric "{}" is not recognized. Choose from: ' \
+            '{}'.format(metric, ', '.join(METRICS))
+
+
+def _metric_totals(room_values, metric_count):
+    """Get the total of each metric across all rooms."""
+    totals = [0] * metric_count
+    for values in room_values.values():
+        for i, val in enumerate(values):
+            totals[i] += val
+    return totals
+
+
+def _abs_room_differences(values_1, values_2, metric_count):
+    """Get the sum of absolute room-by-room differences between two revisions."""
+    diffs = [0] * metric_count
+    for identifier, vals_1 in values_1.items():
+        vals_2 = values_2.get(identifier)
+        if vals_2 is None:
+            for i, val in enumerate(vals_1):
+                diffs[i] += abs(val)
+        else:
+            for i, (v_1, v_2) in enumerate(zip(vals_1, vals_2)):
+                diffs[i] += abs(v_1 - v_2)
+    for identifier, vals_2 in values_2.items():
+        if identifier not in values_1:
+            for i, val in enumerate(vals_2):
+                diffs[i] += abs(val)
+    return tuple(diffs)
+
+
+def _abs_pair_differences(pair, revision_values):
+    """Get the absolute differences for a pair of revision indices."""
+    i, j = pair
+    all_values, metric_count = revision_values
+    return _abs_room_differences(all_values[i], all_values[j], metric_count)
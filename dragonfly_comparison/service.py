@@ -0,0 +1,257 @@
+# coding=utf-8
+"""A local comparison service that keeps host and comparison Models in memory."""
+import json
+import math
+import threading
+
+try:  # Python 3
+    import socketserver
+except ImportError:  # Python 2
+    import SocketServer as socketserver
+
+from dragonfly.model import Model
+
+
+class ComparisonService(object):
+    """A service that answers comparison requests for Models kept in memory.
+
+    Requests and responses are dictionaries that can be passed directly to the
+    handle_request method or sent as line-delimited JSON to a server created with
+    the create_server method. Requests that edit the Models are processed one at
+    a time while metrics and restore requests run concurrently with all others,
+    relying on the atomic comparison states of the Room2DComparisonProperties.
+    Every request must have a "command" key with one of the following values.
+
+    * metrics -- Get the comparison metrics of Room2Ds. The request can have
+        a "rooms" key with a list of Room2D identifiers, a "story" key with a
+        Story identifier or a "building" key with a Building identifier to
+        limit the rooms for which metrics are returned. Metrics that are not
+        finite (eg. the percent change of a metric that is zero in the
+        comparison) are returned as None, which is null in JSON.
+    * set_from_model -- Set the comparison properties of the host Model. The
+        request can have a "model" key with a dragonfly Model dictionary to
+        replace the comparison Model and a "reset_unmatched" boolean.
+    * reset -- Reset the comparison properties using the host Model. The same
+        keys as the metrics command can be used to reset only some rooms.
+    * restore -- Get a dictionary of a Room2D that has been restored from the
+        comparison. The request must have a "room" key with a Room2D identifier.
+
+    Args:
+        host_model: A dragonfly Model that will be kept in memory as the host
+            of the comparison properties.
+        comparison_model: An optional dragonfly Model to which the host_model
+            is compared. If specified, it will be used to set the comparison
+            properties of the host_model upon initialization. (Default: None).
+
+    Properties:
+        * host_model
+        * comparison_model
+    """
+
+    def __init__(self, host_model, comparison_model=None):
+        """Initialize ComparisonService."""
+        assert isinstance(host_model, Model), \
+            'Expected dragonfly Model. Got {}.'.format(type(host_model))
+        self._host_model = host_model
+        self._comparison_model = None
+        self._lock = threading.RLock()
+        self._index_host_model()
+        if comparison_model is not None:
+            self.set_comparison_model(comparison_model)
+
+    @property
+    def host_model(self):
+        """Get the dragonfly Model that hosts the comparison properties."""
+        return self._host_model
+
+    @property
+    def comparison_model(self):
+        """Get the dragonfly Model to which the host is compared (or None)."""
+        return self._comparison_model
+
+    def set_comparison_model(self, comparison_model, reset_unmatched=True):
+        """Set the comparison Model and use it to set the host comparison properties.
+
+        Args:
+            comparison_model: A dragonfly Model to which the host_model is compared.
+            reset_unmatched: A boolean to note whether rooms in the host model
+                should have their comparison room properties reset if they are
+                not matched with any room in the comparison_model. (Default: True).
+        """
+        assert isinstance(comparison_model, Model), \
+            'Expected dragonfly Model. Got {}.'.format(type(comparison_model))
+        with self._lock:
+            self._comparison_model = comparison_model
+            self._host_model.properties.comparison.set_from_model(
+                comparison_model, reset_unmatched)
+
+    def handle_request(self, request):
+        """Get a response dictionary for a request dictionary.
+
+        Args:
+            request: A dictionary for a request to the service. See the class
+                documentation for the acceptable commands.
+
+        Returns:
+            A dictionary for the response. If the request could not be processed,
+            the response will have an "error" key with a message.
+        """
+        try:
+            command = request['command']
+        except (KeyError, TypeError):
+            return {'error': 'Request has no "command".'}
+        if not isinstance(command, (str, type(u''))):
+            return {'error': 'Request "command" must be text. Got {}.'.format(
+                type(command).__name__)}
+        try:
+            handler = self._HANDLERS[command]
+        except KeyError:
+            return {'error': 'Command "{}" is not recognized.'.format(command)}
+        try:
+            if command in self._READ_COMMANDS:
+                return handler(self, request)
+            with self._lock:
+                return handler(self, request)
+        except Exception as e:
+            return {'error': str(e)}
+
+    def handle_json(self, request_text):
+        """Get a JSON response string for a JSON request string.
+
+        Args:
+            request_text: A JSON string for a request to the service. This can
+                also be bytes of the JSON encoded as UTF-8.
+        """
+        try:
+            if isinstance(request_text, bytes):
+                request_text = request_text.decode('utf-8')
+        except UnicodeDecodeError:
+            return json.dumps({'error': 'Request is not valid UTF-8.'})
+        try:
+            request = json.loads(request_text)
+        except ValueError:
+            return json.dumps({'error': 'Request is not valid JSON.'})
+        return json.dumps(self.handle_request(request), allow_nan=False)
+
+    def create_server(self, host='127.0.0.1', port=0):
+        """Create a TCP server that answers line-delimited JSON requests.
+
+        Each client connection is handled on its own thread so that several clients
+        can query the Models at once. Each line sent by a client is a JSON request
+        and each response is written back as a single line of JSON. Use the
+        serve_forever method of the result to start the server and the shutdown
+        method to stop it.
+
+        Args:
+            host: Text for the host address of the server. (Default: 127.0.0.1).
+            port: An integer for the port of the server. If zero, a free port will
+                be selected, which can be obtained from the server_address of
+                the result. (Default: 0).
+        """
+        service = self
+
+        class _ComparisonRequestHandler(socketserver.StreamRequestHandler):
+            def handle(self):
+                for line in self.rfile:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    response = service.handle_json(line)
+                    self.wfile.write((response + '\n').encode('utf-8'))
+                    self.wfile.flush()
+
+        server = _ComparisonServer((host, port), _ComparisonRequestHandler)
+        return server
+
+    def _index_host_model(self):
+        """Index the Room2Ds of the host model by identifier and parent."""
+        self._rooms = {}
+        self._story_rooms = {}
+        self._building_rooms = {}
+        for bldg in self._host_model.buildings:
+            bldg_rooms = self._building_rooms[bldg.identifier] = []
+            for story in bldg.unique_stories:
+                story_rooms = self._story_rooms[story.identifier] = []
+                for room in story.room_2ds:
+                    self._rooms[room.identifier] = room
+                    story_rooms.append(room)
+                    bldg_rooms.append(room)
+
+    def _requested_rooms(self, request):
+        """Get a list of Room2Ds using the region keys of a request."""
+        if 'rooms' in request:
+            try:
+                return [self._rooms[r_id] for r_id in request['rooms']]
+            except KeyError as e:
+                raise ValueError('Room2D "{}" was not found.'.format(e.args[0]))
+        if 'story' in request:
+            try:
+                return self._story_rooms[request['story']]
+            except KeyError:
+                raise ValueError('Story "{}" was not found.'.format(request['story']))
+        if 'building' in request:
+            try:
+                return self._building_rooms[request['building']]
+            except KeyError:
+                raise ValueError(
+                    'Building "{}" was not found.'.format(request['building']))
+        return self._host_model.room_2ds
+
+    def _handle_metrics(self, request):
+        """Handle a request for comparison metrics."""
+        rooms = self._requested_rooms(request)
+        metrics = {}
+        for room in rooms:
+            room_metrics = room.properties.comparison.comparison_metrics()
+            metrics[room.identifier] = {
+                key: None if math.isinf(val) or math.isnan(val) else val
+                for key, val in room_metrics.items()}
+        return {'metrics': metrics}
+
+    def _handle_set_from_model(self, request):
+        """Handle a request to set the comparison properties from a Model."""
+        reset_unmatched = request.get('reset_unmatched', True)
+        if 'model' in request:
+            comparison_model = Model.from_dict(request['model'])
+        elif self._comparison_model is not None:
+            comparison_model = self._comparison_model
+        else:
+            raise ValueError('No comparison Model has been loaded.')
+        self.set_comparison_model(comparison_model, reset_unmatched)
+        return {'rooms': len(self._rooms)}
+
+    def _handle_reset(self, request):
+        """Handle a request to reset comparison properties."""
+        rooms = self._requested_rooms(request)
+        for room in rooms:
+            room.properties.comparison.reset()
+        return {'rooms': len(rooms)}
+
+    def _handle_restore(self, request):
+        """Handle a request to restore a Room2D from the comparison."""
+        try:
+            room = self._rooms[request['room']]
+        except KeyError:
+            raise ValueError('Room2D "{}" was not found.'.format(request.get('room')))
+        return {'room_2d': room.properties.comparison.restore().to_dict()}
+
+    # commands that only read the models and can run alongside the other commands
+    _READ_COMMANDS = ('metrics', 'restore')
+    _HANDLERS = {
+        'metrics': _handle_metrics,
+        'set_from_model': _handle_set_from_model,
+        'reset': _handle_reset,
+        'restore': _handle_restore
+    }
+
+    def ToString(self):
+        return self.__repr__()
+
+    def __repr__(self):
+        return 'Comparison Service: {}'.format(self._host_model.identifier)
+
+
+class _ComparisonServer(socketserver.ThreadingMixIn, socketserver.TCPServer):
+    """Threaded TCP server used by the ComparisonService."""
+    daemon_threads = True
+    allow_reuse_address = True
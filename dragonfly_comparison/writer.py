@@ -0,0 +1,160 @@
+# coding=utf-8
+"""Incremental writer of Model JSON that includes Room2D comparison properties.
+
+The functions in this module write the same JSON as the dragonfly Model to_dict
+method but each Room2D dictionary (along with its comparison properties) is
+generated and written one at a time. So the peak memory of the writing process
+is that of a single Room2D dictionary rather than the whole Model dictionary.
+"""
+import os
+import json
+
+from dragonfly.config import folders as df_folders
+
+
+def write_model(model, stream, included_prop=None):
+    """Write a dragonfly Model as JSON to a stream, one Room2D at a time.
+
+    Args:
+        model: A dragonfly Model to be written.
+        stream: A file-like object opened in text mode to which the JSON of
+            the Model will be written.
+        included_prop: List of properties to filter keys that must be included in
+            output dictionary. For example ['comparison'] will include the
+            'comparison' key of the Room2D properties but not the 'energy' key.
+            By default all the keys will be included. To exclude all the keys
+            from extensions use an empty list.
+    """
+    items = [
+        ('type', 'Model'),
+        ('identifier', model.identifier),
+        ('display_name', model.display_name),
+        ('properties', model.properties.to_dict(included_prop))
+    ]
+    if len(model.buildings) != 0:
+        items.append(('buildings', _ListWriter(
+            model.buildings, _write_building, included_prop)))
+    if len(model.context_shades) != 0:
+        items.append(('context_shades', _ListWriter(
+            model.context_shades, _write_dict_object, included_prop)))
+    items.append(('units', model.units))
+    if model.tolerance != 0:
+        items.append(('tolerance', model.tolerance))
+    if model.angle_tolerance != 0:
+        items.append(('angle_tolerance', model.angle_tolerance))
+    if model.reference_vector is not None:
+        items.append(('reference_vector', model.reference_vector.to_array()))
+    if model.user_data is not None:
+        items.append(('user_data', model.user_data))
+    if df_folders.dragonfly_schema_version is not None:
+        items.append(('version', df_folders.dragonfly_schema_version_str))
+    _write_items(stream, items)
+
+
+def model_to_dfjson(model, name=None, folder=None, included_prop=None):
+    """Write a dragonfly Model to a DFJSON file, one Room2D at a time.
+
+    Args:
+        model: A dragonfly Model to be written.
+        name: A text string for the name of the DFJSON file. If None, the model
+            identifier wil be used. (Default: None).
+        folder: A text string for the directory where the DFJSON will be written.
+            If unspecified, the current working directory will be used.
+        included_prop: List of properties to filter keys that must be included in
+            output dictionary. By default all the keys will be included.
+
+    Returns:
+        The path to the DFJSON file.
+    """
+    if name is None:
+        name = model.identifier
+    file_name = name if name.lower().endswith('.dfjson') or \
+        name.lower().endswith('.json') else '{}.dfjson'.format(name)
+    folder = folder if folder is not None else os.getcwd()
+    df_file = os.path.join(folder, file_name)
+    with open(df_file, 'w') as fp:
+        write_model(model, fp, included_prop)
+    return df_file
+
+
+class _ListWriter(object):
+    """Object used to write a list of dragonfly objects one item at a time."""
+    __slots__ = ('objects', 'write_function', 'included_prop')
+
+    def __init__(self, objects, write_function, included_prop):
+        self.objects = objects
+        self.write_function = write_function
+        self.included_prop = included_prop
+
+    def write(self, stream):
+        stream.write('[')
+        for i, obj in enumerate(self.objects):
+            if i != 0:
+                stream.write(', ')
+            self.write_function(stream, obj, self.included_prop)
+        stream.write(']')
+
+
+def _write_items(stream, items):
+    """Write a list of (key, value) tuples to a stream as a JSON object."""
+    stream.write('{')
+    for i, (key, value) in enumerate(items):
+        if i != 0:
+            stream.write(', ')
+        stream.write(json.dumps(key))
+        stream.write(': ')
+        if isinstance(value, _ListWriter):
+            value.write(stream)
+        else:
+            stream.write(json.dumps(value))
+    stream.write('}')
+
+
+def _write_dict_object(stream, obj, included_prop):
+    """Write an object with an abridged to_dict method to a stream."""
+    stream.write(json.dumps(obj.to_dict(True, included_prop)))
+
+
+def _write_building(stream, building, included_prop):
+    """Write a Building to a stream without building all of its Room2D dicts."""
+    items = [
+        ('type', 'Building'),
+        ('identifier', building.identifier),
+        ('display_name', building.display_name)
+    ]
+    if len(building.unique_stories) != 0:
+        items.append(('unique_stories', _ListWriter(
+            building.unique_stories, _write_story, included_prop)))
+    if len(building.room_3ds) != 0:
+        items.append(('room_3ds', _ListWriter(
+            building.room_3ds, _write_dict_object, included_prop)))
+    items.append(('properties', building.properties.to_dict(True, included_prop)))
+    if building.user_data is not None:
+        items.append(('user_data', building.user_data))
+    if building._roofs is not None:  # secret key used for filtered dictionaries
+        rf_dicts = []
+        for st_id, _, roof in building._roofs:
+            r_dict = roof.to_dict() if roof is not None else None
+            rf_dicts.append((st_id, r_dict))
+        items.append(('_roofs', rf_dicts))
+    _write_items(stream, items)
+
+
+def _write_story(stream, story, included_prop):
+    """Write a Story to a stream, generating each Room2D dict only when written."""
+    items = [
+        ('type', 'Story'),
+        ('identifier', story.identifier),
+        ('display_name', story.display_name),
+        ('room_2ds', _ListWriter(story.room_2ds, _write_dict_object, included_prop)),
+        ('floor_to_floor_height', story.floor_to_floor_height),
+        ('floor_height', story.floor_height),
+        ('multiplier', story.multiplier),
+        ('story_type', story.type)
+    ]
+    if story.roof is not None:
+        items.append(('roof', story.roof.to_dict()))
+    if story.user_data is not None:
+        items.append(('user_data', story.user_data))
+    items.append(('properties', story.properties.to_dict(True, included_prop)))
+    _write_items(stream, items)
@@ -0,0 +1,79 @@
+"""Tests the on-disk cache of comparison metrics."""
+import os
+import pytest
+
+from dragonfly.windowparameter import SimpleWindowRatio
+from dragonfly.room2d import Room2D
+
+from dragonfly_comparison.cache import ComparisonCache, host_fingerprint, \
+    comparison_fingerprint
+
+
+def test_fingerprints(host_and_comparison_models):
+    """Test the host and comparison fingerprint functions."""
+    model, _ = host_and_comparison_models
+    room = model.room_2ds[0]
+    host_key, comp_key = host_fingerprint(room), comparison_fingerprint(room)
+    assert host_key != comp_key
+    assert host_fingerprint(room.duplicate()) == host_key
+    assert comparison_fingerprint(room.duplicate()) == comp_key
+
+    room.properties.comparison.reset()
+    assert host_fingerprint(room) == host_key
+    assert comparison_fingerprint(room) != comp_key
+
+
+def test_comparison_cache(tmp_path, host_and_comparison_models):
+    """Test the ComparisonCache class."""
+    cache_file = os.path.join(str(tmp_path), 'comparison.db')
+    model, _ = host_and_comparison_models
+    room = model.room_2ds[0]
+    with ComparisonCache(cache_file, max_size=2) as cache:
+        assert cache.record_count == 0
+        metrics = cache.model_metrics(model)['SquareShoebox']
+        assert cache.record_count == 1
+        assert metrics['floor_area_difference'] == pytest.approx(7.625, abs=1e-3)
+        assert metrics == room.properties.comparison.comparison_metrics()
+
+    # re-open the cache and check that the record is loaded from it
+    with ComparisonCache(cache_file, max_size=2) as cache:
+        assert cache.record_count == 1
+        host_key, comp_key = host_fingerprint(room), comparison_fingerprint(room)
+        assert cache.get(host_key, comp_key) == metrics
+        assert cache.get(host_key, 'not_a_key') is None
+
+        # check that least recently used records are evicted
+        cache.put('host_2', 'comp_2', {'floor_area': 1})
+        cache.get(host_key, comp_key)
+        cache.put('host_3', 'comp_3', {'floor_area': 2})
+        assert cache.record_count == 2
+        assert cache.get('host_2', 'comp_2') is None
+        assert cache.get(host_key, comp_key) == metrics
+        cache.clear()
+        assert len(cache) == 0
+
+
+
+def test_fingerprint_pending_dict(host_and_comparison_models):
+    """Test that lazily loaded comparison dicts are fingerprinted without parsing."""
+    model, _ = host_and_comparison_models
+    room = model.room_2ds[0]
+    room.properties.comparison.comparison_windows = [SimpleWindowRatio(0.3)] * 4
+    comp_key = comparison_fingerprint(room)
+    for abridged in (False, True):
+        room_dict = room.to_dict(abridged=abridged)
+        new_room = Room2D.from_dict(room_dict)
+        comp_prop = new_room.properties.comparison
+        comp_prop.apply_properties_from_dict(
+            room_dict['properties']['comparison'], lazy=True)
+        assert comparison_fingerprint(new_room) == comp_key
+        assert comp_prop.floor_area_difference == pytest.approx(7.625, abs=1e-3)
+        assert comparison_fingerprint(new_room) == comp_key
+
+    # check that the fingerprint does not parse the dictionary
+    bad_dict = {'type': 'Room2DComparisonProperties',
+                'window_parameters': [{'type': 'NotAWindowParameter'}] * 4}
+    comp_prop.apply_properties_from_dict(bad_dict, lazy=True)
+    assert comparison_fingerprint(new_room) != comp_key
+    with pytest.raises(ValueError):
+        comp_prop.comparison_windows
@@ -0,0 +1,41 @@
+"""Fixtures shared by the tests of dragonfly_comparison."""
+import pytest
+
+from ladybug_geometry.geometry2d import Point2D
+from ladybug_geometry.geometry3d import Point3D, Face3D
+from dragonfly.windowparameter import SimpleWindowRatio
+from dragonfly.model import Model
+from dragonfly.building import Building
+from dragonfly.story import Story
+from dragonfly.room2d import Room2D
+
+
+@pytest.fixture
+def host_and_comparison_models(request):
+    """Create a host Model along with a Model to which it is compared.
+
+    Both Models have a row of 10 x 10 shoebox Room2Ds, which is a single Room2D
+    named SquareShoebox unless the fixture is parametrized with another number
+    of Room2Ds (eg. with indirect=True), in which case they are numbered from 0.
+    The first Room2D of the host Model has been snapped from that of the
+    comparison Model and its comparison properties record the original floor.
+    The comparison properties of all other Room2Ds have been reset.
+    """
+    count = getattr(request, 'param', 1)
+    rooms, comp_rooms = [], []
+    for i in range(count):
+        pts = (Point3D(i * 10, 0, 3), Point3D(i * 10 + 10, 0, 3),
+               Point3D(i * 10 + 10, 10, 3), Point3D(i * 10, 10, 3))
+        identifier = 'SquareShoebox' if count == 1 else 'SquareShoebox{}'.format(i)
+        room = Room2D(identifier, Face3D(pts), 3)
+        room.set_outdoor_window_parameters(SimpleWindowRatio(0.4))
+        room.properties.comparison.reset()
+        rooms.append(room)
+        comp_rooms.append(room.duplicate())
+    rooms[0].snap_to_points((Point2D(10.5, 0), Point2D(10.5, 10.5)), 1.0)
+    models = []
+    for model_rooms in (rooms, comp_rooms):
+        story = Story('Office_Floor', model_rooms)
+        building = Building('Office_Building', [story])
+        models.append(Model('New_Development', [building]))
+    return models
@@ -0,0 +1,66 @@
+"""Tests the reading of room footprints and their use as comparison floors."""
+import os
+import json
+import pytest
+
+from dragonfly_comparison.footprint import footprint_from_dict, read_footprints
+
+
+def test_footprint_from_dict():
+    """Test the footprint_from_dict function with both formats."""
+    feature = {
+        'type': 'Feature',
+        'properties': {'identifier': 'Shoebox0'},
+        'geometry': {
+            'type': 'Polygon',
+            'coordinates': [
+                [[0, 0], [12, 0], [12, 10], [0, 10], [0, 0]],
+                [[2, 2], [4, 2], [4, 4], [2, 4], [2, 2]]
+            ]
+        }
+    }
+    identifier, boundary, holes = footprint_from_dict(feature)
+    assert identifier == 'Shoebox0'
+    assert boundary == [(0, 0), (12, 0), (12, 10), (0, 10)]
+    assert holes == [[(2, 2), (4, 2), (4, 4), (2, 4)]]
+
+    record = {'identifier': 'Shoebox1', 'boundary': [[10, 0], [20, 0], [20, 12]]}
+    assert footprint_from_dict(record) == \
+        ('Shoebox1', [(10, 0), (20, 0), (20, 12)], None)
+
+
+@pytest.mark.parametrize('host_and_comparison_models', [2], indirect=True)
+def test_set_floors_from_footprints(tmpdir, host_and_comparison_models):
+    """Test the set_floors_from_footprints method with a streamed file."""
+    _, model = host_and_comparison_models  # the Room2Ds that were not snapped
+    records = [
+        {'identifier': 'SquareShoebox0',
+         'boundary': [[0, 0], [12, 0], [12, 10], [0, 10]]},
+        {'identifier': 'Missing', 'boundary': [[0, 0], [1, 0], [1, 1]]}
+    ]
+    fp_file = os.path.join(str(tmpdir), 'footprints.ndjson')
+    with open(fp_file, 'w') as fp:
+        for record in records:
+            fp.write(json.dumps(record) + '\n')
+    assert len(list(read_footprints(fp_file))) == 2
+
+    windows = model.room_2ds[0].properties.comparison.comparison_windows
+    count = model.properties.comparison.set_floors_from_footprints(fp_file)
+    assert count == 1
+    comp_props = [room.properties.comparison for room in model.room_2ds]
+    assert comp_props[0].floor_area_difference == pytest.approx(-20, abs=1e-6)
+    assert comp_props[0].comparison_floor_geometry.min.z == pytest.approx(3)
+    assert comp_props[0].comparison_windows is windows
+    assert comp_props[1].floor_area_difference == 0
+
+    collection = {'type': 'FeatureCollection', 'features': [{
+        'type': 'Feature', 'id': 'SquareShoebox1',
+        'geometry': {'type': 'Polygon',
+                     'coordinates': [[[10, 0], [20, 0], [20, 5], [10, 5], [10, 0]]]}
+    }]}
+    geo_file = os.path.join(str(tmpdir), 'footprints.geojson')
+    with open(geo_file, 'w') as fp:
+        json.dump(collection, fp, indent=4)
+    count = model.properties.comparison.set_floors_from_footprints(geo_file)
+    assert count == 1
+    assert comp_props[1].floor_area_difference == pytest.approx(50, abs=1e-6)
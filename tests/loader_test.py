@@ -0,0 +1,38 @@
+"""Tests the concurrent loading of host and comparison Models."""
+import os
+import json
+import pytest
+
+from dragonfly.model import Model
+
+from dragonfly_comparison.loader import load_model, load_models
+
+
+def test_load_model(tmpdir, host_and_comparison_models):
+    """Test the load_model function with the different types of input."""
+    host_model, _ = host_and_comparison_models
+    assert load_model(host_model) is host_model
+    assert isinstance(load_model(host_model.to_dict()), Model)
+    df_file = os.path.join(str(tmpdir), 'host.dfjson')
+    with open(df_file, 'w') as fp:
+        json.dump(host_model.to_dict(), fp)
+    assert load_model(df_file).identifier == host_model.identifier
+
+
+def test_load_models(tmpdir, host_and_comparison_models):
+    """Test the load_models function with files, dictionaries and Models."""
+    host_model, comp_model = host_and_comparison_models
+    host_file = os.path.join(str(tmpdir), 'host.dfjson')
+    comp_file = os.path.join(str(tmpdir), 'comparison.dfjson')
+    for model, df_file in ((host_model, host_file), (comp_model, comp_file)):
+        with open(df_file, 'w') as fp:
+            json.dump(model.to_dict(), fp)
+
+    for comp_input in (comp_file, comp_model.to_dict(), comp_model):
+        new_host, new_comp = load_models(host_file, comp_input)
+        assert isinstance(new_comp, Model)
+        comp_prop = new_host.room_2ds[0].properties.comparison
+        assert comp_prop.floor_area_difference == pytest.approx(7.625, abs=1e-3)
+
+    with pytest.raises(AssertionError):
+        load_models(host_model, os.path.join(str(tmpdir), 'missing.dfjson'))
@@ -1,4 +1,7 @@
 """Tests the features that dragonfly_comparison adds to Model."""
+import os
+import struct
+import zipfile
 import pytest
 
 from ladybug_geometry.geometry2d import Point2D
@@ -41,3 +44,309 @@ def test_from_dict():
         pytest.approx(0.38125, abs=1e-3)
     assert new_room.properties.comparison.sub_face_area_difference == \
         pytest.approx(2.1955276, abs=1e-3)
+
+
+def test_from_dict_lazy():
+    """Test that Model comparison dictionaries are only parsed when accessed."""
+    model = _snapped_model()
+    model_dict = model.to_dict()
+    new_model = Model.from_dict(model_dict)
+    comp_props = [room.properties.comparison for room in new_model.room_2ds]
+    assert all(prop._pending_dict is not None for prop in comp_props)
+    assert comp_props[0].floor_area_difference == pytest.approx(7.625, abs=1e-3)
+    assert comp_props[0]._pending_dict is None
+    assert comp_props[1]._pending_dict is not None
+    assert new_model.to_dict() == model_dict
+
+    new_model = Model.from_dict(model_dict)
+    new_model.properties.comparison.apply_properties_from_dict(model_dict, lazy=False)
+    assert all(room.properties.comparison._pending_dict is None
+               for room in new_model.room_2ds)
+
+
+def _snapped_model():
+    """Create a Model with two rooms where one has been snapped from its comparison."""
+    pts_1 = (Point3D(0, 0, 3), Point3D(10, 0, 3), Point3D(10, 10, 3), Point3D(0, 10, 3))
+    pts_2 = (Point3D(20, 0, 3), Point3D(30, 0, 3), Point3D(30, 10, 3), Point3D(20, 10, 3))
+    room_1 = Room2D('SquareShoebox1', Face3D(pts_1), 3)
+    room_2 = Room2D('SquareShoebox2', Face3D(pts_2), 3)
+    for room in (room_1, room_2):
+        room.set_outdoor_window_parameters(SimpleWindowRatio(0.4))
+        room.properties.comparison.reset()
+    room_1.snap_to_points((Point2D(10.5, 0), Point2D(10.5, 10.5)), 1.0)
+    story = Story('Office_Floor', [room_1, room_2])
+    building = Building('Office_Building', [story])
+    return Model('New_Development', [building])
+
+
+def test_set_from_model_match_keys():
+    """Test set_from_model with several match keys."""
+    model = _snapped_model()
+    comp_model = _snapped_model()
+    comp_rooms = comp_model.room_2ds
+    for room in comp_model.room_2ds:
+        room.properties.comparison.reset()
+    comp_rooms[0].snap_to_points((Point2D(11, 0), Point2D(11, 11)), 1.0)
+    comp_rooms[0].identifier = 'Renamed_Room_1'
+    comp_rooms[0].display_name = 'SquareShoebox1'
+    comp_rooms[1].identifier = 'Renamed_Room_2'
+    comp_rooms[1].display_name = 'square shoebox-2'
+
+    model.properties.comparison.set_from_model(comp_model)
+    assert all(r.properties.comparison.match_key is None for r in model.room_2ds)
+    assert model.room_2ds[0].properties.comparison.floor_area_difference == 0
+
+    model.properties.comparison.set_from_model(
+        comp_model, match_keys=('identifier', 'story_display_name', 'normalized_name'))
+    comp_props = [room.properties.comparison for room in model.room_2ds]
+    assert comp_props[0].match_key == 'story_display_name'
+    assert comp_props[1].match_key == 'normalized_name'
+    assert comp_props[0].floor_area == pytest.approx(comp_rooms[0].floor_area)
+    assert comp_props[0].floor_area_difference != 0
+    model_dict = model.to_dict()
+    assert model_dict['buildings'][0]['unique_stories'][0]['room_2ds'][0][
+        'properties']['comparison']['match_key'] == 'story_display_name'
+    new_model = Model.from_dict(model_dict)
+    assert new_model.room_2ds[0].properties.comparison.match_key == \
+        'story_display_name'
+
+    metrics = list(model.properties.comparison.query_metrics(
+        comp_model, match_keys=('normalized_name',)))
+    assert [m['match_key'] for m in metrics] == ['normalized_name'] * 2
+
+    comp_rooms[1].display_name = 'SquareShoebox1'  # ambiguous names are not used
+    model.properties.comparison.set_from_model(
+        comp_model, match_keys=('story_display_name',))
+    assert all(r.properties.comparison.match_key is None for r in model.room_2ds)
+
+    # shared identifiers are matched with the first comparison room
+    comp_rooms[0].identifier = comp_rooms[1].identifier = 'SquareShoebox1'
+    model.properties.comparison.set_from_model(comp_model)
+    assert comp_props[0].match_key == 'identifier'
+    assert comp_props[0].floor_area == pytest.approx(comp_rooms[0].floor_area)
+    assert comp_props[1].match_key is None
+    with pytest.raises(AssertionError):
+        model.properties.comparison.set_from_model(comp_model, match_keys=('area',))
+
+
+def test_metric_columns():
+    """Test the metric_columns method."""
+    model = _snapped_model()
+    identifiers, columns = model.properties.comparison.metric_columns()
+    assert identifiers == ['SquareShoebox1', 'SquareShoebox2']
+    assert len(columns) == 28
+    floor_diff = columns['floor_area_difference']
+    assert floor_diff[0] == pytest.approx(7.625, abs=1e-3)
+    assert floor_diff[1] == 0
+    buffer = memoryview(floor_diff)
+    assert buffer.format == 'd'
+    assert buffer.nbytes == 16
+
+    _, columns = model.properties.comparison.metric_columns(['floor_area'])
+    assert list(columns.keys()) == ['floor_area']
+    with pytest.raises(AssertionError):
+        model.properties.comparison.metric_columns(['not_a_metric'])
+
+
+def test_to_csv_npz(tmp_path):
+    """Test the to_csv and to_npz methods."""
+    model = _snapped_model()
+    csv_file = os.path.join(str(tmp_path), 'metrics.csv')
+    model.properties.comparison.to_csv(csv_file, ['floor_area', 'floor_area_difference'])
+    with open(csv_file) as inf:
+        lines = inf.read().splitlines()
+    assert lines[0] == 'identifier,floor_area,floor_area_difference'
+    assert lines[1].startswith('SquareShoebox1,')
+    assert float(lines[1].split(',')[2]) == pytest.approx(7.625, abs=1e-3)
+
+    npz_file = os.path.join(str(tmp_path), 'metrics.npz')
+    model.properties.comparison.to_npz(npz_file, ['floor_area_difference'])
+    with zipfile.ZipFile(npz_file) as npz:
+        assert sorted(npz.namelist()) == \
+            ['floor_area_difference.npy', 'identifier.npy']
+        data = npz.read('floor_area_difference.npy')
+    assert data.startswith(b'\x93NUMPY')
+    header_len = struct.unpack('<H', data[8:10])[0]
+    assert (10 + header_len) % 64 == 0
+    assert b"'<f8'" in data[10:10 + header_len]
+    values = struct.unpack('<2d', data[10 + header_len:])
+    assert values[0] == pytest.approx(7.625, abs=1e-3)
+    assert values[1] == 0
+
+
+def test_segment_differences():
+    """Test the segment_differences method."""
+    model = _snapped_model()
+    seg_diffs = model.properties.comparison.segment_differences(1.0, 5.0)
+    assert [d[1] for d in seg_diffs['SquareShoebox1']] == [0, 1, 2, 3]
+    assert seg_diffs['SquareShoebox1'][0][2] == pytest.approx(0.5, abs=1e-6)
+    assert all(d[2:] == (0, 0, 0) for d in seg_diffs['SquareShoebox2'])
+
+
+def test_floor_changes():
+    """Test the floor_changes method of the Model."""
+    model = _snapped_model()
+    model.tolerance, model.angle_tolerance = 0.01, 1
+    for cpu_count in (None, 2):
+        changes = model.properties.comparison.floor_changes(cpu_count=cpu_count)
+        assert changes['SquareShoebox1']['added_area'] == pytest.approx(7.625, abs=1e-3)
+        assert changes['SquareShoebox1']['removed_area'] == pytest.approx(0, abs=1e-6)
+        assert changes['SquareShoebox2']['added'] == []
+
+
+def test_story_change_grids():
+    """Test the story_change_grids method of the Model."""
+    model = _snapped_model()
+    grids = model.properties.comparison.story_change_grids(0.5)
+    grid = grids['Office_Floor']
+    assert grid['width'] == 60 and grid['height'] == 21
+    assert grid['host_only'] * 0.25 == pytest.approx(7.625, abs=0.5)
+    assert grid['comparison_only'] == 0
+    assert grid['both'] * 0.25 == pytest.approx(200, abs=1e-6)
+
+
+def test_assign_comparisons():
+    """Test the assign_comparisons method of the Model."""
+    model = _snapped_model()
+    room_1, room_2 = model.room_2ds
+    pts = (Point3D(0, 0, 3), Point3D(0, 10, 3), Point3D(12, 10, 3), Point3D(12, 0, 3))
+    floors = [Face3D(pts), None]
+    model.properties.comparison.assign_comparisons(
+        ['SquareShoebox1', room_2], floors, skylights=[None, GriddedSkylightRatio(0.1)])
+    comp_floor = room_1.properties.comparison.comparison_floor_geometry
+    assert comp_floor.normal.z == pytest.approx(1, abs=1e-6)
+    assert comp_floor.area == pytest.approx(120, abs=1e-6)
+    assert room_1.properties.comparison.comparison_windows is not None
+    assert room_2.properties.comparison.comparison_floor_geometry is None
+    assert room_2.properties.comparison.comparison_skylight.skylight_ratio == 0.1
+
+    trusted = [room_2.properties.comparison._comparison_state(),
+               room_1.properties.comparison._comparison_state()]
+    model.properties.comparison.assign_comparisons(
+        model.room_2ds, *zip(*trusted), validate=False)
+    assert room_1.properties.comparison._comparison_state() == trusted[0]
+    assert room_2.properties.comparison.comparison_floor_geometry is comp_floor
+
+    with pytest.raises(AssertionError):
+        model.properties.comparison.assign_comparisons(model.room_2ds, [pts, None])
+    with pytest.raises(AssertionError):
+        model.properties.comparison.assign_comparisons(model.room_2ds, floors[:1])
+    with pytest.raises(ValueError):
+        model.properties.comparison.assign_comparisons(['Missing'], floors[:1])
+
+
+def test_orientation_report():
+    """Test the orientation_report method."""
+    model = _snapped_model()
+    report = model.properties.comparison.orientation_report()
+    assert len(report['rooms']) == 2
+    room_areas = report['rooms']['SquareShoebox1']
+    story_areas = report['stories']['Office_Floor']
+    assert story_areas['wall_area'] == pytest.approx([60, 60, 60, 60], abs=1e-6)
+    assert story_areas['wall_area_difference'] == \
+        pytest.approx(room_areas['wall_area_difference'], abs=1e-6)
+    assert sum(story_areas['wall_area_difference']) == pytest.approx(
+        model.room_2ds[0].properties.comparison.wall_area_difference, abs=1e-6)
+
+
+def test_query_metrics():
+    """Test the query_metrics method."""
+    model = _snapped_model()
+    comp_rooms = [room.properties.comparison.restore() for room in model.room_2ds]
+    comp_model = Model('Comparison', [Building('Office_Building', [
+        Story('Office_Floor', comp_rooms)])])
+    model.properties.comparison.reset()
+    # give the unrequested room a comparison dict that cannot be parsed
+    bad_dict = {'type': 'Room2DComparisonProperties',
+                'window_parameters': [{'type': 'NotAWindowParameter'}] * 4}
+    unrequested = model.room_2ds[1].properties.comparison
+    unrequested.apply_properties_from_dict(bad_dict, lazy=True)
+
+    records = model.properties.comparison.query_metrics(
+        comp_model, lambda r: r.identifier == 'SquareShoebox1')
+    records = list(records)
+    assert len(records) == 1
+    assert records[0]['identifier'] == 'SquareShoebox1'
+    assert records[0]['floor_area_difference'] == pytest.approx(7.625, abs=1e-3)
+    # check that the host comparison properties have not been changed or parsed
+    assert model.room_2ds[0].properties.comparison.floor_area_difference == 0
+    with pytest.raises(ValueError):
+        unrequested.comparison_windows
+    unrequested.reset()
+
+    records = model.properties.comparison.query_metrics(
+        comp_model, rooms=model.stories[0].room_2ds)
+    assert [rec['identifier'] for rec in records] == \
+        ['SquareShoebox1', 'SquareShoebox2']
+
+    comp_model.buildings[0].unique_stories[0].room_2ds[1].identifier = 'Other'
+    records = model.properties.comparison.query_metrics(
+        comp_model, include_unmatched=False)
+    assert [rec['identifier'] for rec in records] == ['SquareShoebox1']
+
+
+def test_snapshots():
+    """Test the recording and restoring of comparison snapshots."""
+    model = _snapped_model()
+    comp_prop = model.properties.comparison
+    room_1, room_2 = model.room_2ds
+    assert comp_prop.snapshot_count == 0
+    assert comp_prop.snapshot_index == -1
+
+    assert comp_prop.save_snapshot() == 0
+    first_geo = room_1.properties.comparison.comparison_floor_geometry
+    room_1.properties.comparison.reset()
+    assert room_1.properties.comparison.floor_area_difference == 0
+    assert comp_prop.save_snapshot() == 1
+    assert len(comp_prop._snapshots[1]) == 1  # only the changed room is stored
+
+    assert comp_prop.undo_snapshot() == 0
+    assert room_1.properties.comparison.comparison_floor_geometry is first_geo
+    assert room_1.properties.comparison.floor_area_difference == \
+        pytest.approx(7.625, abs=1e-3)
+    assert comp_prop.redo_snapshot() == 1
+    assert room_1.properties.comparison.floor_area_difference == 0
+
+    # check that only the rooms that changed between the snapshots are restored
+    room_1.properties.comparison.comparison_windows = None
+    bad_dict = {'type': 'Room2DComparisonProperties',
+                'window_parameters': [{'type': 'NotAWindowParameter'}] * 4}
+    room_2.properties.comparison.apply_properties_from_dict(bad_dict, lazy=True)
+    comp_prop.undo_snapshot()  # the pending dict of room_2 is not parsed
+    assert room_1.properties.comparison.comparison_windows is not None
+    with pytest.raises(ValueError):
+        room_2.properties.comparison.comparison_windows
+    room_2.properties.comparison.reset()
+    comp_prop.redo_snapshot()
+
+    # check that saving after an undo discards the later snapshots
+    comp_prop.undo_snapshot()
+    comp_prop.save_snapshot()
+    assert comp_prop.snapshot_count == 2
+    with pytest.raises(AssertionError):
+        comp_prop.redo_snapshot()
+
+
+def test_rollup_metrics():
+    """Test the rollup_metrics method."""
+    model = _snapped_model()
+    model.buildings[0].unique_stories[0].multiplier = 2
+    rollups = model.properties.comparison.rollup_metrics()
+    story_metrics = rollups['stories']['Office_Floor']
+    assert story_metrics['floor_area_difference'] == pytest.approx(7.625, abs=1e-3)
+    assert story_metrics['floor_area'] == pytest.approx(200, abs=1e-3)
+    assert story_metrics['floor_area_percent_change'] == \
+        pytest.approx(7.625 / 2, abs=1e-3)
+    bldg_metrics = rollups['buildings']['Office_Building']
+    assert bldg_metrics['floor_area_difference'] == pytest.approx(15.25, abs=1e-3)
+
+    # check that only the edited room is recomputed
+    room_1, room_2 = model.room_2ds
+    record_1 = room_1.properties.comparison._current_metrics()
+    room_2.snap_to_points((Point2D(30.5, 0), Point2D(30.5, 10.5)), 1.0)
+    assert not room_1.properties.comparison.is_stale
+    assert room_2.properties.comparison.is_stale
+    rollups = model.properties.comparison.rollup_metrics()
+    assert room_1.properties.comparison._current_metrics() is record_1
+    assert rollups['stories']['Office_Floor']['floor_area_difference'] == \
+        pytest.approx(15.25, abs=1e-3)
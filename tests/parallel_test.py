@@ -0,0 +1,20 @@
+"""Tests the mapping of jobs over several processes."""
+from dragonfly_comparison.parallel import map_jobs
+
+
+def _square(job):
+    return job * job
+
+
+def _offset(job, shared_data):
+    return job + shared_data['offset']
+
+
+def test_map_jobs():
+    """Test the map_jobs function with and without shared data."""
+    jobs = list(range(10))
+    for cpu_count in (None, 2):
+        assert map_jobs(_square, jobs, cpu_count) == [j * j for j in jobs]
+        assert map_jobs(_offset, jobs, cpu_count, {'offset': 5}) == \
+            [j + 5 for j in jobs]
+    assert map_jobs(_square, [], 2) == []
@@ -0,0 +1,72 @@
+"""Tests the progress reporting and cancellation of model comparison operations."""
+import pytest
+
+from ladybug_geometry.geometry2d import Point2D
+
+from dragonfly_comparison.progress import CancellationToken, ProgressTracker
+
+
+def test_progress_tracker():
+    """Test the ProgressTracker class."""
+    reports = []
+    tracker = ProgressTracker(3, lambda *args: reports.append(args), interval=0)
+    tracker.step()
+    tracker.step(2)
+    tracker.finish()
+    assert tracker.processed == 3
+    assert len(reports) == 2
+    assert reports[-1][:2] == (3, 3)
+    assert reports[-1][2] >= 0
+    assert not tracker.is_cancelled
+
+
+@pytest.mark.parametrize('host_and_comparison_models', [5], indirect=True)
+def test_set_from_model_progress(host_and_comparison_models):
+    """Test progress reporting of set_from_model."""
+    model, comp_model = host_and_comparison_models
+    reports = []
+    model.properties.comparison.set_from_model(
+        comp_model, progress=lambda *args: reports.append(args))
+    assert reports[-1][:2] == (5, 5)
+    assert all(r.properties.comparison.match_key == 'identifier'
+               for r in model.room_2ds)
+
+
+class _CountdownToken(CancellationToken):
+    """A cancellation token that cancels itself after a number of checks."""
+
+    def __init__(self, checks):
+        CancellationToken.__init__(self)
+        self.checks = checks
+
+    @property
+    def is_cancelled(self):
+        self.checks -= 1
+        if self.checks < 0:
+            self.cancel()
+        return self._is_cancelled
+
+
+@pytest.mark.parametrize('host_and_comparison_models', [5], indirect=True)
+def test_cancellation(host_and_comparison_models):
+    """Test cancelling model comparison operations between rooms."""
+    model, comp_model = host_and_comparison_models
+    token = _CountdownToken(2)
+    reports = []
+    model.properties.comparison.set_from_model(
+        comp_model, progress=lambda *args: reports.append(args), cancellation=token)
+    assert token.is_cancelled
+    assert reports[-1][:2] == (2, 5)
+    set_rooms = [r.properties.comparison.match_key is not None
+                 for r in model.room_2ds]
+    assert set_rooms == [True, True, False, False, False]
+
+    identifiers, columns = model.properties.comparison.metric_columns(
+        ['floor_area'], cancellation=token)
+    assert identifiers == []
+    assert len(columns['floor_area']) == 0
+
+    model.properties.comparison.reset(cancellation=CancellationToken())
+    model.room_2ds[0].snap_to_points((Point2D(10.5, 0), Point2D(10.5, 10.5)), 1.0)
+    identifiers, columns = model.properties.comparison.metric_columns(['floor_area'])
+    assert len(identifiers) == 5
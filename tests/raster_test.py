@@ -0,0 +1,32 @@
+"""Tests the rasterization of host and comparison floor plates."""
+import pytest
+
+from ladybug_geometry.geometry3d import Vector3D, Point3D, Face3D
+
+from dragonfly_comparison.raster import rasterize_floors, HOST, COMPARISON
+
+
+def test_rasterize_floors():
+    """Test the rasterize_floors function with a moved floor with a hole."""
+    pts = (Point3D(0, 0, 3), Point3D(10, 0, 3), Point3D(10, 10, 3), Point3D(0, 10, 3))
+    hole = (Point3D(2, 2, 3), Point3D(4, 2, 3), Point3D(4, 4, 3), Point3D(2, 4, 3))
+    host = Face3D(pts, holes=[hole])
+    comp = Face3D(pts).move(Vector3D(2, 0, 0))
+    grid = rasterize_floors([host], [comp], 0.5)
+
+    assert grid['origin'] == (0, 0)
+    assert grid['width'] == 24
+    assert grid['height'] == 20
+    assert len(grid['cells']) == 24 * 20
+    cell_area = 0.5 * 0.5
+    assert grid['host_only'] * cell_area == pytest.approx(20, abs=1e-6)
+    assert grid['comparison_only'] * cell_area == pytest.approx(24, abs=1e-6)
+    assert grid['both'] * cell_area == pytest.approx(76, abs=1e-6)
+    cells, width = grid['cells'], grid['width']
+    assert cells[0] == HOST
+    assert cells[5 * width + 5] == COMPARISON  # inside the host hole
+    assert cells[width - 1] == COMPARISON
+    assert cells[10 * width + 10] == HOST | COMPARISON
+
+    grid = rasterize_floors([], [], 0.5)
+    assert grid['width'] == 0 and len(grid['cells']) == 0
@@ -0,0 +1,64 @@
+"""Tests the functions for comparing a series of Model revisions."""
+import pytest
+
+from ladybug_geometry.geometry3d import Point3D, Face3D
+from dragonfly.windowparameter import SimpleWindowRatio
+from dragonfly.model import Model
+from dragonfly.building import Building
+from dragonfly.story import Story
+from dragonfly.room2d import Room2D
+
+from dragonfly_comparison.revision import model_metric_values, difference_matrices
+
+
+def _revision_model(width, window_ratio, extra_room=False):
+    """Create a Model revision with a room of a given width and window ratio."""
+    pts = (Point3D(0, 0, 3), Point3D(width, 0, 3),
+           Point3D(width, 10, 3), Point3D(0, 10, 3))
+    room = Room2D('Office', Face3D(pts), 3)
+    room.set_outdoor_window_parameters(SimpleWindowRatio(window_ratio))
+    rooms = [room]
+    if extra_room:
+        pts = (Point3D(20, 0, 3), Point3D(25, 0, 3),
+               Point3D(25, 10, 3), Point3D(20, 10, 3))
+        rooms.append(Room2D('Storage', Face3D(pts), 3))
+    story = Story('Office_Floor', rooms)
+    building = Building('Office_Building', [story])
+    return Model('Revision', [building])
+
+
+def test_model_metric_values():
+    """Test the model_metric_values function."""
+    model = _revision_model(10, 0.4)
+    values = model_metric_values(model, ('floor_area', 'wall_area', 'window_area'))
+    assert list(values.keys()) == ['Office']
+    assert values['Office'][0] == pytest.approx(100, abs=1e-3)
+    assert values['Office'][1] == pytest.approx(120, abs=1e-3)
+    assert values['Office'][2] == pytest.approx(48, abs=1e-3)
+
+    with pytest.raises(AssertionError):
+        model_metric_values(model, ('not_a_metric',))
+
+
+def test_difference_matrices():
+    """Test the difference_matrices function."""
+    models = [_revision_model(10, 0.4), _revision_model(12, 0.4),
+              _revision_model(12, 0.5, True)]
+    matrices = difference_matrices(models, ('floor_area', 'window_area'))
+    floor_mtx = matrices['floor_area']
+    assert floor_mtx[0][0] == 0
+    assert floor_mtx[1][0] == pytest.approx(20, abs=1e-3)
+    assert floor_mtx[0][1] == pytest.approx(-20, abs=1e-3)
+    assert floor_mtx[2][0] == pytest.approx(70, abs=1e-3)
+    assert matrices['window_area'][2][1] == pytest.approx(13.2, abs=1e-3)
+
+    abs_matrices = difference_matrices(models, ('floor_area',), absolute=True)
+    abs_mtx = abs_matrices['floor_area']
+    assert abs_mtx[1][0] == abs_mtx[0][1] == pytest.approx(20, abs=1e-3)
+    assert abs_mtx[2][1] == abs_mtx[1][2] == pytest.approx(50, abs=1e-3)
+
+    models.append(_revision_model(10, 0.4))
+    para_matrices = difference_matrices(
+        models, ('floor_area',), absolute=True, cpu_count=2)
+    assert para_matrices['floor_area'][3][0] == 0
+    assert para_matrices['floor_area'][3][2] == pytest.approx(70, abs=1e-3)
@@ -1,13 +1,15 @@
 """Tests the features that dragonfly_comparison adds to dragonfly_core Room2D."""
+import threading
 import pytest
 
-from ladybug_geometry.geometry2d import Point2D
+from ladybug_geometry.geometry2d import Point2D, Polygon2D
 from ladybug_geometry.geometry3d import Vector3D, Point3D, Plane, Face3D
 from honeybee.boundarycondition import boundary_conditions as bcs
 from dragonfly.room2d import Room2D
-from dragonfly.windowparameter import SimpleWindowRatio, SingleWindow
+from dragonfly.windowparameter import SimpleWindowRatio, SingleWindow, \
+    RectangularWindows, DetailedWindows
 from dragonfly.shadingparameter import Overhang
-from dragonfly.skylightparameter import GriddedSkylightRatio
+from dragonfly.skylightparameter import GriddedSkylightRatio, DetailedSkylights
 
 from dragonfly_comparison.properties.room2d import Room2DComparisonProperties
 
@@ -82,6 +84,118 @@ def test_comparison_properties_setability():
         pytest.approx(4.1425, abs=1e-3)
 
 
+def test_host_metrics():
+    """Test the host_metrics method."""
+    pts = (Point3D(0, 0, 3), Point3D(10, 0, 3), Point3D(10, 10, 3), Point3D(0, 10, 3))
+    room = Room2D('SquareShoebox', Face3D(pts), 3)
+    room.is_top_exposed = True
+    room.set_outdoor_window_parameters(SimpleWindowRatio(0.4))
+    room.skylight_parameters = GriddedSkylightRatio(0.05)
+
+    host_metrics = room.properties.comparison.host_metrics()
+    assert host_metrics['floor_area'] == pytest.approx(100, abs=1e-3)
+    assert host_metrics['wall_area'] == pytest.approx(120, abs=1e-3)
+    assert host_metrics['wall_sub_face_area'] == pytest.approx(48, abs=1e-3)
+    assert host_metrics['roof_sub_face_area'] == pytest.approx(5, abs=1e-3)
+    assert host_metrics['window_area'] == pytest.approx(53, abs=1e-3)
+    assert host_metrics['door_area'] == 0
+
+    room.properties.comparison.reset()
+    room.snap_to_points((Point2D(10.5, 0), Point2D(10.5, 10.5)), 1.0)
+    host_metrics = room.properties.comparison.host_metrics()
+    assert host_metrics['floor_area'] - room.properties.comparison.floor_area == \
+        pytest.approx(room.properties.comparison.floor_area_difference, abs=1e-6)
+
+
+def test_host_values_cache():
+    """Test that the cached host values follow every edit of the host Room2D."""
+    pts = (Point3D(0, 0, 3), Point3D(10, 0, 3), Point3D(10, 10, 3), Point3D(0, 10, 3))
+    room = Room2D('SquareShoebox', Face3D(pts), 3)
+    room.set_outdoor_window_parameters(SimpleWindowRatio(0.4))
+    comp_prop = room.properties.comparison
+    comp_prop.reset()
+    comp_prop.comparison_windows = [SimpleWindowRatio(0.2)] * 4
+
+    def _check_host_consistency():
+        assert comp_prop.floor_area_difference == \
+            pytest.approx(room.floor_area - comp_prop.floor_area, abs=1e-6)
+        assert comp_prop.wall_sub_face_area_difference == pytest.approx(
+            room.wall_sub_face_area - comp_prop.wall_sub_face_area, abs=1e-6)
+        assert comp_prop.roof_sub_face_area_difference == pytest.approx(
+            room.roof_sub_face_area - comp_prop.roof_sub_face_area, abs=1e-6)
+        assert comp_prop.comparison_metrics()['floor_area_difference'] == \
+            pytest.approx(comp_prop.floor_area_difference, abs=1e-6)
+
+    _check_host_consistency()
+    assert comp_prop.wall_sub_face_area_difference == pytest.approx(24, abs=1e-3)
+    comp_prop.comparison_windows = [SimpleWindowRatio(0.3)] * 4  # comparison edit
+    assert comp_prop.wall_sub_face_area_difference == pytest.approx(12, abs=1e-3)
+    _check_host_consistency()
+
+    # each host edit must be reflected in the metrics
+    room.set_outdoor_window_parameters(SimpleWindowRatio(0.5))
+    assert comp_prop.wall_sub_face_area_difference == pytest.approx(24, abs=1e-3)
+    _check_host_consistency()
+    room.snap_to_points((Point2D(10.5, 0), Point2D(10.5, 10.5)), 1.0)
+    assert comp_prop.floor_area_difference == pytest.approx(7.625, abs=1e-3)
+    _check_host_consistency()
+    room.floor_to_ceiling_height = 4
+    _check_host_consistency()
+    room.is_top_exposed = True
+    room.skylight_parameters = GriddedSkylightRatio(0.05)
+    _check_host_consistency()
+    assert comp_prop.duplicate().floor_area_difference == \
+        pytest.approx(comp_prop.floor_area_difference, abs=1e-6)
+
+
+def test_comparison_metrics():
+    """Test the comparison_metrics method."""
+    pts = (Point3D(0, 0, 3), Point3D(10, 0, 3), Point3D(10, 10, 3), Point3D(0, 10, 3))
+    room = Room2D('SquareShoebox', Face3D(pts), 3)
+    room.is_top_exposed = True
+    room.set_outdoor_window_parameters(SimpleWindowRatio(0.4))
+    room.skylight_parameters = GriddedSkylightRatio(0.05)
+    room.properties.comparison.reset()
+    room.snap_to_points((Point2D(10.5, 0), Point2D(10.5, 10.5)), 1.0)
+
+    comp_prop = room.properties.comparison
+    metrics = comp_prop.comparison_metrics()
+    assert len(metrics) == 28
+    for base in ('floor_area', 'wall_area', 'wall_sub_face_area',
+                 'roof_sub_face_area', 'sub_face_area', 'window_area', 'door_area'):
+        for suffix in ('', '_difference', '_abs_difference', '_percent_change'):
+            key = base + suffix
+            assert metrics[key] == pytest.approx(getattr(comp_prop, key), abs=1e-9)
+
+
+def test_window_door_areas():
+    """Test the window and door areas with parameters that include doors."""
+    pts = (Point3D(0, 0, 3), Point3D(10, 0, 3), Point3D(10, 10, 3), Point3D(0, 10, 3))
+    room = Room2D('SquareShoebox', Face3D(pts), 3)
+    room.is_top_exposed = True
+    rect_win = RectangularWindows(
+        (Point2D(1, 0), Point2D(5, 1)), (2, 3), (2.5, 1.5), (True, False))
+    win_pgon = Polygon2D((Point2D(1, 1), Point2D(3, 1), Point2D(3, 2), Point2D(1, 2)))
+    door_pgon = Polygon2D((Point2D(5, 0), Point2D(6, 0), Point2D(6, 2), Point2D(5, 2)))
+    detail_win = DetailedWindows((win_pgon, door_pgon), (False, True))
+    room.window_parameters = (rect_win, detail_win, None, rect_win)
+    sky_pgon = Polygon2D((Point2D(1, 1), Point2D(4, 1), Point2D(4, 2), Point2D(1, 2)))
+    sky_door = Polygon2D((Point2D(5, 5), Point2D(6, 5), Point2D(6, 7), Point2D(5, 7)))
+    room.skylight_parameters = DetailedSkylights((sky_pgon, sky_door), (False, True))
+
+    host_metrics = room.properties.comparison.host_metrics()
+    assert host_metrics['window_area'] == pytest.approx(14, abs=1e-6)
+    assert host_metrics['door_area'] == pytest.approx(14, abs=1e-6)
+    assert room.properties.comparison.window_area == pytest.approx(14, abs=1e-6)
+    assert room.properties.comparison.door_area == pytest.approx(14, abs=1e-6)
+
+    room.properties.comparison.reset()
+    assert room.properties.comparison.window_area == pytest.approx(14, abs=1e-6)
+    assert room.properties.comparison.door_area == pytest.approx(14, abs=1e-6)
+    assert room.properties.comparison.window_area_difference == 0
+    assert room.properties.comparison.door_area_difference == 0
+
+
 def test_restore():
     """Test the restoring of a Room2D to it's comparison."""
     pts = (Point3D(0, 0, 3), Point3D(10, 0, 3), Point3D(10, 10, 3), Point3D(0, 10, 3))
@@ -125,8 +239,21 @@ def test_duplicate():
     assert room_original.properties.comparison.host is not \
         room_dup_1.properties.comparison.host
 
+    assert room_original.properties.comparison.comparison_floor_geometry is \
+        room_dup_1.properties.comparison.comparison_floor_geometry
+    assert room_original.properties.comparison.comparison_windows is \
+        room_dup_1.properties.comparison.comparison_windows
+
     assert room_original.properties.comparison.floor_area_difference == \
         room_dup_1.properties.comparison.floor_area_difference
+    room_dup_2 = room_original.duplicate()
+    room_dup_2.move(Vector3D(2, 2, 0))
+    room_dup_2.scale(2)
+    assert room_original.properties.comparison.comparison_floor_geometry[0] == \
+        Point3D(0, 0, 3)
+    assert room_original.properties.comparison.floor_area == pytest.approx(100)
+    assert room_original.properties.comparison.comparison_windows[0].window_ratio == \
+        pytest.approx(0.4)
     snap_points = (Point2D(10.5, 0), Point2D(10.5, 10.5))
     room_dup_1.snap_to_points(snap_points, 1.0)
     assert room_original.properties.comparison.floor_area_difference != \
@@ -261,3 +388,389 @@ def test_from_dict():
     assert new_room.properties.comparison.sub_face_area_difference == \
         pytest.approx(2.1955276, abs=1e-3)
     assert new_room.to_dict() == rd
+
+
+def test_segment_differences():
+    """Test the segment_differences method."""
+    pts = (Point3D(0, 0, 3), Point3D(10, 0, 3), Point3D(10, 10, 3), Point3D(0, 10, 3))
+    room = Room2D('SquareShoebox', Face3D(pts), 3)
+    room.set_outdoor_window_parameters(SimpleWindowRatio(0.4))
+
+    seg_diffs = room.properties.comparison.segment_differences()
+    assert [d[:2] for d in seg_diffs] == [(0, 0), (1, 1), (2, 2), (3, 3)]
+    assert all(d[2:] == (0, 0, 0) for d in seg_diffs)
+
+    room.properties.comparison.reset()
+    room.snap_to_points((Point2D(10.5, 0), Point2D(10.5, 10.5)), 1.0)
+    comp_prop = room.properties.comparison
+    seg_diffs = comp_prop.segment_differences()
+    assert seg_diffs[0][:2] == (0, 0)
+    assert seg_diffs[0][2] == pytest.approx(0.5, abs=1e-6)
+    assert seg_diffs[0][3] == pytest.approx(1.5, abs=1e-6)
+    assert seg_diffs[0][4] == pytest.approx(0.6, abs=1e-6)
+    assert seg_diffs[1][:2] == (1, None)
+    assert seg_diffs[1][2] == pytest.approx(room.floor_segments[1].length, abs=1e-6)
+    assert seg_diffs[3][:2] == (3, 3)
+    assert seg_diffs[3][2] == 0
+    assert [d[:2] for d in seg_diffs[4:]] == [(None, 1), (None, 2)]
+    assert seg_diffs[4][3] == pytest.approx(-30, abs=1e-6)
+
+    seg_diffs = comp_prop.segment_differences(tolerance=1.0)
+    assert [d[1] for d in seg_diffs] == [0, 1, None, 3, 2]
+    seg_diffs = comp_prop.segment_differences(1.0, 5.0)
+    assert [d[1] for d in seg_diffs] == [0, 1, 2, 3]
+    assert seg_diffs[1][2] == pytest.approx(0.5, abs=1e-6)
+
+    # the segment differences add up to the room differences at any tolerance
+    for tol in (0.01, 1.0):
+        seg_diffs = comp_prop.segment_differences(tol)
+        assert sum(d[3] for d in seg_diffs) == \
+            pytest.approx(comp_prop.wall_area_difference, abs=1e-6)
+        assert sum(d[4] for d in seg_diffs) == \
+            pytest.approx(comp_prop.wall_sub_face_area_difference, abs=1e-6)
+
+
+def test_segment_differences_host_windows():
+    """Test segment_differences with a comparison floor and no comparison windows."""
+    pts = (Point3D(0, 0, 3), Point3D(10, 0, 3), Point3D(10, 10, 3), Point3D(0, 10, 3))
+    room = Room2D('SquareShoebox', Face3D(pts), 3)
+    room.set_outdoor_window_parameters(SimpleWindowRatio(0.4))
+    comp_prop = room.properties.comparison
+    comp_pts = (Point3D(0, 0, 3), Point3D(10, 0, 3), Point3D(10, 5, 3),
+                Point3D(10, 10, 3), Point3D(0, 10, 3))
+    comp_prop.comparison_floor_geometry = Face3D(comp_pts)
+    assert comp_prop.comparison_windows is None
+
+    seg_diffs = comp_prop.segment_differences()
+    assert len(seg_diffs) == 5
+    assert all(d[4] == 0 for d in seg_diffs)
+    assert sum(d[4] for d in seg_diffs) == \
+        pytest.approx(comp_prop.window_area_difference, abs=1e-6)
+    assert sum(d[3] for d in seg_diffs) == \
+        pytest.approx(comp_prop.wall_area_difference, abs=1e-6)
+
+
+def test_orientation_areas():
+    """Test the orientation_areas method."""
+    pts = (Point3D(0, 0, 3), Point3D(10, 0, 3), Point3D(10, 10, 3), Point3D(0, 10, 3))
+    room = Room2D('SquareShoebox', Face3D(pts), 3)
+    room.set_outdoor_window_parameters(SimpleWindowRatio(0.4))
+    room.properties.comparison.reset()
+    room.snap_to_points((Point2D(10.5, 0), Point2D(10.5, 10)), 1.0)
+
+    areas = room.properties.comparison.orientation_areas()
+    assert areas['wall_area'] == pytest.approx([30, 30, 30, 30], abs=1e-6)
+    assert areas['wall_area_difference'] == pytest.approx([1.5, 0, 1.5, 0], abs=1e-6)
+    assert areas['window_area'] == pytest.approx([12, 12, 12, 12], abs=1e-6)
+    assert areas['window_area_difference'] == \
+        pytest.approx([0.6, 0, 0.6, 0], abs=1e-6)
+
+    areas = room.properties.comparison.orientation_areas(4, 90)
+    assert areas['wall_area_difference'] == pytest.approx([0, 1.5, 0, 1.5], abs=1e-6)
+    areas = room.properties.comparison.orientation_areas(8)
+    assert len(areas['wall_area']) == 8
+
+
+def test_orientation_areas_host_windows():
+    """Test orientation_areas with a comparison floor and no comparison windows."""
+    pts = (Point3D(0, 0, 3), Point3D(10, 0, 3), Point3D(10, 10, 3), Point3D(0, 10, 3))
+    room = Room2D('SquareShoebox', Face3D(pts), 3)
+    room.set_outdoor_window_parameters(SimpleWindowRatio(0.4))
+    comp_prop = room.properties.comparison
+    comp_pts = (Point3D(0, 0, 3), Point3D(10, 0, 3), Point3D(10, 5, 3),
+                Point3D(10, 10, 3), Point3D(0, 10, 3))
+    comp_prop.comparison_floor_geometry = Face3D(comp_pts)
+
+    areas = comp_prop.orientation_areas()
+    assert sum(areas['window_area']) == pytest.approx(comp_prop.window_area, abs=1e-6)
+    assert sum(areas['window_area']) == pytest.approx(48, abs=1e-6)
+    assert areas['window_area_difference'] == pytest.approx([0, 0, 0, 0], abs=1e-6)
+    assert sum(areas['wall_area']) == pytest.approx(comp_prop.wall_area, abs=1e-6)
+
+    comp_prop.comparison_windows = [SimpleWindowRatio(0.2)] * 5
+    areas = comp_prop.orientation_areas()
+    assert sum(areas['window_area']) == pytest.approx(comp_prop.window_area, abs=1e-6)
+
+
+def test_detailed_areas():
+    """Test the window and door split of detailed skylight parameters."""
+    pts = (Point3D(0, 0, 3), Point3D(10, 0, 3), Point3D(10, 10, 3), Point3D(0, 10, 3))
+    room = Room2D('SquareShoebox', Face3D(pts), 3)
+    room.is_top_exposed = True
+    sky_pgon = Polygon2D((Point2D(1, 1), Point2D(4, 1), Point2D(4, 2), Point2D(1, 2)))
+    sky_door = Polygon2D((Point2D(5, 5), Point2D(6, 5), Point2D(6, 7), Point2D(5, 7)))
+    sky_par = DetailedSkylights((sky_pgon, sky_door), (False, True))
+    room.skylight_parameters = sky_par
+    room.properties.comparison.reset()
+
+    assert room.properties.comparison.window_area == pytest.approx(3, abs=1e-6)
+    assert room.properties.comparison.door_area == pytest.approx(2, abs=1e-6)
+    host_metrics = room.properties.comparison.host_metrics()
+    assert host_metrics['window_area'] == pytest.approx(3, abs=1e-6)
+    assert host_metrics['door_area'] == pytest.approx(2, abs=1e-6)
+
+    new_sky_par = DetailedSkylights((sky_pgon,), (True,))
+    room.properties.comparison.comparison_skylight = new_sky_par
+    assert room.properties.comparison.door_area == pytest.approx(3, abs=1e-6)
+    assert room.properties.comparison.door_area_difference == \
+        pytest.approx(-1, abs=1e-6)
+
+
+def test_to_dict_floor_delta():
+    """Test the writing of the comparison floor geometry as a delta from the host."""
+    pts = (Point3D(0, 0, 3), Point3D(10, 0, 3), Point3D(10, 10, 3), Point3D(0, 10, 3))
+    hole = (Point3D(2, 2, 3), Point3D(4, 2, 3), Point3D(4, 4, 3), Point3D(2, 4, 3))
+    room = Room2D('SquareShoebox', Face3D(pts, holes=[hole]), 3)
+    room.properties.comparison.reset()
+
+    rd = room.to_dict(abridged=True)
+    floor_delta = rd['properties']['comparison']['floor_delta']
+    assert floor_delta['host_vertex_counts'] == [4, 4]
+    assert floor_delta['boundary'] == []
+    assert floor_delta['holes'] == [[]]
+    assert 'floor_boundary' not in rd['properties']['comparison']
+    new_room = Room2D.from_dict(rd)
+    new_room.properties.comparison.apply_properties_from_dict(
+        rd['properties']['comparison'])
+    assert new_room.properties.comparison.comparison_floor_geometry.area == \
+        pytest.approx(96, abs=1e-6)
+
+    room.snap_to_points((Point2D(10.5, 0), Point2D(10.5, 10.5)), 1.0)
+    rd = room.to_dict(abridged=True)
+    floor_delta = rd['properties']['comparison']['floor_delta']
+    assert floor_delta['boundary'] == [[1, 10, 0], [2, 10, 10]]
+    assert floor_delta['holes'] == [[]]
+    new_room = Room2D.from_dict(rd)
+    new_room.properties.comparison.apply_properties_from_dict(
+        rd['properties']['comparison'])
+    assert new_room.properties.comparison.floor_area_difference == \
+        pytest.approx(7.625, abs=1e-3)
+    assert new_room.to_dict(abridged=True) == rd
+
+    # check that the full floor boundary is written when vertex counts differ
+    new_pts = (Point3D(0, 0, 3), Point3D(10, 0, 3), Point3D(0, 10, 3))
+    room.properties.comparison.comparison_floor_geometry = Face3D(new_pts)
+    rd = room.to_dict(abridged=True)
+    assert 'floor_delta' not in rd['properties']['comparison']
+    assert len(rd['properties']['comparison']['floor_boundary']) == 3
+    assert 'floor_delta' not in room.to_dict()['properties']['comparison']
+
+
+def test_floor_delta_modified_host():
+    """Test that a floor_delta is not applied to a host floor that was edited."""
+    pts = (Point3D(0, 0, 3), Point3D(10, 0, 3), Point3D(10, 10, 3), Point3D(0, 10, 3))
+    room = Room2D('SquareShoebox', Face3D(pts), 3)
+    room.properties.comparison.reset()
+    room.snap_to_points((Point2D(10.5, 0), Point2D(10.5, 10.5)), 1.0)
+    rd = room.to_dict(abridged=True)
+    comp_dict = rd['properties']['comparison']
+    assert comp_dict['floor_delta']['boundary'] == [[1, 10, 0], [2, 10, 10]]
+
+    # the delta round trips onto the same host floor
+    new_room = Room2D.from_dict(rd)
+    new_room.properties.comparison.apply_properties_from_dict(comp_dict)
+    assert new_room.properties.comparison.floor_area == pytest.approx(100, abs=1e-6)
+
+    # the delta is not applied to a host floor with edited coordinates
+    new_room = Room2D.from_dict(rd)
+    new_room.snap_to_points((Point2D(11, 0), Point2D(11, 11)), 1.0)
+    with pytest.raises(ValueError):
+        new_room.properties.comparison.apply_properties_from_dict(comp_dict)
+    new_room.properties.comparison.apply_properties_from_dict(comp_dict, lazy=True)
+    with pytest.raises(ValueError):
+        new_room.properties.comparison.floor_area
+
+    # the delta is not applied to a host floor with a different vertex count
+    new_pts = (Point3D(0, 0, 3), Point3D(10.5, 0, 3), Point3D(10.5, 5, 3),
+               Point3D(10.5, 10.5, 3), Point3D(0, 10, 3))
+    new_room = Room2D('SquareShoebox', Face3D(new_pts), 3)
+    with pytest.raises(ValueError):
+        new_room.properties.comparison.apply_properties_from_dict(comp_dict)
+
+
+def test_is_stale():
+    """Test the caching of comparison metrics and the is_stale property."""
+    pts = (Point3D(0, 0, 3), Point3D(10, 0, 3), Point3D(10, 10, 3), Point3D(0, 10, 3))
+    room = Room2D('SquareShoebox', Face3D(pts), 3)
+    room.set_outdoor_window_parameters(SimpleWindowRatio(0.4))
+    room.properties.comparison.reset()
+    comp_prop = room.properties.comparison
+    assert comp_prop.is_stale
+    assert comp_prop.comparison_metrics()['floor_area_difference'] == 0
+    assert not comp_prop.is_stale
+
+    room.snap_to_points((Point2D(10.5, 0), Point2D(10.5, 10.5)), 1.0)
+    assert comp_prop.is_stale
+    assert comp_prop.comparison_metrics()['floor_area_difference'] == \
+        pytest.approx(7.625, abs=1e-3)
+    room.floor_to_ceiling_height = 4
+    assert comp_prop.is_stale
+    assert comp_prop.comparison_metrics()['wall_area'] == pytest.approx(160, abs=1e-3)
+    room.set_outdoor_window_parameters(SimpleWindowRatio(0.5))
+    assert comp_prop.is_stale
+    comp_prop.comparison_metrics()
+    comp_prop.comparison_windows = room.window_parameters
+    assert comp_prop.is_stale
+    assert comp_prop.comparison_metrics()['window_area'] == pytest.approx(80, abs=1e-3)
+
+
+def test_approximate_metrics():
+    """Test the approximate_metrics method against the exact metrics."""
+    pts = (Point3D(0, 0, 3), Point3D(10, 0, 3), Point3D(10, 10, 3), Point3D(0, 10, 3))
+    hole = (Point3D(2, 2, 3), Point3D(4, 2, 3), Point3D(4, 4, 3), Point3D(2, 4, 3))
+    room = Room2D('SquareShoebox', Face3D(pts, holes=[hole]), 3)
+    room.is_top_exposed = True
+    room.set_outdoor_window_parameters(SimpleWindowRatio(0.4))
+    room.skylight_parameters = GriddedSkylightRatio(0.05)
+    room.properties.comparison.reset()
+    room.snap_to_points((Point2D(10.5, 0), Point2D(10.5, 10.5)), 1.0)
+
+    comp_prop = room.properties.comparison
+    exact = comp_prop.comparison_metrics()
+    approx = comp_prop.approximate_metrics()
+    assert approx['max_error'] == 0
+    for key in ('floor_area', 'floor_area_difference', 'wall_area',
+                'wall_area_difference', 'window_area', 'window_area_difference'):
+        assert approx[key] == pytest.approx(exact[key], abs=1e-6)
+
+    class _CustomWindowRatio(SimpleWindowRatio):
+        pass
+
+    comp_prop.comparison_windows = (_CustomWindowRatio(0.3),) * 8
+    approx = comp_prop.approximate_metrics()
+    assert approx['max_error'] > 0
+    exact_diff = comp_prop.comparison_metrics()['window_area_difference']
+    assert abs(approx['window_area_difference'] - exact_diff) <= approx['max_error']
+
+    comp_prop.comparison_windows = None  # the host windows are used
+    approx = comp_prop.approximate_metrics()
+    assert approx['max_error'] == 0
+    assert approx['window_area'] == \
+        pytest.approx(comp_prop.comparison_metrics()['window_area'], abs=1e-6)
+
+
+def test_lazy_from_dict():
+    """Test that comparison dictionaries applied lazily are parsed on first access."""
+    pts = (Point3D(0, 0, 3), Point3D(10, 0, 3), Point3D(10, 10, 3), Point3D(0, 10, 3))
+    room = Room2D('SquareShoebox', Face3D(pts), 3)
+    room.set_outdoor_window_parameters(SimpleWindowRatio(0.4))
+    room.properties.comparison.reset()
+    room.snap_to_points((Point2D(10.5, 0), Point2D(10.5, 10.5)), 1.0)
+    room_dict = room.to_dict(abridged=True)
+    comp_dict = room.to_dict()['properties']['comparison']
+    floor_area_diff = room.properties.comparison.floor_area_difference
+
+    new_room = Room2D.from_dict(room_dict)
+    new_room.properties.comparison.apply_properties_from_dict(comp_dict, lazy=True)
+    comp_prop = new_room.properties.comparison
+    assert comp_prop._pending_dict is not None
+    new_room.move(Vector3D(5, 0, 0))  # host edits are applied after the parsing
+    assert comp_prop._pending_dict is None
+    assert comp_prop.floor_area_difference == pytest.approx(floor_area_diff, abs=1e-6)
+    assert comp_prop.comparison_floor_geometry.min.x == pytest.approx(5, abs=1e-6)
+
+    abr_dict = room.properties.comparison.to_dict(abridged=True)['comparison']
+    comp_area = room.properties.comparison.comparison_floor_geometry.area
+    lazy_prop = Room2DComparisonProperties.from_dict(abr_dict, room, lazy=True)
+    room.snap_to_points((Point2D(0, -0.5),), 1.0)  # floor_delta uses the old host
+    assert lazy_prop.comparison_floor_geometry.area == pytest.approx(comp_area, abs=1e-6)
+
+
+def test_apply_dict_over_pending_dict():
+    """Test that a dictionary applied over a pending lazy dictionary is merged with it."""
+    pts = (Point3D(0, 0, 3), Point3D(10, 0, 3), Point3D(10, 10, 3), Point3D(0, 10, 3))
+    room = Room2D('SquareShoebox', Face3D(pts), 3)
+    room.set_outdoor_window_parameters(SimpleWindowRatio(0.4))
+    comp_prop = room.properties.comparison
+    win_dicts = [SimpleWindowRatio(0.2).to_dict()] * 4
+    comp_prop.apply_properties_from_dict({'window_parameters': win_dicts}, lazy=True)
+    floor_bound = [(0, 0), (12, 0), (12, 10), (0, 10)]
+    comp_prop.apply_properties_from_dict({'floor_boundary': floor_bound})
+    assert comp_prop._pending_dict is None
+    assert comp_prop.comparison_windows[0].window_ratio == 0.2
+    assert comp_prop.comparison_floor_geometry.area == pytest.approx(120, abs=1e-6)
+
+
+def test_concurrent_metric_reads():
+    """Test that metrics read during edits always come from a complete state."""
+    pts = (Point3D(0, 0, 3), Point3D(10, 0, 3), Point3D(10, 10, 3), Point3D(0, 10, 3))
+    room = Room2D('SquareShoebox', Face3D(pts), 3)
+    room.set_outdoor_window_parameters(SimpleWindowRatio(0.4))
+    room.properties.comparison.reset()
+    state_a = room.duplicate()
+    state_b = room.duplicate()
+    state_b.snap_to_points((Point2D(10.5, 0), Point2D(10.5, 10.5)), 1.0)
+    state_b.set_outdoor_window_parameters(SimpleWindowRatio(0.2))
+    valid = set()
+    for comp_room in (state_a, state_b):
+        room.properties.comparison.set_from_room_2d(comp_room)
+        metrics = room.properties.comparison.comparison_metrics()
+        valid.add((round(metrics['floor_area'], 6), round(metrics['window_area'], 6)))
+
+    comp_prop, stop, results = room.properties.comparison, threading.Event(), []
+
+    def _read():
+        while not stop.is_set():
+            metrics = comp_prop.comparison_metrics()
+            results.append(
+                (round(metrics['floor_area'], 6), round(metrics['window_area'], 6)))
+
+    readers = [threading.Thread(target=_read) for _ in range(4)]
+    for reader in readers:
+        reader.start()
+    for i in range(500):
+        comp_prop.set_from_room_2d(state_a if i % 2 == 0 else state_b)
+        comp_prop.move(Vector3D(0, 0, 0))
+    stop.set()
+    for reader in readers:
+        reader.join()
+    assert len(results) > 0
+    assert set(results).issubset(valid)
+
+
+def test_floor_changes():
+    """Test the floor_changes method for moved, snapped and identical floors."""
+    pts = (Point3D(0, 0, 3), Point3D(10, 0, 3), Point3D(10, 10, 3), Point3D(0, 10, 3))
+    room = Room2D('SquareShoebox', Face3D(pts), 3)
+    room.properties.comparison.reset()
+    comp_prop = room.properties.comparison
+    changes = comp_prop.floor_changes()
+    assert changes['added'] == [] and changes['removed'] == []
+
+    comp_prop.comparison_floor_geometry = Face3D(pts).move(Vector3D(2, 0, 0))
+    assert comp_prop.floor_area_difference == pytest.approx(0, abs=1e-6)
+    changes = comp_prop.floor_changes()
+    assert changes['added_area'] == pytest.approx(20, abs=1e-6)
+    assert changes['removed_area'] == pytest.approx(20, abs=1e-6)
+    assert all(face.min.z == pytest.approx(3) for face in changes['added'])
+
+    comp_prop.comparison_floor_geometry = Face3D(pts).move(Vector3D(20, 0, 0))
+    changes = comp_prop.floor_changes()
+    assert changes['added_area'] == pytest.approx(100, abs=1e-6)
+    assert changes['removed_area'] == pytest.approx(100, abs=1e-6)
+
+    hole = (Point3D(2, 2, 3), Point3D(4, 2, 3), Point3D(4, 4, 3), Point3D(2, 4, 3))
+    comp_prop.comparison_floor_geometry = Face3D(pts, holes=[hole])
+    changes = comp_prop.floor_changes()
+    assert changes['added_area'] == pytest.approx(4, abs=1e-6)
+    assert changes['removed_area'] == pytest.approx(0, abs=1e-6)
+
+
+def test_floor_changes_contained():
+    """Test the floor_changes method when one floor fully contains the other."""
+    pts = (Point3D(0, 0, 3), Point3D(10, 0, 3), Point3D(10, 10, 3), Point3D(0, 10, 3))
+    room = Room2D('SquareShoebox', Face3D(pts), 3)
+    comp_prop = room.properties.comparison
+    inner = (Point3D(2, 2, 3), Point3D(8, 2, 3), Point3D(8, 8, 3), Point3D(2, 8, 3))
+    comp_prop.comparison_floor_geometry = Face3D(inner)
+    changes = comp_prop.floor_changes()
+    assert changes['added_area'] == pytest.approx(64, abs=1e-6)
+    assert changes['removed_area'] == pytest.approx(0, abs=1e-6)
+    assert len(changes['added']) == 1 and changes['added'][0].has_holes
+
+    outer = (Point3D(-1, -1, 3), Point3D(11, -1, 3), Point3D(11, 11, 3),
+             Point3D(-1, 11, 3))
+    comp_prop.comparison_floor_geometry = Face3D(outer)
+    changes = comp_prop.floor_changes()
+    assert changes['added_area'] == pytest.approx(0, abs=1e-6)
+    assert changes['removed_area'] == pytest.approx(44, abs=1e-6)
@@ -0,0 +1,93 @@
+"""Tests the local comparison service."""
+import json
+import socket
+import threading
+import pytest
+
+from dragonfly.room2d import Room2D
+
+from dragonfly_comparison.service import ComparisonService
+
+
+def test_handle_request(host_and_comparison_models):
+    """Test the ComparisonService handle_request method."""
+    host_model, comp_model = host_and_comparison_models
+    service = ComparisonService(host_model, comp_model)
+
+    response = service.handle_request({'command': 'metrics', 'story': 'Office_Floor'})
+    metrics = response['metrics']['SquareShoebox']
+    assert metrics['floor_area_difference'] == pytest.approx(7.625, abs=1e-3)
+
+    response = service.handle_request({'command': 'restore', 'room': 'SquareShoebox'})
+    restored = Room2D.from_dict(response['room_2d'])
+    assert restored.floor_area == pytest.approx(100, abs=1e-3)
+
+    response = service.handle_request({'command': 'reset'})
+    assert response['rooms'] == 1
+    response = service.handle_request({'command': 'metrics', 'rooms': ['SquareShoebox']})
+    assert response['metrics']['SquareShoebox']['floor_area_difference'] == 0
+
+    response = service.handle_request(
+        {'command': 'set_from_model', 'model': comp_model.to_dict()})
+    response = service.handle_request(
+        {'command': 'metrics', 'building': 'Office_Building'})
+    metrics = response['metrics']['SquareShoebox']
+    assert metrics['floor_area_difference'] == pytest.approx(7.625, abs=1e-3)
+
+    assert 'error' in service.handle_request({'command': 'not_a_command'})
+    assert 'error' in service.handle_request({'command': 'restore', 'room': 'Nope'})
+    assert 'error' in service.handle_request({})
+    assert 'error' in service.handle_request({'command': ['metrics']})
+    assert 'error' in service.handle_request({'command': {'a': 1}})
+
+
+def test_handle_json_malformed(host_and_comparison_models):
+    """Test that malformed JSON requests get an error response."""
+    host_model, comp_model = host_and_comparison_models
+    service = ComparisonService(host_model, comp_model)
+    for request in (b'{"command": "metrics", "story": "\xff"}', '{"command": [1]}',
+                    '{"command": "metrics"', b'[1, 2]'):
+        assert 'error' in json.loads(service.handle_json(request))
+    response = json.loads(service.handle_json(b'{"command": "metrics"}'))
+    assert 'SquareShoebox' in response['metrics']
+
+
+def test_handle_json_non_finite(host_and_comparison_models):
+    """Test that metrics without a finite value are written as null JSON."""
+    host_model, comp_model = host_and_comparison_models
+    service = ComparisonService(host_model, comp_model)
+    response_text = service.handle_json('{"command": "metrics"}')
+
+    def _reject_constant(name):
+        raise ValueError('Non-standard JSON constant {}.'.format(name))
+
+    response = json.loads(response_text, parse_constant=_reject_constant)
+    metrics = response['metrics']['SquareShoebox']
+    assert metrics['door_area'] == 0
+    assert metrics['door_area_percent_change'] is None
+    assert metrics['floor_area_difference'] == pytest.approx(7.625, abs=1e-3)
+
+
+def test_create_server(host_and_comparison_models):
+    """Test the ComparisonService create_server method with concurrent clients."""
+    host_model, comp_model = host_and_comparison_models
+    service = ComparisonService(host_model, comp_model)
+    server = service.create_server()
+    thread = threading.Thread(target=server.serve_forever)
+    thread.daemon = True
+    thread.start()
+    try:
+        clients = [socket.create_connection(server.server_address) for _ in range(3)]
+        for client in clients:
+            client.sendall(b'{"command": "\xff"}\n{"command": "metrics"}\n')
+        for client in clients:
+            response_file = client.makefile('rb')
+            response = json.loads(response_file.readline().decode('utf-8'))
+            assert 'error' in response  # the connection survives a bad request
+            response = json.loads(response_file.readline().decode('utf-8'))
+            metrics = response['metrics']['SquareShoebox']
+            assert metrics['floor_area_difference'] == pytest.approx(7.625, abs=1e-3)
+            client.close()
+    finally:
+        server.shutdown()
+        server.server_close()
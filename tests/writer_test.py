@@ -0,0 +1,52 @@
+"""Tests the incremental Model writer."""
+import os
+import json
+
+import pytest
+
+from dragonfly.model import Model
+
+from dragonfly_comparison.writer import write_model, model_to_dfjson
+
+try:
+    from StringIO import StringIO
+except ImportError:
+    from io import StringIO
+
+
+@pytest.mark.parametrize('host_and_comparison_models', [3], indirect=True)
+def test_write_model(host_and_comparison_models):
+    """Test that write_model produces the same data as Model.to_dict."""
+    model, _ = host_and_comparison_models
+    stream = StringIO()
+    write_model(model, stream)
+    model_dict = json.loads(stream.getvalue())
+    assert model_dict == json.loads(json.dumps(model.to_dict()))
+
+    new_model = Model.from_dict(model_dict)
+    new_room = new_model.room_2ds[0]
+    assert new_room.properties.comparison.floor_area_difference == \
+        model.room_2ds[0].properties.comparison.floor_area_difference
+
+
+@pytest.mark.parametrize('host_and_comparison_models', [3], indirect=True)
+def test_write_model_included_prop(host_and_comparison_models):
+    """Test write_model with an empty list of included properties."""
+    model, _ = host_and_comparison_models
+    stream = StringIO()
+    write_model(model, stream, included_prop=[])
+    model_dict = json.loads(stream.getvalue())
+    assert model_dict == json.loads(json.dumps(model.to_dict(included_prop=[])))
+
+
+@pytest.mark.parametrize('host_and_comparison_models', [3], indirect=True)
+def test_model_to_dfjson(tmpdir, host_and_comparison_models):
+    """Test the model_to_dfjson function."""
+    model, _ = host_and_comparison_models
+    df_file = model_to_dfjson(model, 'comparison_model', str(tmpdir))
+    assert os.path.isfile(df_file)
+    assert df_file.endswith('comparison_model.dfjson')
+    with open(df_file) as inf:
+        model_dict = json.load(inf)
+    assert model_dict['buildings'][0]['unique_stories'][0]['room_2ds'][0][
+        'properties']['comparison']['floor_delta']['boundary'] != []